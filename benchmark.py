@@ -0,0 +1,205 @@
+""" Contains the benchmark suite, which plays every shipped level headlessly with fixed, seeded launches and measures the
+game's performance: physics ticks per second, time spent on collisions, gravity and drawing (to a window-less display),
+level load time and the most memory held in surfaces, masks and grids (see memoryaccount.py). Results are written as
+JSON and compared against a stored baseline, flagging any measurement which got worse by more than a threshold. Changes
+to engine.py meant to speed the game up should be measured with this before and after.
+
+To run: "python benchmark.py" compares against benchmark_baseline.json if there is one, "python benchmark.py
+--save-baseline" stores the results as the new baseline. The measurements are times on the computer they were taken
+on, so each computer stores a baseline of its own (it isn't kept in the repository). Run "python benchmark.py --help"
+for the other options.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+# Plays without opening a window, unless another video driver is asked for
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import engine
+import levelfile
+import profiler
+import settings
+
+
+# Each measurement compared against the baseline, with whether higher is better. The results also hold the number of
+# physics ticks run and the 95th percentile frame time, which are too short and jittery to compare. Measurements which
+# can't be made, such as those per tick when the hero crashed on every launch's first tick, are None.
+METRICS = (("load_s", False), ("ticks_per_sec", True), ("collision_ms_per_tick", False),
+           ("gravity_ms_per_tick", False), ("render_ms_per_frame", False), ("peak_memory_kb", False))
+
+
+def get_launches(lvl_num, seed, count):
+    """ Returns a list of count 2-tuples with the angle in degrees and the speed of each launch in the integer level
+    number, the same every time for the same seed.
+    """
+    rng = random.Random("%d-%d" % (seed, lvl_num))
+    return [(rng.uniform(0, 90), rng.uniform(settings.Settings.min_speed, settings.Settings.max_speed))
+            for index in range(count)]
+
+
+def create_game():
+    """ Returns a game, drawing to a 32 bit display (without a window, by default) and skipping its waits for the
+    player, so levels play through without input.
+    """
+    pygame.display.init()
+    # The window-less video driver picks 8 bit colour unless a 32 bit display was set first
+    pygame.display.set_mode(settings.Settings.screen_size, 0, 32)
+    game = engine.Game(settings.Settings.screen_size)
+    # Info-bits and crashes wait for the player
+    engine.click_to_continue = lambda: None
+    settings.Settings.crash_delay = 0
+    return game
+
+
+def run_level(game, lvl_num, launches, ticks):
+    """ Loads the integer level number, without reusing any scaled images, and runs each launch (see get_launches
+    function) for up to ticks physics ticks, drawing a frame after every tick, until the hero crashes. Returns a
+    dictionary of the measurements (see METRICS). Peak memory is the game's own account of the level (see
+    engine.Game.account_memory method) rather than the process's, which only ever grows from level to level.
+    """
+    start = time.time()
+    game.images = {}
+    game.reset_level()
+    game.lvl = lvl_num
+    game.load_level(levelfile.load(levelfile.get_path(lvl_num), lvl_num))
+    load_time = time.time() - start
+    game.draw_background()
+    game.hero_hide()
+    game.toggle_halo()
+    game.draw_all_bodies()
+    game.ready_launch()
+    # Times every frame, see profiler.py
+    game.profiler = profiler.FrameProfiler(game, engine.PROFILED_METHODS, len(launches) * ticks)
+    game.profiler.toggle()
+    tick_count = 0
+    for angle, speed in launches:
+        # Reaching the target would otherwise end the level
+        game.quit_lvl = False
+        velocity = engine.polar_to_cartesian((speed, math.radians(- angle)))
+        game.bodies[game.get_hero()].velocity.set(*velocity)
+        game.draw_velocity_info(velocity)
+        game.hero_launch_time()
+        game.launch()
+        for tick in range(ticks):
+            game.profiler.start_frame()
+            game.simulate()
+            # The tick the hero crashes on also resets the level, which takes far longer, so it isn't recorded
+            if game.game_state != "action":
+                break
+            tick_count += 1
+            if game.camera.changed:
+                game.redraw_all()
+            elif game.running:
+                game.render_particles()
+            game.draw_dirty_widgets()
+            game.screen_update()
+            game.profiler.end_frame()
+        # Counts what the flight left held, such as the trails, before the level is reset
+        game.account_memory()
+        if game.game_state == "action":
+            game.reset_all()
+    game.profiler.toggle()
+    totals = dict((section, sum(game.profiler.get_recorded(game.profiler.timings[section])))
+                  for section in game.profiler.sections)
+    results = {"load_s": load_time,
+               "ticks": tick_count,
+               "ticks_per_sec": None,
+               "collision_ms_per_tick": None,
+               "gravity_ms_per_tick": None,
+               "render_ms_per_frame": None,
+               "frame_ms_p95": None,
+               "peak_memory_kb": game.memory.get_peak(lvl_num) / 1024.0}
+    if tick_count:
+        results.update({"ticks_per_sec": tick_count / (totals["simulate"] / 1000.0),
+                        "collision_ms_per_tick": totals["collisions"] / tick_count,
+                        "gravity_ms_per_tick": totals["gravity_scoring"] / tick_count,
+                        "render_ms_per_frame": totals["draw"] / game.profiler.count,
+                        "frame_ms_p95": game.profiler.get_percentile(None, 95)})
+    return results
+
+
+def run_suite(lvl_nums, seed, launches, ticks, repeats):
+    """ Runs every level in the list of integer level numbers (see run_level function) repeats times, and returns
+    the best of each measurement as a dictionary, with the options they were run with. Taking the best run keeps
+    other programs slowing the computer down from showing up as regressions.
+    """
+    # Every level is loaded from its PNG files, so load times don't depend on the level cache
+    settings.Settings.level_cache_dir = None
+    game = create_game()
+    levels = {}
+    for lvl_num in lvl_nums:
+        runs = [run_level(game, lvl_num, get_launches(lvl_num, seed, launches), ticks) for repeat in range(repeats)]
+        levels[str(lvl_num)] = runs[0]
+        for metric, higher_is_better in METRICS:
+            values = [run[metric] for run in runs if run[metric] is not None]
+            if values:
+                levels[str(lvl_num)][metric] = max(values) if higher_is_better else min(values)
+    return {"options": {"seed": seed, "launches": launches, "ticks": ticks, "repeats": repeats}, "levels": levels}
+
+
+def compare(results, baseline, threshold):
+    """ Returns a list of messages, one for each measurement in results which is worse than in baseline by more than
+    the fraction threshold.
+    """
+    regressions = []
+    for lvl_num, measured in sorted(results["levels"].items()):
+        expected = baseline["levels"].get(lvl_num)
+        if not expected:
+            continue
+        for metric, higher_is_better in METRICS:
+            new, old = measured.get(metric), expected.get(metric)
+            if not new or not old:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > threshold:
+                regressions.append("lvl_%s %s: %.4g -> %.4g (%.0f%% worse)" % (lvl_num, metric, old, new, change * 100))
+    return regressions
+
+
+def main(args):
+    """ Runs the benchmark suite from the command line arguments, returning the exit status: 1 if any regression was
+    found, else 0.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks every shipped level headlessly.")
+    parser.add_argument("--levels", type=int, nargs="+", default=range(settings.Settings.total_lvls),
+                        help="level numbers to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the launches (default: 0)")
+    parser.add_argument("--launches", type=int, default=3, help="launches per level (default: 3)")
+    parser.add_argument("--ticks", type=int, default=300, help="most physics ticks per launch (default: 300)")
+    parser.add_argument("--repeats", type=int, default=3, help="runs of each level, keeping the best (default: 3)")
+    parser.add_argument("--output", default="benchmark_results.json", help="file the results are written to")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="file with the baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fraction a measurement can get worse by before it's flagged (default: 0.15)")
+    options = parser.parse_args(args)
+    results = run_suite(options.levels, options.seed, options.launches, options.ticks, options.repeats)
+    for lvl_num, measured in sorted(results["levels"].items()):
+        print "lvl_%s: %s" % (lvl_num, ", ".join("%s %.4g" % (metric, measured[metric])
+                                                  for metric, higher_is_better in METRICS
+                                                  if measured[metric] is not None))
+    with open(options.save_baseline and options.baseline or options.output, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+    if options.save_baseline:
+        return 0
+    if not os.path.isfile(options.baseline):
+        print "No baseline to compare against, store one for this computer with --save-baseline."
+        return 0
+    with open(options.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("options") != results["options"]:
+        print "The baseline was run with different options: %s" % baseline.get("options")
+    regressions = compare(results, baseline, options.threshold)
+    for regression in regressions:
+        print "Regression:", regression
+    if not regressions:
+        print "No regressions against %s." % options.baseline
+    return int(bool(regressions))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,85 @@
+""" Contains the Camera class, used to pan and zoom the view of a level. To see how the camera is used, see engine.py.
+Zoom limits and pan speed can be changed in settings.py.
+"""
+import pygame
+import settings
+
+
+class Camera:
+    """ Converts between world coordinates, where bodies are simulated (matching the screen when the camera is reset),
+    and screen coordinates, where they're drawn. Anything that doesn't intersect the screen after conversion can be
+    skipped when drawing.
+    """
+
+    def __init__(self, screen_size):
+        """ Initializes the camera over the whole screen with no zoom. Parameter: screen_size - 2-tuple in pixels.
+        """
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        # World coordinate at the top-left corner of the screen
+        self.offset = (0.0, 0.0)
+        self.zoom = 1.0
+        self.follow = settings.Settings.camera_follow
+        # Set whenever the view moves, so the whole screen can be redrawn
+        self.changed = False
+
+    def reset(self):
+        """ Affective method, moves the camera back over the whole screen with no zoom.
+        """
+        if self.offset != (0.0, 0.0) or self.zoom != 1.0:
+            self.offset = (0.0, 0.0)
+            self.zoom = 1.0
+            self.changed = True
+
+    def pan(self, x, y):
+        """ Affective method, moves the view by x and y screen pixels.
+        """
+        if x or y:
+            self.offset = (self.offset[0] + x / self.zoom, self.offset[1] + y / self.zoom)
+            self.changed = True
+
+    def zoom_at(self, factor, screen_point):
+        """ Affective method, multiplies the zoom by factor (within the limits in settings.py), keeping the world
+        coordinate under the 2-tuple screen_point in place.
+        """
+        zoom = min(max(self.zoom * factor, settings.Settings.zoom_min), settings.Settings.zoom_max)
+        if zoom != self.zoom:
+            world_point = self.to_world(screen_point)
+            self.zoom = zoom
+            self.offset = (world_point[0] - screen_point[0] / zoom, world_point[1] - screen_point[1] / zoom)
+            self.changed = True
+
+    def center_on(self, world_point):
+        """ Affective method, moves the view so the 2-tuple world_point is in the center of the screen.
+        """
+        offset = (world_point[0] - self.screen_rect.centerx / self.zoom,
+                  world_point[1] - self.screen_rect.centery / self.zoom)
+        if offset != self.offset:
+            self.offset = offset
+            self.changed = True
+
+    def to_screen(self, point):
+        """ Returns the integer screen coordinate of the 2-tuple world coordinate point.
+        """
+        return (int(round((point[0] - self.offset[0]) * self.zoom)), int(round((point[1] - self.offset[1]) * self.zoom)))
+
+    def to_world(self, point):
+        """ Returns the world coordinate of the 2-tuple screen coordinate point.
+        """
+        return (point[0] / self.zoom + self.offset[0], point[1] / self.zoom + self.offset[1])
+
+    def to_screen_rect(self, rect):
+        """ Returns a new pygame rect on the screen covering the given pygame rect in world coordinates.
+        """
+        return pygame.Rect(self.to_screen(rect.topleft), self.to_screen_size(rect.size))
+
+    def to_screen_size(self, size):
+        """ Returns the integer size on the screen of the 2-tuple size in world coordinates.
+        """
+        if self.zoom == 1.0:
+            return size
+        return (int(round(size[0] * self.zoom)), int(round(size[1] * self.zoom)))
+
+    def is_visible(self, rect):
+        """ Returns whether or not any of the pygame rect in world coordinates is on the screen.
+        """
+        return self.to_screen_rect(rect).colliderect(self.screen_rect)
@@ -16,11 +16,13 @@ A class for 'dimming' (i.e. darkening) the entire screen, useful for:
 
 Usage:
 
-dim=Dimmer(keepalive=1)
+dim=Dimmer(keepalive=1, surface=None, update=None)
   Creates a new Dimmer object,
   if keepalive is true, the object uses the same surface over and over again,
   blocking some memory, but that makes multiple undim() calls possible - 
   Dimmer can be 'abused' as a memory for screen contents this way..
+  surface is the surface to dim (the display surface by default), and update
+  is called without arguments to show it (pygame.display.update by default)
 
 dim.dim(darken_factor=64, color_filter=(0,0,0))
   Saves the current screen for later restorage and lays a filter over it -
@@ -39,10 +41,16 @@ import pygame
 
 
 class Dimmer:
-    def __init__(self, keepalive=0):
+    def __init__(self, keepalive=0, surface=None, update=None):
         self.keepalive=keepalive
+        if surface is None:
+            surface=pygame.display.get_surface()
+        if update is None:
+            update=pygame.display.update
+        self.surface=surface
+        self.update=update
         if self.keepalive:
-            self.buffer=pygame.Surface(pygame.display.get_surface().get_size())
+            self.buffer=pygame.Surface(self.surface.get_size())
         else:
             self.buffer=None
 
@@ -51,23 +59,23 @@ class Dimmer:
 
     def dim(self, darken_factor=64, color_filter=(0,0,0)):
         if not self.keepalive:
-            self.buffer=pygame.Surface(pygame.display.get_surface().get_size())
-        self.buffer.blit(pygame.display.get_surface(),(0,0))
+            self.buffer=pygame.Surface(self.surface.get_size())
+        self.buffer.blit(self.surface,(0,0))
         if darken_factor>0:
-            darken=pygame.Surface(pygame.display.get_surface().get_size())
+            darken=pygame.Surface(self.surface.get_size())
             darken.fill(color_filter)
             darken.set_alpha(darken_factor)
             # safe old clipping rectangle...
-            old_clip=pygame.display.get_surface().get_clip()
+            old_clip=self.surface.get_clip()
             # ..blit over entire screen...
-            pygame.display.get_surface().blit(darken,(0,0))
-            pygame.display.update()
+            self.surface.blit(darken,(0,0))
+            self.update()
             # ... and restore clipping
-            pygame.display.get_surface().set_clip(old_clip)
+            self.surface.set_clip(old_clip)
 
     def undim(self):
         if self.buffer:
-            pygame.display.get_surface().blit(self.buffer,(0,0))
-            pygame.display.update()
+            self.surface.blit(self.buffer,(0,0))
+            self.update()
             if not self.keepalive:
                 self.buffer=None
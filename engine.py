@@ -6,11 +6,39 @@ from pygame.locals import *
 import dimmer
 import TextWidget
 import SliderWidget
+import trails
+import camera
+import widgets
+import levelcache
+import gravityfield
+import profiler
+import governor
+import memoryaccount
+import physicsworker
+import swarm
+import tasks
+import levelfile
+import vector
+import snapshot
+import timeline
 import math
+import random
 import time
 import sys
 import settings
 import os
+from array import array
+
+
+# Keys which change the game while held down, without sending any events
+HELD_KEYS = (K_UP, K_DOWN, K_RIGHT, K_LEFT, K_w, K_a, K_s, K_d)
+# Wakes wait_event on versions of pygame where pygame.event.wait can't time out
+WAKE_EVENT = USEREVENT + 3
+# Game methods timed by the frame profiler, with the section of the frame each counts towards
+PROFILED_METHODS = (("event_loop", "events"), ("physics_tick", "simulate"), ("move_all_bodies", "move"),
+                    ("special_collision", "collisions"), ("apply_gravity", "gravity_scoring"), ("tick_swarm", "swarm"),
+                    ("record_tick", "timeline"), ("erase_dirty_widgets", "widgets"), ("draw_dirty_widgets", "widgets"),
+                    ("redraw_all", "draw"), ("render_particles", "draw"), ("screen_update", "screen_update"))
 
 
 def load_image(name, colorkey=None):
@@ -35,13 +63,28 @@ def click_to_continue():
     """
     start = False
     while not start:
-        for event in pygame.event.get():
-            if event.type == QUIT or (event.type == KEYDOWN and event.key in (K_ESCAPE, K_q)):
-                sys.exit()
-            if event.type == MOUSEBUTTONUP:
-                start = True
-            if event.type == KEYDOWN and event.key == K_RETURN:
-                start = True
+        event = wait_event(settings.Settings.idle_timeout)
+        if event.type == QUIT or (event.type == KEYDOWN and event.key in (K_ESCAPE, K_q)):
+            sys.exit()
+        if event.type == MOUSEBUTTONUP:
+            start = True
+        if event.type == KEYDOWN and event.key == K_RETURN:
+            start = True
+
+
+def wait_event(timeout):
+    """ Returns the next event, sleeping until one arrives or until timeout milliseconds have passed, in which case a
+    NOEVENT event is returned.
+    """
+    try:
+        return pygame.event.wait(timeout)
+    except TypeError:
+        pygame.time.set_timer(WAKE_EVENT, timeout)
+        event = pygame.event.wait()
+        pygame.time.set_timer(WAKE_EVENT, 0)
+        if event.type == WAKE_EVENT:
+            return pygame.event.Event(NOEVENT)
+        return event
 
 
 def surface_angler(surface, rect, angle):
@@ -149,11 +192,11 @@ def vector_add(vectors):
     """ Takes a list of 2-tuple vectors and performs vector addition,
      returning the resultant 2-tuple vector.
     """
-    resultant = [0, 0]
+    x = y = 0
     for vector in vectors:
-        resultant[0] += vector[0]
-        resultant[1] += vector[1]
-    return tuple(resultant)
+        x += vector[0]
+        y += vector[1]
+    return (x, y)
 
 
 def vector_negate(vector):
@@ -190,13 +233,15 @@ class Body(pygame.sprite.Sprite):
     # Should use floats and keep above ~1.0 to reduce low-acceleration smoothing lag
     G = settings.Settings.G_default
 
-    def __init__(self, surface, position, mass, point_lvls=(), particle=False, rebel_scum=(), velocity=(0, 0)):
+    def __init__(self, surface, position, mass, point_lvls=(), particle=False, rebel_scum=(), velocity=(0, 0),
+                 centroid=None):
         """ Initializes body object. Parameters: surface - pygame surface (returned by load_image), position - 2-tuple
         vector with the body's initial position (top-left corner of surface) in a 1-500 point scale, mass - used to
         calculate gravitation, point_lvls - scores at which info-bits regarding the body are displayed,
         particle - whether or not the body undergoes gravitational acceleration or is stationary,
         rebel_scum - tuple containing strings of all other bodies which do not affect this body's gravitation,
-        velocity - 2-tuple vetor with the body's initial velocity in pixels / game tick (dependent on fps).
+        velocity - 2-tuple vetor with the body's initial velocity in pixels / game tick (dependent on fps),
+        centroid - 2-tuple centroid of the surface's mask, if it's already known.
         """
         pygame.sprite.Sprite.__init__(self)
         self.init_image = surface
@@ -205,40 +250,84 @@ class Body(pygame.sprite.Sprite):
         self.init_position = position
         self.rect.topleft = position
         self.mask = pygame.mask.from_surface(surface)
+        if centroid is None:
+            centroid = self.mask.centroid()
+        self.centroid = centroid
 
         self.rebel_scum = list(rebel_scum)
         self.mass = mass
         # Assumes uniform density, calculating center of mass (com) by a body's geometric centroid:
-        self.init_com = vector_add([self.mask.centroid(), position])
-        self.com = self.init_com
+        self.init_com = (centroid[0] + position[0], centroid[1] + position[1])
+        # The center of mass, velocity and acceleration change in place every physics tick (see vector.py)
+        self.com = vector.Vector(*self.init_com)
         # A rough "radius" based on half the average of the width and height of the body in pixels. Works as a
         # good estimate when the body is a circle, which just barely fits inside a square surface. Not needed
         # to be precise: used for scoring system where points accumulate based on position in a body's gravitational
         # field.
         self.rough_radius = ((surface.get_height() + surface.get_width()) / 2.0) / 2.0
-        # Stores acculated score
-        self.points = 0.0
         # used to display info-bits when it surpasses the values in
         self.point_lvls = []
         if type(point_lvls) == int: self.point_lvls.append(point_lvls)
         else: self.point_lvls = list(point_lvls)
         self.visible = True
         self.particle = particle
-        self.init_velocity = velocity
-        self.velocity = velocity
-        self.acceleration = (0.0, 0.0)
-        self.smoother = [0.0, 0.0]
+        self.init_velocity = tuple(velocity)
+        self.velocity = vector.Vector(*velocity)
+        self.acceleration = vector.Vector()
+        self.smoother = vector.Vector()
+        # Angle of the image in degrees (see angler method)
+        self.angle = 0.0
+        # Center of the rect at the previous physics tick, used to draw the body in between physics ticks, and the
+        # screen rect the body is currently drawn to (None when it isn't onscreen).
+        self.last_center = self.rect.center
+        self.draw_rect = None
+        # The last zoomed copy of self.image, with the image and zoom it was made from
+        self.zoomed = (None, 1.0, None)
 
     def reset_particle(self):
         """ Affective method, resets the body to its initial state.
         """
-        self.points = 0.0
         if self.particle:
             self.rect.topleft = self.init_position
-            self.com = self.init_com
-            self.velocity = self.init_velocity
-            self.acceleration = (0.0, 0.0)
-            self.smoother = [0.0, 0.0]
+            self.com.set(*self.init_com)
+            self.velocity.set(*self.init_velocity)
+            self.acceleration.set(0.0, 0.0)
+            self.smoother.set(0.0, 0.0)
+            self.settle()
+
+    def settle(self):
+        """ Affective method, forgets the body's previous physics tick so it is drawn exactly at its current position.
+        Used whenever the body jumps to a new position.
+        """
+        self.last_center = self.rect.center
+
+    def get_draw_rect(self, alpha):
+        """ Returns a rect for drawing the body at the fraction alpha (0.0 to 1.0) of the way from its previous
+        physics tick to its current one.
+        """
+        draw_rect = self.rect.copy()
+        if alpha < 1.0 and self.last_center != self.rect.center:
+            draw_rect.center = vector_float_to_int((self.last_center[0] + (self.rect.centerx - self.last_center[0]) *
+                                                    alpha, self.last_center[1] + (self.rect.centery -
+                                                                                  self.last_center[1]) * alpha))
+        return draw_rect
+
+    def get_swept_rect(self):
+        """ Returns a rect covering everywhere the body may be drawn before the next physics tick.
+        """
+        last_rect = self.rect.copy()
+        last_rect.center = self.last_center
+        return self.rect.union(last_rect)
+
+    def get_zoomed_image(self, zoom):
+        """ Returns self.image scaled by zoom. The scaled copy is kept until either the image or the zoom changes.
+        """
+        if zoom == 1.0:
+            return self.image
+        if self.zoomed[0] is not self.image or self.zoomed[1] != zoom:
+            size = vector_float_to_int(vector_point_multiply(self.image.get_size(), zoom))
+            self.zoomed = (self.image, zoom, pygame.transform.smoothscale(self.image, size))
+        return self.zoomed[2]
 
     def visify(self):
         """ Changes and returns the new state of self.visible.
@@ -264,53 +353,46 @@ class Body(pygame.sprite.Sprite):
         """ Takes another body object and returns a cartesian 2-tuple vector with the distance in pixels between
         their center of masses.
         """
-        return vector_add([vector_negate(self.com), other.com])
+        return (other.com.x - self.com.x, other.com.y - self.com.y)
 
     def get_gravitational_force(self, other):
         """ Takes another body object and returns a cartesian 2-tuple vector with the gravitational force between them.
         """
-        r, angle = cartesian_to_polar(self.get_seperation(other))
+        x, y = self.get_seperation(other)
+        r_squared = x * x + y * y
+        # Bodies whose centers of mass meet (possible in crowded generated levels) don't pull on each other
+        if r_squared == 0:
+            return (0.0, 0.0)
         # Force is calculated for demonstration purposes, using gravitational acceleration due to each body would be
         # more computationally efficient (see get_acceleration method).
-        # Newton's Universal Law of Gravitation F_g = G * m * M / r ** 2:
-        magnitude = self.G * self.mass * other.mass / float(r ** 2)
-        return polar_to_cartesian((magnitude, angle))
+        # Newton's Universal Law of Gravitation F_g = G * m * M / r ** 2, along the unit vector (x, y) / r:
+        scale = self.G * self.mass * other.mass / (r_squared * math.sqrt(r_squared))
+        return (scale * x, scale * y)
 
     def get_acceleration(self, bodies):
         """ Parameter: bodies - dictionary of all badies with their names as keys and objects as values.
         Returns the net gravitational acceleration cartesian 2-tuple vector of this body.
-        Excludes all rebel bodies - bodies named in self.rebel_scum.
+        Excludes all rebel bodies - bodies named in self.rebel_scum. The game updates every body at once instead, in a
+        single pass over each pair of bodies (see Game.apply_gravity method).
         """
-        forces = []
-        for body in bodies.values():
-            if body != self and body not in self.descumifier(bodies):
-                forces.append(self.get_gravitational_force(body))
         # Net force:
-        magnitude, angle = cartesian_to_polar(vector_add(forces))
+        force_x = force_y = 0.0
+        rebels = self.descumifier(bodies)
+        for body in bodies.values():
+            if body != self and body not in rebels:
+                x, y = self.get_gravitational_force(body)
+                force_x += x
+                force_y += y
         # Newton's Second Law a = F_net / m
-        return polar_to_cartesian((magnitude / float(self.mass), angle))
+        return (force_x / self.mass, force_y / self.mass)
 
     def update_velocity(self, bodies):
         """  Affective method, updates the body's acceleration and updates the body's velocity using discrete
         integration (cumulative sum), if the body is allowed to move.
         """
         if self.particle:
-            self.acceleration = self.get_acceleration(bodies)
-            self.velocity = vector_add([self.velocity, self.acceleration])
-
-    def update_points(self, hero):
-        """ Affective method, updates the body's score, used in a scoring system where points accumulate based on
-        the position of the launchable "hero" (taken as a body object parameter) in this body's gravitational field.
-        The score for each body is used to determine when to reveal info-bits regarding the body.
-        """
-        if self != hero and hero.visible:
-            points = settings.Settings.point_modifier / (cartesian_to_polar(self.get_seperation(hero))[0] -
-                                                         self.rough_radius) ** 2
-            if points > settings.Settings.point_modifier / settings.Settings.point_max_increment_distance ** 2:
-                self.points += \
-                    settings.Settings.point_modifier / settings.Settings.point_max_increment_distance ** 2
-            else:
-                self.points += points
+            self.acceleration.set(*self.get_acceleration(bodies))
+            self.velocity.add(self.acceleration.x, self.acceleration.y)
 
     def move(self):
         """ Affective method, moves the body if it is allowed to move. Includes a smoother, which accumulates when
@@ -318,19 +400,23 @@ class Body(pygame.sprite.Sprite):
         dealing with the issue of rounding and motion by integer number of pixels.
         """
         if self.particle:
-            if round(self.velocity[0]) == 0.0:
-                self.smoother[0] += self.velocity[0]
-            if round(self.velocity[1]) == 0.0:
-                self.smoother[1] += self.velocity[1]
-            x, y = vector_float_to_int(self.velocity)
-            if round(self.smoother[0]) != 0.0:
-                x += vector_float_to_int(self.smoother)[0]
-                self.smoother[0] = 0.0
-            if round(self.smoother[1]) != 0.0:
-                y += vector_float_to_int(self.smoother)[1]
-                self.smoother[1] = 0.0
-            self.rect = self.rect.move(x, y)
-            self.com = vector_add([self.com, (x, y)])
+            self.last_center = self.rect.center
+            velocity = self.velocity
+            smoother = self.smoother
+            x = int(round(velocity.x))
+            y = int(round(velocity.y))
+            if x == 0:
+                smoother.x += velocity.x
+            if round(smoother.x) != 0.0:
+                x += int(round(smoother.x))
+                smoother.x = 0.0
+            if y == 0:
+                smoother.y += velocity.y
+            if round(smoother.y) != 0.0:
+                y += int(round(smoother.y))
+                smoother.y = 0.0
+            self.rect.move_ip(x, y)
+            self.com.add(x, y)
 
     def angler(self, angle):
         """ Affective method, angles the body in the direction of motion, if the body is allowed to move.
@@ -339,18 +425,22 @@ class Body(pygame.sprite.Sprite):
         if self.particle:
             self.image, self.rect = surface_angler(self.init_image, self.rect, angle)
             self.mask = pygame.mask.from_surface(self.image)
-            self.com = vector_add([self.mask.centroid(), self.rect.topleft])
+            self.angle = angle
+            centroid = self.mask.centroid()
+            self.com.set(centroid[0] + self.rect.left, centroid[1] + self.rect.top)
 
     def check_collision(self, other):
         """ Uses pygame mask objects for pixel perfect collision detection, takes another body object, and returns the
         number of pixels overlapping.
         """
-        return self.mask.overlap_area(other.mask, vector_add([vector_negate(self.rect.topleft), other.rect.topleft]))
+        return self.mask.overlap_area(other.mask, (other.rect.left - self.rect.left, other.rect.top - self.rect.top))
 
-    def check_overlap(self, other):
-        """ Uses pygame rect objects to check if two surfaces are overlapping, for clean drawing purposes.
+    def check_rough_collision(self, other):
+        """ Takes another body object, and returns whether or not they're closer than the sum of their rough radii, a
+        cheaper but coarser check than check_collision.
         """
-        return self.rect.colliderect(other.rect)
+        x, y = self.get_seperation(other)
+        return x ** 2 + y ** 2 < (self.rough_radius + other.rough_radius) ** 2
 
 
 class Game:
@@ -361,80 +451,355 @@ class Game:
 
     def __init__(self, screen_size=None):
         """ Initializes the game. Only takes screen size as a tuple parameter, should keep above 400 by 400 pixels.
-        Screen size is set to fullscreen by default. Initialization method.
+        Screen size is set to fullscreen by default. Everything is drawn to self.screen, which is the display itself
+        unless settings.Settings.render_size sets a different internal resolution. The display, font, widgets and
+        scaled images are kept from level to level, see reset_level method. Initialization method.
         """
         pygame.init()
         if not screen_size:
-            self.screen = pygame.display.set_mode((0, 0), FULLSCREEN)
+            self.display = pygame.display.set_mode((0, 0), FULLSCREEN)
         else:
-            self.screen = pygame.display.set_mode(screen_size)
+            self.display = pygame.display.set_mode(screen_size)
+        render_size = settings.Settings.render_size
+        if render_size and tuple(render_size) != self.display.get_size():
+            self.screen = pygame.Surface(render_size).convert()
+            # The largest area of the display with the same shape as the internal screen, centered with black bars
+            scale = min(self.display.get_width() / float(render_size[0]),
+                        self.display.get_height() / float(render_size[1]))
+            self.output_rect = pygame.Rect((0, 0), vector_float_to_int(vector_point_multiply(tuple(render_size),
+                                                                                             scale)))
+            self.output_rect.center = self.display.get_rect().center
+            self.output_surf = self.display.subsurface(self.output_rect)
+            self.display.fill((0, 0, 0))
+        else:
+            self.screen = self.display
+            self.output_rect = self.display.get_rect()
         pygame.display.set_icon(load_image("cassini.png"))
         pygame.display.set_caption("Gravity Well")
         self.lvl = int
         self.clock = pygame.time.Clock()
+        self.camera = camera.Camera(self.screen.get_size())
+        self.update_rects = []
+        self.widgets = widgets.WidgetManager(settings.Settings.widget_cell_size)
+        # Images scaled for the screen, see get_scaled_image method, and the keys of those used by the current level
+        self.images = {}
+        self.level_images = set()
+        self.background_image = None
+        self.background_surf = None
+        # The trails are drawn onto a layer larger than the screen, at the camera's zoom (see draw_trail_layer method),
+        # with the world coordinate at its top-left corner, the zoom it was drawn at and whether it needs redrawing
+        self.trail_layer = None
+        self.trail_origin = (0.0, 0.0)
+        self.trail_zoom = None
+        self.trail_layer_due = True
+        self.g_default = Body.G
+        text_size = int(round(settings.Settings.text_size *
+                                                (self.screen.get_width() * self.screen.get_height())))
+        self.font = pygame.font.Font(None, text_size)
+        # Lowers drawing quality while frames take longer than the time between frames at the max render fps
+        self.governor = governor.FrameGovernor(1000.0 / settings.Settings.render_fps,
+                                               settings.Settings.governor_recover, settings.Settings.governor_frames,
+                                               settings.Settings.governor)
+        # Times sections of each frame while turned on (F3 key), drawn in an overlay with its own small font
+        self.profiler = profiler.FrameProfiler(self, PROFILED_METHODS, settings.Settings.profile_frames,
+                                               (("governor_level", lambda: self.governor.level),))
+        self.profile_font = pygame.font.Font(None, 18)
+        self.profile_rect = pygame.Rect((0, 0), self.profiler.get_overlay_size(self.profile_font, 300, 60))
+        self.profile_rect.bottomright = self.screen.get_rect().bottomright
+        # Adds up the bytes held by surfaces, masks and grids by category, with peaks per level (F5 key writes a report)
+        memory_budget = settings.Settings.memory_budget_kb
+        self.memory = memoryaccount.MemoryAccount(memory_budget and memory_budget * 1024)
+        # Runs the physics ticks of each frame on a thread of their own, while the frame before is shown (see run
+        # method). The method is looked up on every tick, so the frame profiler's timing wrappers are used.
+        if settings.Settings.physics_thread:
+            self.physics = physicsworker.PhysicsWorker(lambda: self.physics_step())
+        else:
+            self.physics = None
+        # Runs blocking work on threads of its own (see tasks.py)
+        if settings.Settings.task_workers:
+            self.executor = tasks.Executor(settings.Settings.task_workers, settings.Settings.task_backlog)
+        else:
+            self.executor = None
+        settings.Settings.point_modifier = settings.Settings.percent_point_modifier * (self.screen.get_width() *
+                                                                               self.screen.get_height())
+        self.pause_widget = TextWidget.TextWidget("PAUSE", settings.Settings.widget_colour, 30, 5)
+        self.reset_widget = TextWidget.TextWidget("RESET", settings.Settings.widget_colour, 30, 5)
+        self.quit_widget = TextWidget.TextWidget("QUIT", settings.Settings.widget_colour, 30, 5)
+        self.start_widget = TextWidget.TextWidget("READY LAUNCH", settings.Settings.widget_colour, 80, 10)
+        self.observe_widget = TextWidget.TextWidget("OBSERVE", settings.Settings.widget_colour, 40, 3)
+        self.launch_widget = TextWidget.TextWidget("LAUNCH", settings.Settings.widget_colour, 40, 3)
+        # How many times faster than normal time goes while flying (see get_time_warp method)
+        self.time_warp = settings.Settings.time_warps[0]
+        self.warp_widget = TextWidget.TextWidget("WARP %dX" % self.time_warp, settings.Settings.widget_colour, 30, 5)
+        self.replay_widgets = []
+        for instant_replays in range(settings.Settings.instant_replays):
+            self.replay_widgets.append(TextWidget.TextWidget("", self.get_replay_colour(instant_replays), 32, 2))
+        self.angle_widget = SliderWidget.SliderWidget(pygame.transform.smoothscale(load_image("slidy_bar.png"),
+            (200, 80)), (420, 40), pygame.Rect(0, 22, 10, 30), (-180.0, 180.0), settings.Settings.widget_colour)
+        self.speed_widget = SliderWidget.SliderWidget(pygame.transform.smoothscale(load_image("slidy_bar.png"),
+            (200, 80)), (650, 40), pygame.Rect(0, 22, 10, 30), (settings.Settings.min_speed,
+                                                                 settings.Settings.max_speed),
+            settings.Settings.widget_colour)
+        self.timeline_widget = SliderWidget.SliderWidget(pygame.transform.smoothscale(load_image("slidy_bar.png"),
+            (400, 80)), (self.screen.get_width() / 2 - 200, self.screen.get_height() - 90), pygame.Rect(0, 22, 10, 30),
+            (0.0, 1.0), settings.Settings.widget_colour)
+        self.layout_widgets()
+        self.reset_level()
+
+    def reset_level(self):
+        """ Clears the bodies and everything else kept for the current level, ready to load the next level (see
+        load_level method) without setting the display up again. Initialization method.
+        """
         self.fps = settings.Settings.fps
-        self.dimmer = dimmer.Dimmer()
+        Body.G = self.g_default
+        # Seconds of real time not yet simulated, and how far the screen is drawn between the last two physics ticks
+        self.tick_pool = 0.0
+        self.interpolation = 1.0
+        # Set when the velocity info needs redrawing, so it's drawn at most once per frame however much input arrives
+        self.velocity_info_due = False
+        # Events taken from the queue while waiting for input, handled first by the next event loop
+        self.waiting_events = []
+        self.dimmer = dimmer.Dimmer(0, self.screen, self.screen_update_all)
         self.bodies = {}
+        # Names of the bodies in the order they were added, indexing the score arrays below and the pairs of bodies
+        # in self.gravity_pairs
+        self.body_order = []
+        # Accumulated score of each body, used in a scoring system where points accumulate based on the position of
+        # the launchable hero in the body's gravitational field
+        self.points = array("d")
+        # Index into its point_lvls of each body's next info-bit not yet shown, and the score which reveals it
+        self.next_facts = array("i")
+        self.next_point_lvls = array("d")
+        # 2-tuples of the body index and fact number of info-bits revealed during the current launch
+        self.facts_due = []
+        # Centers of mass of the hero at the physics ticks run since its trail was last drawn (see finish_ticks method)
+        self.trail_due = []
+        # Pairs of bodies which pull on each other or are scored, worked out again when set to None (see
+        # prepare_gravity method)
+        self.gravity_pairs = None
+        # Precomputed fields of the stationary bodies, each with the indices of the particles they pull, and every
+        # field built for the level so far, by the indices of the stationary bodies it's made of
+        self.gravity_field_groups = []
+        self.gravity_fields = {}
+        # The bodies in self.body_order, with buffers for the x and y of their centers of mass and accelerations, which
+        # apply_gravity fills in place each physics tick (set with the pairs of bodies)
+        self.gravity_bodies = []
+        self.gravity_buffers = ([], [], [], [])
         self.quit_lvl = False
         self.ask = False
         self.real_quit = False
         self.hero = None
         self.target = None
         self.halo_rect_size = None
-        self.update_rects = []
+        self.camera.reset()
+        self.camera.follow = settings.Settings.camera_follow
+        self.camera.changed = False
+        self.launcher_draw_rect = None
         self.info_rects = []
         self.completed_facts = []
-        self.widgets = []
         self.running = True
         self.launch_time = 0
         self.hero_launcher = pygame.Surface
+        self.level_images = set()
         self.angle_hero = (False, 0.0)
         self.atmosphere = False
         self.game_state = "preview"
+        # Flight tick the hero went offscreen at, or 0 while it's onscreen
         self.screen_breakout = 0
-        self.pause_breakout = 0
         self.current_overlap = False
         self.replay = {}
         self.replay_count = 0
         self.q_mode = False
-        self.g_default = Body.G
-        text_size = int(round(settings.Settings.text_size *
-                                                (self.screen.get_width() * self.screen.get_height())))
-        self.font = pygame.font.Font(None, text_size)
-        settings.Settings.point_modifier = settings.Settings.percent_point_modifier * (self.screen.get_width() *
-                                                                               self.screen.get_height())
-        self.pause_widget = TextWidget.TextWidget("PAUSE", settings.Settings.widget_colour, 30, 5)
-        self.reset_widget = TextWidget.TextWidget("RESET", settings.Settings.widget_colour, 30, 5)
-        self.quit_widget = TextWidget.TextWidget("QUIT", settings.Settings.widget_colour, 30, 5)
-        self.start_widget = TextWidget.TextWidget("READY LAUNCH", settings.Settings.widget_colour, 80, 10)
-        self.observe_widget = TextWidget.TextWidget("OBSERVE", settings.Settings.widget_colour, 40, 3)
-        self.launch_widget = TextWidget.TextWidget("LAUNCH", settings.Settings.widget_colour, 40, 3)
-        for instant_replays in range(settings.Settings.instant_replays):
-            var_str = "replay_%i_widget" % instant_replays
-            colour = vector_cap(vector_point_multiply(settings.Settings.widget_colour, vector_point_exponentiate(
-                settings.Settings.replay_colours, instant_replays)), 255)
-            vars(self)[var_str] = TextWidget.TextWidget("", colour, 32, 2)
-        self.angle_widget = SliderWidget.SliderWidget(pygame.transform.smoothscale(load_image("slidy_bar.png"),
-            (200, 80)), (420, 40), pygame.Rect(0, 22, 10, 30), (-180.0, 180.0), settings.Settings.widget_colour)
-        self.speed_widget = SliderWidget.SliderWidget(pygame.transform.smoothscale(load_image("slidy_bar.png"),
-            (200, 80)), (650, 40), pygame.Rect(0, 22, 10, 30), (settings.Settings.min_speed,
-                                                                 settings.Settings.max_speed),
-            settings.Settings.widget_colour)
-        self.set_widgets()
+        # Rockets launched along with the hero in swarm mode (see launch_swarm method), and a list of the screen rect
+        # covering them when they were last drawn (empty when they weren't)
+        self.swarm_mode = False
+        self.swarm = None
+        self.swarm_rects = []
+        # Snapshot of the simulation kept with F6 and restored with F7 (see capture_snapshot method)
+        self.quick_snapshot = None
+        # The current or last flight, recorded tick by tick (see record_tick method), the physics ticks run since
+        # launch, and whether the player is scrubbing through the flight (T key)
+        if settings.Settings.timeline_max_kb:
+            self.timeline = timeline.Timeline(settings.Settings.timeline_keyframe_ticks,
+                                              settings.Settings.timeline_max_kb * 1024)
+        else:
+            self.timeline = None
+        self.flight_tick = 0
+        self.scrubbing = False
+        for replay_widget in self.replay_widgets:
+            replay_widget.text = ""
+        self.layout_reset_widgets()
+        # The widgets are drawn along with the background, when the level starts running
+        for widget in self.widgets:
+            widget.highlight = False
+        self.widgets.set_state(self.game_state)
+        pygame.mouse.set_cursor(*pygame.cursors.arrow)
 
     def draw_background(self):
         """ Draws background.png file as the background. Affective method.
         """
-        self.background_surf = pygame.transform.smoothscale(load_image("background.png"), self.screen.get_size())
+        if not self.background_image:
+            # The background is opaque, so it's kept without an alpha channel, which makes redrawing it much faster
+            self.background_image = pygame.transform.smoothscale(load_image("background.png"),
+                                                                 self.screen.get_size()).convert()
+        # Everything is erased from self.background_surf, which has the trajectory trails drawn onto it.
+        self.background_surf = self.background_image.copy()
+        self.draw_trail_layer()
         self.screen.blit(self.background_surf, (0, 0))
-        pygame.display.update()
+        self.widgets.mark_all_dirty()
+        self.screen_update_all()
+
+    def get_replay_colour(self, index):
+        """ Returns the colour used for the info and trail of the previous attempt at the given index, where 0 is the
+        most recent attempt. Functional method.
+        """
+        return vector_cap(vector_point_multiply(settings.Settings.widget_colour, vector_point_exponentiate(
+            settings.Settings.replay_colours, index)), 255)
+
+    def get_replay_counts(self, latest):
+        """ Returns a list of the keys in self.replay, from the attempt with key latest back to the oldest attempt
+        still kept. Functional method.
+        """
+        real_count_list = range(latest, -1, -1)
+        if (settings.Settings.instant_replays - 1) in self.replay.keys():
+            for index in range((settings.Settings.instant_replays - 1), latest, -1):
+                real_count_list.append(index)
+        return real_count_list
+
+    def draw_trails(self):
+        """ Redraws the trails onto a clean background, then redraws the whole background to the screen (but does not
+        update it). The trail layer is only redrawn when it's due, the camera has zoomed, or the view has moved off
+        it, so moving the camera usually costs a blit rather than redrawing every trail, and the current flight's trail
+        is drawn a segment at a time (see extend_trail method). Affective method.
+        """
+        if self.trail_layer_due or self.trail_zoom != self.camera.zoom or \
+           not self.get_trail_layer_rect().contains(self.camera.screen_rect):
+            self.draw_trail_layer()
+        self.compose_background(self.screen.get_rect())
+        self.screen.blit(self.background_surf, (0, 0))
+        self.update_rects.append(self.screen.get_rect())
+        self.widgets.mark_all_dirty()
+
+    def draw_trail_layer(self):
+        """ Redraws the trails of the previous attempts, and mid-flight the current attempt's trail so far, onto the
+        trail layer at the camera's zoom, centered on the camera's view. The layer reaches
+        settings.Settings.trail_layer_margin of the screen past each edge, so the camera can move that far before the
+        layer is redrawn. It has a palette of the trail colours, so it holds a byte per pixel. Affective method.
+        """
+        margin = settings.Settings.trail_layer_margin
+        if not self.trail_layer:
+            self.trail_layer = pygame.Surface(vector_float_to_int(vector_point_multiply(
+                self.screen.get_size(), (1 + 2 * margin, 1 + 2 * margin))), 0, 8)
+            self.trail_layer.set_palette([(0, 0, 0), settings.Settings.trail_colour] +
+                                         [self.get_replay_colour(index)
+                                          for index in range(settings.Settings.instant_replays)])
+            self.trail_layer.set_colorkey((0, 0, 0))
+        self.trail_zoom = self.camera.zoom
+        self.trail_origin = self.camera.to_world(vector_point_multiply(self.screen.get_size(), (- margin, - margin)))
+        self.trail_layer.fill((0, 0, 0))
+        self.trail_layer_due = False
+        if self.replay and settings.Settings.instant_replays:
+            colours = [self.get_replay_colour(index) for index in range(settings.Settings.instant_replays)]
+            if self.replay_count in self.replay and "collision_body" not in self.replay[self.replay_count]:
+                # Mid-flight, the current attempt's trail so far is redrawn too, ahead of the previous attempts
+                latest = self.replay_count
+                colours.insert(0, settings.Settings.trail_colour)
+            elif self.replay_count:
+                latest = self.replay_count - 1
+            else:
+                latest = (settings.Settings.instant_replays - 1)
+            for real_count, colour in zip(self.get_replay_counts(latest), colours):
+                trail = self.replay[real_count]["trail"]
+                trail.dropped = 0
+                points = trail.get_points()
+                if len(points) > 1:
+                    pygame.draw.lines(self.trail_layer, colour, False,
+                                      [self.get_layer_point(point) for point in points], settings.Settings.trail_width)
+
+    def get_layer_point(self, point):
+        """ Returns the integer coordinate on the trail layer of the 2-tuple world coordinate point. Functional method.
+        """
+        return (int(round((point[0] - self.trail_origin[0]) * self.trail_zoom)),
+                int(round((point[1] - self.trail_origin[1]) * self.trail_zoom)))
+
+    def get_trail_layer_rect(self):
+        """ Returns the screen rect the trail layer covers. Functional method.
+        """
+        if not self.trail_layer:
+            return pygame.Rect(0, 0, 0, 0)
+        return self.trail_layer.get_rect(topleft=self.camera.to_screen(self.trail_origin))
+
+    def compose_background(self, rect):
+        """ Redraws the screen rect of self.background_surf: the background image, with the trail layer over it.
+        Affective method.
+        """
+        self.background_surf.blit(self.background_image, rect, rect)
+        layer_rect = self.get_trail_layer_rect()
+        self.background_surf.blit(self.trail_layer, rect, rect.move(- layer_rect.left, - layer_rect.top))
+
+    def extend_trail(self, point):
+        """ Adds the 2-tuple point, a position of the hero, to the current attempt's trail, drawing any new segment onto
+        the trail layer, the background and the screen (but does not update it). Once the trail has dropped
+        settings.Settings.trail_redraw_dropped points from its start, the trails are redrawn without them. Affective
+        method.
+        """
+        trail = self.replay[self.replay_count]["trail"]
+        # The frame governor cuts trail detail by spacing points further apart
+        trail.spacing = settings.Settings.trail_spacing
+        if self.governor.sparse_trails:
+            trail.spacing *= settings.Settings.governor_trail_factor
+        last = trail.get_last()
+        if trail.add(point) and last and not self.trail_layer_due:
+            layer_rect = self.get_trail_layer_rect()
+            segment_rect = pygame.draw.line(self.trail_layer, settings.Settings.trail_colour,
+                                            self.get_layer_point(last), self.get_layer_point(point),
+                                            settings.Settings.trail_width)
+            segment_rect = segment_rect.move(layer_rect.topleft).clip(self.screen.get_rect())
+            self.compose_background(segment_rect)
+            self.screen.blit(self.background_surf, segment_rect, segment_rect)
+            self.update_rects.append(segment_rect.copy())
+            self.widgets.mark_dirty_in(segment_rect)
+            # Particles are redrawn every frame anyway, but stationary bodies under the new segment need redrawing.
+            for name in self.bodies.keys():
+                if not self.bodies[name].particle and self.bodies[name].draw_rect and \
+                   self.bodies[name].draw_rect.colliderect(segment_rect):
+                    self.draw_body(name)
+        if trail.dropped >= settings.Settings.trail_redraw_dropped:
+            # The whole screen is redrawn by the next frame, as if the camera had moved
+            self.trail_layer_due = True
+            self.camera.changed = True
 
     def screen_update(self):
-        """ Updates necessary parts of the screen. Affective method.
+        """ Updates necessary parts of the screen. When drawing at an internal resolution, the whole internal screen
+        is scaled to the display instead, once per update. Affective method.
         """
-        pygame.display.update(self.update_rects)
+        if self.screen is self.display:
+            pygame.display.update(self.update_rects)
+        elif self.update_rects:
+            pygame.transform.scale(self.screen, self.output_rect.size, self.output_surf)
+            pygame.display.update(self.output_rect)
         self.update_rects = []
 
+    def screen_update_all(self):
+        """ Updates the whole screen. Affective method.
+        """
+        self.update_rects.append(self.screen.get_rect())
+        self.screen_update()
+
+    def get_screen_event(self, event):
+        """ Returns the mouse event with its position converted from the display to the internal screen, or the event
+        itself when drawing at the display's resolution. Functional method.
+        """
+        if self.screen is self.display:
+            return event
+        position = (int((event.pos[0] - self.output_rect.left) * self.screen.get_width() /
+                        float(self.output_rect.width)),
+                    int((event.pos[1] - self.output_rect.top) * self.screen.get_height() /
+                        float(self.output_rect.height)))
+        event_attrib = dict(event.dict)
+        event_attrib["pos"] = position
+        return pygame.event.Event(event.type, event_attrib)
+
     def coordinate_conversion(self, coordinate):
         """ Takes a 2-tuple for a coordinate in a 500x500 screen, and returns a correspondingly converted floated
         value for the current screen. If an int is passed, then it returns floated square coordinates correspondingly
@@ -458,22 +823,91 @@ class Game:
         initial velocity vector (should use floats and keep under (12.0, 12.0) to avoid inconsistent simulations
         caused by large jumps). Initialization method.
         """
-        self.bodies[name] = Body(pygame.transform.smoothscale(load_image(name + ".png"),
-            vector_float_to_int(self.coordinate_conversion(size))),
-            vector_float_to_int(self.coordinate_conversion(position)),
-            (vector_sum(vector_point_exponentiate(size, 2)) * density), point_lvls, particle, rebel_scum, velocity)
+        self.add_body(name, size, position, vector_sum(vector_point_exponentiate(size, 2)) * density, point_lvls,
+                      particle, rebel_scum, velocity)
+
+    def add_body(self, name, size, position, mass, point_lvls=(), particle=False, rebel_scum=(), velocity=(0.0, 0.0),
+                 image=None):
+        """ Creates a body called name with the given mass, otherwise the same as create_body. Optional: image - name of
+        the PNG file used, when it isn't the body's name. Initialization method.
+        """
+        key = (image or name, vector_float_to_int(self.coordinate_conversion(size)))
+        image = self.get_scaled_image(*key)
+        self.bodies[name] = Body(image, vector_float_to_int(self.coordinate_conversion(position)), mass, point_lvls,
+                                 particle, rebel_scum, velocity, self.images[key][1])
+        self.body_order.append(name)
+        self.points.append(0.0)
+        self.next_facts.append(0)
+        self.next_point_lvls.append(0.0)
+        self.set_next_fact(len(self.body_order) - 1)
+        self.gravity_pairs = None
+        self.gravity_fields = {}
+        if self.images[key][1] is None:
+            self.images[key] = (image, self.bodies[name].centroid)
         if name == "earth":
-            self.hero_launcher = pygame.transform.smoothscale(load_image("rocket_launcher_right.png"),
+            self.hero_launcher = self.get_scaled_image("rocket_launcher_right",
                 vector_float_to_int(self.coordinate_conversion(size + 10)))
             self.hero_launcher_rect = self.hero_launcher.get_rect()
             self.hero_launcher_rect.center = self.bodies["earth"].rect.center
 
+    def get_scaled_image(self, name, size):
+        """ Returns the image from the PNG file called name, smoothscaled to the integer 2-tuple size. Scaled images
+        are kept in self.images, with the centroids of the bodies using them, for reuse by this level and any images
+        the next level shares with it (see load_level method). Functional method.
+        """
+        if (name, size) not in self.images:
+            self.images[(name, size)] = (pygame.transform.smoothscale(load_image(name + ".png"), size), None)
+        self.level_images.add((name, size))
+        return self.images[(name, size)][0]
+
+    def load_level(self, level):
+        """ Creates every body in a levelfile.CompiledLevel, and sets the level's target and hero. When the level number
+        is set, its scaled images and centroids are read from the level cache, or else written to it. Initialization
+        method.
+        """
+        path = None
+        cached = {}
+        if settings.Settings.level_cache_dir and type(self.lvl) == int:
+            path = levelcache.get_path(self.lvl, self.screen.get_size(),
+                                       level.images + ["rocket_launcher_right", "halo"])
+            cached = levelcache.read(path)
+            self.images.update(cached)
+        # The packed arrays are unpacked into bodies once here, as the bodies' particle flags and rebel_scum change
+        # during the level (see hero_hide method), and prepare_gravity works the pairs of bodies out from those again
+        for index, name in enumerate(level.names):
+            self.add_body(name, level.get_size(index), level.get_position(index), level.masses[index],
+                          level.get_point_lvls(index), bool(level.particles[index]), level.get_ignored(index),
+                          level.get_velocity(index), level.images[index])
+        self.target = level.target
+        self.hero = level.hero
+        # The halo is scaled now, so it's cached along with the rest of the level (see toggle_halo method)
+        self.get_scaled_image("halo", vector_add([self.bodies[self.target].init_image.get_size(), (10, 10)]))
+        # Builds the fields of the stationary bodies now, rather than at the first physics tick
+        self.prepare_gravity()
+        if path and not self.level_images.issubset(cached):
+            if self.executor:
+                self.executor.call(levelcache.write, path, dict((key, self.images[key]) for key in self.level_images))
+            else:
+                levelcache.write(path, dict((key, self.images[key]) for key in self.level_images))
+        # Scaled images left over from the last level, or prefetched for it, are dropped once this level has taken
+        # those it shares with them, so only one level's images are kept (besides the next level's, once prefetched)
+        for key in set(self.images) - self.level_images:
+            del self.images[key]
+        self.account_memory()
+
     def draw_body(self, name):
-        """ Draws the named body. Affective method.
+        """ Draws the named body through the camera, interpolated between its last two physics ticks by
+        self.interpolation. Bodies which aren't onscreen are skipped. Affective method.
         """
-        if self.bodies[name].visible:
-            self.screen.blit(self.bodies[name].image, self.bodies[name].rect)
-            self.update_rects.append(self.bodies[name].rect.copy())
+        body = self.bodies[name]
+        if body.visible:
+            draw_rect = self.camera.to_screen_rect(body.get_draw_rect(self.interpolation))
+            if draw_rect.colliderect(self.camera.screen_rect):
+                self.screen.blit(body.get_zoomed_image(self.camera.zoom), draw_rect)
+                self.update_rects.append(draw_rect.copy())
+                body.draw_rect = draw_rect
+            else:
+                body.draw_rect = None
 
     def draw_all_bodies(self):
         """ Draws all bodies to the screen and also modifies self.update_rects. Affective method.
@@ -494,9 +928,10 @@ class Game:
     def erase_body(self, name):
         """ Erases the named body. Affective method.
         """
-        if self.bodies[name].visible:
-            self.screen.blit(self.background_surf, self.bodies[name].rect, self.bodies[name].rect)
-            self.update_rects.append(self.bodies[name].rect.copy())
+        if self.bodies[name].visible and self.bodies[name].draw_rect:
+            self.screen.blit(self.background_surf, self.bodies[name].draw_rect, self.bodies[name].draw_rect)
+            self.update_rects.append(self.bodies[name].draw_rect.copy())
+            self.bodies[name].draw_rect = None
 
     def erase_all_bodies(self):
         """ Erases all bodies from the screen and also modifies self.update_rects,
@@ -532,6 +967,7 @@ class Game:
                 self.bodies[name].particle = False
                 for body in self.bodies.values():
                     body.rebel_scum.append(name)
+                self.gravity_pairs = None
 
     def hero_seek(self):
         """ Brings the hero back to the screen and simulation. Affective method.
@@ -542,24 +978,25 @@ class Game:
                 self.bodies[name].particle = True
                 for body in self.bodies.values():
                     body.rebel_scum.remove(name)
+                self.gravity_pairs = None
 
     def toggle_halo(self):
         """ Sets the target halo appropriately, during various game states. Affective method.
         """
         if self.target:
             if not self.halo_rect_size:
-                new_image = pygame.transform.smoothscale(load_image("halo.png"),
-                    vector_add([self.bodies[self.target].init_image.get_rect().size, (10, 10)]))
+                new_image = self.get_scaled_image("halo",
+                    vector_add([self.bodies[self.target].init_image.get_rect().size, (10, 10)])).copy()
                 new_image.blit(self.bodies[self.target].init_image, (5, 5))
                 self.bodies[self.target].image = new_image.copy()
                 self.halo_rect_size = self.bodies[self.target].rect.size
                 self.bodies[self.target].rect.size = vector_add([self.bodies[self.target].init_image.get_rect().size, (10, 10)])
             else:
                 self.bodies[self.target].image = self.bodies[self.target].init_image.copy()
-                self.screen.blit(self.background_surf, self.bodies[self.target].rect, self.bodies[self.target].rect)
-                self.update_rects.append(self.bodies[self.target].rect.copy())
+                self.erase_body(self.target)
                 self.bodies[self.target].rect.size = self.halo_rect_size
                 self.halo_rect_size = None
+            self.account_memory()
 
     def hero_launch_time(self):
         """ Draws the launchable hero to the screen, as it changes angle to match the player's input trajectory.
@@ -567,14 +1004,27 @@ class Game:
         """
         if self.game_state == "reset" and not self.dimmer.get_dim():
             self.erase_all_bodies()
-            self.screen.blit(self.background_surf, self.hero_launcher_rect, self.hero_launcher_rect)
-            self.update_rects.append(self.hero_launcher_rect.copy())
+            self.erase_launcher()
             self.angled_hero_launcher, self.hero_launcher_rect = surface_angler(self.hero_launcher,
                 self.hero_launcher_rect, self.hero_angle)
-            self.screen.blit(self.angled_hero_launcher, self.hero_launcher_rect)
-            self.update_rects.append(self.hero_launcher_rect.copy())
+            draw_rect = self.camera.to_screen_rect(self.hero_launcher_rect)
+            if draw_rect.colliderect(self.camera.screen_rect):
+                if self.camera.zoom == 1.0:
+                    self.screen.blit(self.angled_hero_launcher, draw_rect)
+                else:
+                    self.screen.blit(pygame.transform.smoothscale(self.angled_hero_launcher, draw_rect.size), draw_rect)
+                self.update_rects.append(draw_rect.copy())
+                self.launcher_draw_rect = draw_rect
             self.draw_all_bodies()
 
+    def erase_launcher(self):
+        """ Erases the hero's launcher, if it's onscreen. Affective method.
+        """
+        if self.launcher_draw_rect:
+            self.screen.blit(self.background_surf, self.launcher_draw_rect, self.launcher_draw_rect)
+            self.update_rects.append(self.launcher_draw_rect.copy())
+            self.launcher_draw_rect = None
+
     def draw_info(self, info, position, colour = (255, 255, 255)):
         """ Draws any type of info to the screen (but does not update it). Affective method.
         """
@@ -611,9 +1061,12 @@ class Game:
         """ Draws velocity info and causes related effects. Affective method.
         """
         if self.game_state == "reset":
-            angle = math.degrees(cartesian_to_polar(velocity)[1]) * - 1
+            speed, angle = cartesian_to_polar(velocity)
+            angle = math.degrees(angle) * - 1
             self.angle_widget.value = angle * - 1
-            self.speed_widget.value = cartesian_to_polar(velocity)[0]
+            self.speed_widget.value = speed
+            self.widgets.mark_dirty(self.angle_widget)
+            self.widgets.mark_dirty(self.speed_widget)
             if round(angle, 1) == - 0.0:
                 angle = 0.0
             if angle < 0:
@@ -622,7 +1075,7 @@ class Game:
             self.draw_info("Angle: %3.0f" % angle,
                 ((self.screen.get_width() / 2) - settings.Settings.vel_info_x_gap -
                  settings.Settings.vel_info_angle_width, settings.Settings.vel_info_y_down))
-            self.draw_info("Speed: %3.1f" % (cartesian_to_polar(velocity)[0]),
+            self.draw_info("Speed: %3.1f" % speed,
                 ((self.screen.get_width() / 2) + settings.Settings.vel_info_x_gap, settings.Settings.vel_info_y_down))
             if self.replay and settings.Settings.instant_replays:
                 self.draw_info("Previous Attempts:", settings.Settings.previous_attempts_info_pos)
@@ -640,87 +1093,85 @@ class Game:
         for widget in self.widgets:
             self.update_rects.append(widget.erase(self.screen, self.background_surf).copy())
 
-    def set_widgets(self):
-        """ Puts all widgets onscreen for the appropriate game state. Affective method.
+    def layout_widgets(self):
+        """ Works out where every widget goes in each widget state: the game states, plus "preview_paused",
+        "action_paused", "reset_paused", "ask" (when asking whether to go to the next level) and "scrub" (when
+        scrubbing through a flight). Initialization method.
+        """
+        screen_rect = self.screen.get_rect()
+        pause_pos = (settings.Settings.pause_reset_info_x, screen_rect.bottom - settings.Settings.pause_info_y_up)
+        reset_pos = (pause_pos[0], pause_pos[1] + self.pause_widget.rect.height + settings.Settings.y_info_gap)
+        # When paused, the quit widget takes the reset widget's place and the widgets above it move up to make room
+        quit_gap = settings.Settings.y_info_gap + self.quit_widget.rect.height
+        start_rect = self.start_widget.rect.copy()
+        start_rect.center = screen_rect.center
+        observe_pos = (screen_rect.right - settings.Settings.observe_launch_info_x,
+                       settings.Settings.observe_info_y_down)
+        self.widget_positions = {"pause": pause_pos, "reset": reset_pos, "pause_up": (pause_pos[0], pause_pos[1] -
+                                 quit_gap), "reset_up": (reset_pos[0], reset_pos[1] - quit_gap), "start":
+                                 start_rect.topleft, "observe": observe_pos, "launch": (observe_pos[0], observe_pos[1] +
+                                 self.observe_widget.rect.height + settings.Settings.y_info_gap)}
+        self.widgets.add_set("preview", [(self.pause_widget, pause_pos), (self.reset_widget, reset_pos),
+                                         (self.start_widget, start_rect.topleft),
+                                         (self.warp_widget, self.widget_positions["pause_up"])])
+        self.widgets.add_set("action", [(self.pause_widget, pause_pos), (self.reset_widget, reset_pos),
+                                        (self.warp_widget, self.widget_positions["pause_up"])])
+        for game_state in ("preview", "action"):
+            self.widgets.add_set(game_state + "_paused", [(self.pause_widget, self.widget_positions["pause_up"]),
+                                                          (self.reset_widget, self.widget_positions["reset_up"]),
+                                                          (self.quit_widget, reset_pos)])
+        self.widgets.add_set("reset_paused", [(self.pause_widget, self.widget_positions["reset_up"]),
+                                              (self.quit_widget, reset_pos)])
+        self.widgets.add_set("ask", [(self.quit_widget, reset_pos)])
+        self.widgets.add_set("scrub", [(self.pause_widget, pause_pos), (self.reset_widget, reset_pos),
+                                       (self.timeline_widget, None)])
+        self.layout_reset_widgets()
+
+    def layout_reset_widgets(self):
+        """ Works out the widgets for the reset state, which include the info for each previous attempt that has
+        any. Needs to be called again whenever the previous attempts change. Affective method.
+        """
+        placements = [(self.pause_widget, self.widget_positions["reset"]),
+                      (self.observe_widget, self.widget_positions["observe"]),
+                      (self.launch_widget, self.widget_positions["launch"]), (self.angle_widget, None),
+                      (self.speed_widget, None)]
+        left, top = vector_add([settings.Settings.previous_attempts_info_pos,
+                                settings.Settings.replay_info_relative_pos])
+        for replay_widget in self.replay_widgets:
+            if replay_widget.text:
+                placements.append((replay_widget, (left, top)))
+            top += replay_widget.rect.height + settings.Settings.y_info_gap
+        self.widgets.add_set("reset", placements)
+
+    def set_widgets(self, widget_state=None):
+        """ Puts all widgets onscreen for the given widget state (see layout_widgets method), or for the current
+        game state by default. Affective method.
         """
         for widget in self.widgets:
             widget.highlight = False
         self.erase_all_widgets()
-        if self.game_state == "preview":
-            self.pause_widget.rect.topleft = (settings.Settings.pause_reset_info_x,
-                                              self.screen.get_rect().bottom - settings.Settings.pause_info_y_up)
-            self.reset_widget.rect.topleft = (settings.Settings.pause_reset_info_x,
-                                              self.pause_widget.rect.bottom + settings.Settings.y_info_gap)
-            self.start_widget.rect.center = self.screen.get_rect().center
-            if self.observe_widget in self.widgets:
-                self.widgets.remove(self.observe_widget)
-            if self.launch_widget in self.widgets:
-                self.widgets.remove(self.launch_widget)
-            if self.angle_widget in self.widgets:
-                self.widgets.remove(self.angle_widget)
-            if self.speed_widget in self.widgets:
-                self.widgets.remove(self.speed_widget)
-            for instant_replays in range(settings.Settings.instant_replays):
-                var_str = "replay_%i_widget" % instant_replays
-                if vars(self)[var_str] in self.widgets:
-                    self.widgets.remove(vars(self)[var_str])
-            if not self.pause_widget in self.widgets:
-                self.widgets.append(self.pause_widget)
-            if not self.reset_widget in self.widgets:
-                self.widgets.append(self.reset_widget)
-            if not self.start_widget in self.widgets:
-                self.widgets.append(self.start_widget)
-        if self.game_state == "reset":
-            self.observe_widget.rect.topleft = (self.screen.get_rect().right - settings.Settings.observe_launch_info_x,
-                                                settings.Settings.observe_info_y_down)
-            self.launch_widget.rect.topleft = (self.screen.get_rect().right - settings.Settings.observe_launch_info_x,
-                                               self.observe_widget.rect.bottom + settings.Settings.y_info_gap)
-            self.pause_widget.rect.topleft = self.reset_widget.rect.copy().topleft
-            for instant_replays in range(settings.Settings.instant_replays):
-                var_str = "replay_%i_widget" % instant_replays
-                if not instant_replays:
-                    vars(self)[var_str].rect.topleft = vector_add([settings.Settings.previous_attempts_info_pos,
-                                                                   settings.Settings.replay_info_relative_pos])
-                else:
-                    vars(self)[var_str].rect.left = self.replay_0_widget.rect.left
-                    var_str_last = "replay_%i_widget" % (instant_replays - 1)
-                    vars(self)[var_str].rect.top = vars(self)[var_str_last].rect.bottom + settings.Settings.y_info_gap
-            if self.reset_widget in self.widgets:
-                self.widgets.remove(self.reset_widget)
-            if self.start_widget in self.widgets:
-                self.widgets.remove(self.start_widget)
-            if not self.observe_widget in self.widgets:
-                self.widgets.append(self.observe_widget)
-            if not self.launch_widget in self.widgets:
-                self.widgets.append(self.launch_widget)
-            if not self.angle_widget in self.widgets:
-                self.widgets.append(self.angle_widget)
-            if not self.speed_widget in self.widgets:
-                self.widgets.append(self.speed_widget)
-            for instant_replays in range(settings.Settings.instant_replays):
-                var_str = "replay_%i_widget" % instant_replays
-                if not vars(self)[var_str] in self.widgets and vars(self)[var_str].text:
-                    self.widgets.append(vars(self)[var_str])
-        if self.game_state == "action":
-            self.pause_widget.rect.topleft = (settings.Settings.pause_reset_info_x,
-                                              self.screen.get_rect().bottom - settings.Settings.pause_info_y_up)
-            if self.observe_widget in self.widgets:
-                self.widgets.remove(self.observe_widget)
-            if self.launch_widget in self.widgets:
-                self.widgets.remove(self.launch_widget)
-            if self.angle_widget in self.widgets:
-                self.widgets.remove(self.angle_widget)
-            if self.speed_widget in self.widgets:
-                self.widgets.remove(self.speed_widget)
-            for instant_replays in range(settings.Settings.instant_replays):
-                var_str = "replay_%i_widget" % instant_replays
-                if vars(self)[var_str] in self.widgets:
-                    self.widgets.remove(vars(self)[var_str])
-            if not self.reset_widget in self.widgets:
-                self.widgets.append(self.reset_widget)
+        self.widgets.set_state(widget_state or self.game_state)
         pygame.mouse.set_cursor(*pygame.cursors.arrow)
         self.draw_all_widgets()
 
+    def erase_dirty_widgets(self):
+        """ Erases all widgets that need redrawing, including any a body has been or is about to be drawn over (but
+        does not update the screen). Affective method.
+        """
+        for rect in self.get_onscreen_rects():
+            self.widgets.mark_dirty_in(rect)
+        if self.launcher_draw_rect:
+            self.widgets.mark_dirty_in(self.launcher_draw_rect)
+        for widget in self.widgets.get_dirty():
+            self.update_rects.append(widget.erase(self.screen, self.background_surf).copy())
+
+    def draw_dirty_widgets(self):
+        """ Draws all widgets that need redrawing (but does not update the screen). Affective method.
+        """
+        for widget in self.widgets.get_dirty():
+            self.update_rects.append(widget.draw(self.screen).copy())
+        self.widgets.clean()
+
     def draw_fact(self, factname):
         """ Displays an info-bit on the screen. Affective method.
         """
@@ -729,59 +1180,105 @@ class Game:
         self.screen.blit(fact_surface, fact_rect)
         self.update_rects.append(fact_rect.copy())
         self.screen_update()
+        self.account_memory([("facts", fact_surface)])
         click_to_continue()
         self.screen.blit(self.background_surf, fact_rect, fact_rect)
         self.update_rects.append(fact_rect.copy())
 
+    def get_factname(self, index, fact):
+        """ Returns the name of the info-bit numbered fact of the body at index in self.body_order. Functional method.
+        """
+        return "fact_lvl_%d_%s_%d" % (self.lvl, self.body_order[index], fact)
+
+    def set_next_fact(self, index, fact=0):
+        """ Sets the next info-bit of the body at index in self.body_order to the first not yet shown from fact
+        onwards, along with the score which reveals it (infinite when there are none left). Affective method.
+        """
+        point_lvls = self.bodies[self.body_order[index]].point_lvls
+        while fact < len(point_lvls) and self.get_factname(index, fact) in self.completed_facts:
+            fact += 1
+        self.next_facts[index] = fact
+        self.next_point_lvls[index] = point_lvls[fact] if fact < len(point_lvls) else float("inf")
+
+    def reach_facts(self, index):
+        """ Queues every info-bit of the body at index in self.body_order which its score has just surpassed, to be
+        shown by reward_facts. Only called when the score passes self.next_point_lvls. Affective method.
+        """
+        while self.points[index] > self.next_point_lvls[index]:
+            self.facts_due.append((index, self.next_facts[index]))
+            self.set_next_fact(index, self.next_facts[index] + 1)
+
     def reward_facts(self):
         """ Shows the player info-bits regarding certain bodies whose accumulated score (based on the launchable
-        hero's position in their gravitational field) surpasses the score levels set in body.point_lvls.
+        hero's position in their gravitational field) surpassed the score levels set in body.point_lvls during the
+        launch, then resets every score.
         """
-        for body_name in self.bodies.keys():
-            for index, point_lvl in enumerate(self.bodies[body_name].point_lvls):
-                if self.bodies[body_name].points > point_lvl:
-                    factname = "fact_lvl_%d_%s_%d" % (self.lvl, body_name, index)
-                    if not factname in self.completed_facts:
-                        self.draw_fact(factname)
-                        self.completed_facts.append(factname)
+        for index, fact in self.facts_due:
+            factname = self.get_factname(index, fact)
+            if not factname in self.completed_facts:
+                self.draw_fact(factname)
+                self.completed_facts.append(factname)
+        self.facts_due = []
+        for index in range(len(self.body_order)):
+            self.points[index] = 0.0
+            self.set_next_fact(index)
 
     def check_all_collisions(self):
         """ Returns a dictionary where the keys are 2-tuples of colliding (visible) bodies, and the values are the
-        number of pixels involved in the collision. Functional method.
+        number of pixels involved in the collision. While the frame governor has lowered quality to coarse collisions,
+        bodies collide when their rough radii overlap instead, with a value of 1. Functional method.
         """
         collision_status = {}
         body_list = self.bodies.items()
+        coarse = self.governor.coarse_collisions
         for index in range(len(body_list)):
             for inceptiondex in range(index + 1, len(body_list)):
-                collision_area = body_list[index][1].check_collision(body_list[inceptiondex][1])
+                if coarse:
+                    collision_area = int(body_list[index][1].check_rough_collision(body_list[inceptiondex][1]))
+                else:
+                    collision_area = body_list[index][1].check_collision(body_list[inceptiondex][1])
                 if collision_area != 0 and (body_list[index][1].particle or body_list[inceptiondex][1].particle) \
                 and body_list[index][1].visible and body_list[inceptiondex][1].visible:
                     collision_status[(body_list[index][0], body_list[inceptiondex][0])] = collision_area
         return collision_status
 
+    def get_onscreen_rects(self):
+        """ Returns a list of screen rects for the onscreen bodies, each covering everywhere the body was drawn or may
+        be drawn before the next physics tick. Functional method.
+        """
+        rect_list = []
+        for body in self.bodies.values():
+            if body.visible:
+                rect = self.camera.to_screen_rect(body.get_swept_rect())
+                if body.draw_rect:
+                    rect.union_ip(body.draw_rect)
+                if rect.colliderect(self.camera.screen_rect):
+                    rect_list.append(rect)
+        return rect_list
+
     def check_all_overlap(self):
-        """ Returns true if any body.rects or widget.rects are overlapping, false otherwise. Functional method.
+        """ Returns true if any onscreen body.rects or widget.rects are overlapping, false otherwise. Functional method.
         """
         overlap = False
-        body_list = self.bodies.values()
-        for index in range(len(body_list)):
-            for inceptiondex in range(index + 1, len(body_list)):
-                if body_list[index].visible and body_list[inceptiondex].visible:
-                    overlap = overlap or body_list[index].check_overlap(body_list[inceptiondex])
-        for body in body_list:
-            for widget in self.widgets:
-                overlap = overlap or widget.rect.colliderect(body.rect)
+        rect_list = self.get_onscreen_rects()
+        for index in range(len(rect_list)):
+            for inceptiondex in range(index + 1, len(rect_list)):
+                overlap = overlap or rect_list[index].colliderect(rect_list[inceptiondex])
+        for rect in rect_list:
+            for widget in self.widgets.get_widgets_in(rect):
+                overlap = overlap or widget.rect.colliderect(rect)
         return overlap
 
     def special_collision(self):
-        """ Used to check if hero crashes, if so, resets. Affective and functional method.
+        """ Used to check if hero crashes, returning the name of the body it crashed into, or None. Also notes whether
+        the hero reached the target, or left the atmosphere. Affective and functional method.
         """
         collision = self.check_all_collisions().keys()
         if (self.get_hero(), self.target) in collision or (self.target, self.get_hero()) in collision:
             self.quit_lvl = True
         if self.atmosphere and (not ((("earth", self.get_hero()) in collision) or ((self.get_hero(),
                                                                                     "earth") in collision))
-                                or cartesian_to_polar(self.bodies[self.get_hero()].velocity)[0] <=
+                                or self.bodies[self.get_hero()].velocity.get_magnitude() <=
                                 settings.Settings.min_escape_speed):
             self.atmosphere = False
         if not self.atmosphere and self.get_time() >= settings.Settings.max_escape_well_time:
@@ -791,51 +1288,63 @@ class Game:
                         collision_body = body_pair[1]
                     else:
                         collision_body = body_pair[0]
-                    self.replay[self.replay_count]["collision_body"] = collision_body
-                    self.replay[self.replay_count]["time"] = self.get_time()
-                    self.draw_all_bodies()
-                    if not self.quit_lvl:
-                        self.dimmer.dim(settings.Settings.shade_of_death, settings.Settings.colour_of_death)
-                        pygame.time.delay(settings.Settings.crash_delay)
-                    self.reset_all()
-                    return True
-            return False
+                    return collision_body
+        return None
 
-    def escape_wellist(self):
-        """ Resets the game if the hero has been offscreen for settings.Settings.offscreen_reset_time.
+    def crash(self, collision_body):
+        """ Records the hero crashing into the body named collision_body, and shows the crash before resetting.
         Affective method.
         """
+        self.replay[self.replay_count]["collision_body"] = collision_body
+        self.replay[self.replay_count]["time"] = self.get_time()
+        self.erase_all_bodies()
+        self.interpolation = 1.0
+        self.draw_all_bodies()
+        if not self.quit_lvl:
+            self.dimmer.dim(settings.Settings.shade_of_death, settings.Settings.colour_of_death)
+            self.account_memory()
+            pygame.time.delay(settings.Settings.crash_delay)
+        self.reset_all()
+
+    def check_breakout(self):
+        """ Notes the flight tick the hero goes offscreen at, speeding time up to at least
+        settings.Settings.offscreen_time_warp while it's offscreen (see get_time_warp method), and forgets it once the
+        hero is back. Returns whether or not the hero has been offscreen for settings.Settings.offscreen_reset_time
+        seconds of game time, counted in physics ticks so the time warp doesn't change it. Affective and functional
+        method.
+        """
         hero = self.bodies[self.get_hero()]
         if hero.visible:
             if hero.com[0] < 0 or hero.com[0] > self.screen.get_width() or hero.com[1] < 0 or \
                hero.com[1] > self.screen.get_height():
                 if not self.screen_breakout:
-                    self.screen_breakout = time.time()
-                    self.fps *= 2
-                if self.screen_breakout and \
-                   time.time() - self.screen_breakout > settings.Settings.offscreen_reset_time:
-                    self.fps /= 2
-                    self.screen_breakout = 0
-                    self.replay[self.replay_count]["collision_body"] = "escaped"
-                    self.replay[self.replay_count]["time"] = self.get_time()
-                    info = "You have been unable to gather data for %i seconds. Mission Failed. Click to Continue" % \
-                           settings.Settings.offscreen_reset_time
-                    self.draw_info(info, get_center(self.screen.get_size(), self.get_text_size(info)))
-                    self.screen_update()
-                    self.dimmer.dim(settings.Settings.shade_of_death, settings.Settings.colour_of_death)
-                    click_to_continue()
-                    self.reset_all()
-            elif not (hero.com[0] < 0 or hero.com[0] > self.screen.get_width() or hero.com[1] < 0 or
-                      hero.com[1] > self.screen.get_height()) and self.screen_breakout:
-                self.fps /= 2
+                    self.screen_breakout = self.flight_tick
+                return self.flight_tick - self.screen_breakout > \
+                    settings.Settings.offscreen_reset_time * settings.Settings.fps
+            elif self.screen_breakout:
                 self.screen_breakout = 0
+        return False
+
+    def escape_wellist(self):
+        """ Resets the game once the hero has been offscreen for too long (see check_breakout method). Affective
+        method.
+        """
+        self.screen_breakout = 0
+        self.replay[self.replay_count]["collision_body"] = "escaped"
+        self.replay[self.replay_count]["time"] = self.get_time()
+        info = "You have been unable to gather data for %i seconds. Mission Failed. Click to Continue" % \
+               settings.Settings.offscreen_reset_time
+        self.draw_info(info, get_center(self.screen.get_size(), self.get_text_size(info)))
+        self.screen_update()
+        self.dimmer.dim(settings.Settings.shade_of_death, settings.Settings.colour_of_death)
+        self.account_memory()
+        click_to_continue()
+        self.reset_all()
 
     def possible_quit_lvl(self):
         """ Asks the player if they want to go to the next level, or quit. Affective method.
         """
         if self.quit_lvl and not self.ask:
-            self.widgets.remove(self.pause_widget)
-            self.update_rects.append(self.pause_widget.erase(self.screen, self.background_surf).copy())
             self.pause()
             if self.lvl == (settings.Settings.total_lvls - 1):
                 info = "Success! You've beaten the game! Do you want to quit? (y for yes/n for no)"
@@ -852,28 +1361,30 @@ class Game:
         if self.game_state != "reset":
             if self.dimmer.get_dim():
                 self.dimmer.undim()
+            self.scrubbing = False
+            self.erase_swarm()
+            self.swarm = None
             self.erase_all_bodies()
-            self.screen.blit(self.background_surf, self.hero_launcher_rect, self.hero_launcher_rect)
-            self.update_rects.append(self.hero_launcher_rect.copy())
+            self.erase_launcher()
             self.erase_all_info()
             if self.replay and self.game_state == "action" and self.launch_time:
                 if not "collision_body" in self.replay[self.replay_count].keys():
                     self.replay[self.replay_count]["collision_body"] = "reset"
                     self.replay[self.replay_count]["time"] = self.get_time()
-                real_count_list = range(self.replay_count, -1, -1)
-                if (settings.Settings.instant_replays - 1) in self.replay.keys():
-                    for index in range((settings.Settings.instant_replays - 1), self.replay_count, -1):
-                        real_count_list.append(index)
-                for real_count, instant_replays in zip(real_count_list, range(settings.Settings.instant_replays)):
-                    var_str = "replay_%i_widget" % instant_replays
-                    vars(self)[var_str].text = "%s: %4.2f seconds" % (self.replay[real_count]["collision_body"].upper(),
-                                               self.replay[real_count]["time"])
+                real_count_list = self.get_replay_counts(self.replay_count)
+                for real_count, replay_widget in zip(real_count_list, self.replay_widgets):
+                    replay_widget.text = "%s: %4.2f seconds" % (self.replay[real_count]["collision_body"].upper(),
+                                                                self.replay[real_count]["time"])
+                self.layout_reset_widgets()
                 if self.replay_count < (settings.Settings.instant_replays - 1):
                     self.replay_count += 1
                 else:
                     self.replay_count = 0
+                self.trail_layer_due = True
+                self.draw_trails()
             Body.G = self.g_default
-            self.fps = settings.Settings.fps
+            self.screen_breakout = 0
+            self.set_warp_widget()
             self.erase_all_widgets()
             pygame.mouse.set_cursor(*pygame.cursors.arrow)
             self.reward_facts()
@@ -888,12 +1399,6 @@ class Game:
                 self.game_state = "reset"
             elif self.game_state == "preview":
                 self.running = True
-            if self.quit_widget in self.widgets:
-                self.erase_all_widgets()
-                self.pause_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                self.reset_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                self.widgets.remove(self.quit_widget)
-                self.update_rects.append(self.quit_widget.erase(self.screen, self.background_surf).copy())
             if not self.quit_lvl:
                 self.set_widgets()
             self.draw_all_bodies()
@@ -901,72 +1406,38 @@ class Game:
             self.screen_update()
 
     def pause(self):
-        """ Pauses and unpauses the game in all game states. Affective method.
+        """ Pauses and unpauses the game in all game states, carrying on from any tick scrubbed to first. Affective
+        method.
         """
-        self.set_widgets()
+        if self.scrubbing:
+            self.toggle_scrub()
+        if self.quit_lvl:
+            paused_widget_state = "ask"
+        else:
+            paused_widget_state = self.game_state + "_paused"
         if self.game_state != "reset":
             if self.running:
-                if self.screen_breakout:
-                    self.pause_breakout = time.time()
-                if self.start_widget in self.widgets:
-                    self.widgets.remove(self.start_widget)
-                    self.update_rects.append(self.start_widget.erase(self.screen, self.background_surf).copy())
-                if not self.quit_widget in self.widgets:
-                    self.erase_all_widgets()
-                    self.quit_widget.rect.topleft = self.reset_widget.rect.topleft
-                    self.pause_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height) * -1)
-                    self.reset_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height) * -1)
-                    self.widgets.append(self.quit_widget)
+                self.set_widgets(paused_widget_state)
                 self.draw_all_bodies()
                 self.dimmer.dim()
+                self.account_memory()
+                self.widgets.mark_all_dirty()
                 self.running = False
             else:
-                if self.screen_breakout and self.pause_breakout:
-                    self.screen_breakout += time.time() - self.pause_breakout
                 self.dimmer.undim()
-                if self.quit_widget in self.widgets:
-                    self.widgets.remove(self.quit_widget)
-                    self.update_rects.append(self.quit_widget.erase(self.screen, self.background_surf).copy())
-                    self.pause_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                    self.reset_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                    self.set_widgets()
+                self.set_widgets()
                 self.running = True
         else:
             if not self.dimmer.get_dim():
-                if self.observe_widget in self.widgets:
-                    self.widgets.remove(self.observe_widget)
-                    self.update_rects.append(self.observe_widget.erase(self.screen, self.background_surf).copy())
-                if self.launch_widget in self.widgets:
-                    self.widgets.remove(self.launch_widget)
-                    self.update_rects.append(self.launch_widget.erase(self.screen, self.background_surf).copy())
-                if self.angle_widget in self.widgets:
-                    self.widgets.remove(self.angle_widget)
-                    self.update_rects.append(self.angle_widget.erase(self.screen, self.background_surf).copy())
-                if self.speed_widget in self.widgets:
-                    self.widgets.remove(self.speed_widget)
-                    self.update_rects.append(self.speed_widget.erase(self.screen, self.background_surf).copy())
-                for instant_replays in range(settings.Settings.instant_replays):
-                    var_str = "replay_%i_widget" % instant_replays
-                    if vars(self)[var_str] in self.widgets:
-                        self.widgets.remove(vars(self)[var_str])
-                        self.update_rects.append(vars(self)[var_str].erase(self.screen, self.background_surf).copy())
+                self.set_widgets(paused_widget_state)
                 self.erase_all_info()
-                if not self.quit_widget in self.widgets:
-                    self.erase_all_widgets()
-                    self.quit_widget.rect.topleft = self.reset_widget.rect.topleft
-                    self.pause_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height) * -1)
-                    self.reset_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height) * -1)
-                    self.widgets.append(self.quit_widget)
                 self.draw_all_bodies()
                 self.dimmer.dim()
+                self.account_memory()
+                self.widgets.mark_all_dirty()
             else:
                 self.dimmer.undim()
-                if self.quit_widget in self.widgets:
-                    self.erase_all_widgets()
-                    self.pause_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                    self.reset_widget.rect.move_ip(0, (settings.Settings.y_info_gap + self.quit_widget.rect.height))
-                    self.widgets.remove(self.quit_widget)
-                    self.update_rects.append(self.quit_widget.erase(self.screen, self.background_surf).copy())
+                self.set_widgets()
                 self.draw_velocity_info(self.bodies[self.get_hero()].velocity)
 
     def observe(self):
@@ -989,29 +1460,41 @@ class Game:
         """ Sets the game state to "action", where the launch trajectory is simulated. Affective method.
         """
         if self.game_state == "reset":
-            self.screen.blit(self.background_surf, self.hero_launcher_rect, self.hero_launcher_rect)
-            self.update_rects.append(self.hero_launcher_rect.copy())
+            self.erase_launcher()
             self.bodies[self.get_hero()].angler(self.hero_angle)
             x, y = vector_add([vector_negate(self.bodies[self.get_hero()].rect.center), vector_add(
                 [self.angled_hero_launcher.get_bounding_rect().copy().center, self.hero_launcher_rect.copy().topleft])])
             self.bodies[self.get_hero()].rect.move_ip(x, y)
-            self.bodies[self.get_hero()].com = vector_add([self.bodies[self.get_hero()].com, (x, y)])
+            self.bodies[self.get_hero()].com.add(x, y)
+            self.bodies[self.get_hero()].settle()
             self.hero_seek()
             self.toggle_halo()
             self.running = True
             self.launch_time = time.time()
             self.erase_all_info()
             self.replay[self.replay_count] = {}
-            self.replay[self.replay_count]["velocity"] = self.bodies[self.get_hero()].velocity
+            self.replay[self.replay_count]["velocity"] = self.bodies[self.get_hero()].velocity.get_tuple()
+            self.replay[self.replay_count]["trail"] = trails.Trail(settings.Settings.trail_points,
+                                                                   settings.Settings.trail_spacing)
+            self.replay[self.replay_count]["trail"].add(self.bodies[self.get_hero()].com.get_tuple())
+            if self.swarm_mode:
+                self.launch_swarm()
             self.game_state = "action"
+            # A new flight starts a new timeline, unless the last one is being scrubbed through (see toggle_scrub)
+            if not self.scrubbing:
+                self.flight_tick = 0
+                if self.timeline:
+                    self.timeline.clear()
+                    self.timeline.add_keyframe(0, self.get_snapshot())
             self.set_widgets()
             self.draw_all_bodies()
 
     def get_time(self):
-        """ Returns the current time since launch in seconds.
+        """ Returns the current time since launch in seconds of game time: the physics ticks run since launch at
+        settings.Settings.fps, so time warp speeds it up, and pausing or dropped ticks don't. Functional method.
         """
         if self.launch_time:
-            return time.time() - self.launch_time
+            return self.flight_tick / float(settings.Settings.fps)
         else:
             return 0
 
@@ -1020,29 +1503,23 @@ class Game:
         """
         if self.game_state == "reset":
             hero = self.bodies[self.get_hero()]
+            speed = hero.velocity.get_magnitude()
+            angle = hero.velocity.get_angle()
             if arrow == K_UP:
-                if cartesian_to_polar(hero.velocity)[0] < settings.Settings.max_speed:
-                    hero.velocity = polar_to_cartesian((cartesian_to_polar(hero.velocity)[0] +
-                                                     settings.Settings.speed_modifier,
-                                                     cartesian_to_polar(hero.velocity)[1]))
+                if speed < settings.Settings.max_speed:
+                    hero.velocity.set_polar(speed + settings.Settings.speed_modifier, angle)
             elif arrow == K_DOWN:
-                if cartesian_to_polar(hero.velocity)[0] > settings.Settings.min_speed:
-                    hero.velocity = polar_to_cartesian((cartesian_to_polar(hero.velocity)[0] -
-                                                     settings.Settings.speed_modifier,
-                                                     cartesian_to_polar(hero.velocity)[1]))
+                if speed > settings.Settings.min_speed:
+                    hero.velocity.set_polar(speed - settings.Settings.speed_modifier, angle)
             elif arrow == K_RIGHT:
-                hero.velocity = polar_to_cartesian((cartesian_to_polar(hero.velocity)[0],
-                                                 cartesian_to_polar(hero.velocity)[1] +
-                                                 math.radians(settings.Settings.angle_modifier)))
+                hero.velocity.set_polar(speed, angle + math.radians(settings.Settings.angle_modifier))
             elif arrow == K_LEFT:
-                hero.velocity = polar_to_cartesian((cartesian_to_polar(hero.velocity)[0],
-                                                 cartesian_to_polar(hero.velocity)[1] -
-                                                 math.radians(settings.Settings.angle_modifier)))
-            self.draw_velocity_info(hero.velocity)
+                hero.velocity.set_polar(speed, angle - math.radians(settings.Settings.angle_modifier))
+            self.velocity_info_due = True
 
-    def event_loop(self):
-        """ Main event loop, which takes all user input: both keyboard input, and mouse input - interacting with
-        the onscreen widgets. Affective method.
+    def held_keys(self):
+        """ Takes input from keys being held down, once per physics tick so that the rate of change doesn't depend on
+        the fps. Affective method.
         """
         keystate = pygame.key.get_pressed()
         if keystate[K_UP] and not (keystate[K_LCTRL] or keystate[K_RCTRL]):
@@ -1059,16 +1536,38 @@ class Game:
         if keystate[K_DOWN] and self.q_mode and self.running and self.game_state == "action":
             if Body.G > settings.Settings.g_min:
                 Body.G -= settings.Settings.g_modifier
-        for event in pygame.event.get():
+        if self.scrubbing and keystate[K_RIGHT] != keystate[K_LEFT]:
+            self.seek_timeline(self.flight_tick + keystate[K_RIGHT] - keystate[K_LEFT])
+        if not self.dimmer.get_dim():
+            self.camera.pan((keystate[K_d] - keystate[K_a]) * settings.Settings.pan_speed,
+                            (keystate[K_s] - keystate[K_w]) * settings.Settings.pan_speed)
+
+    def event_loop(self):
+        """ Main event loop, which takes all user input: both keyboard input, and mouse input - interacting with
+        the onscreen widgets. Affective method.
+        """
+        keystate = pygame.key.get_pressed()
+        # Only the latest mouse motion is handled, just before the next mouse button event or after the last event
+        motion = None
+        tracking = False
+        events = self.waiting_events + pygame.event.get()
+        self.waiting_events = []
+        for event in events:
             if event.type == QUIT or (event.type == KEYDOWN and event.key in (K_ESCAPE, K_q)):
                 sys.exit()
+            if event.type == MOUSEMOTION:
+                motion = event
+                continue
+            if event.type in (MOUSEBUTTONDOWN, MOUSEBUTTONUP):
+                if motion:
+                    tracking = self.mouse_motion(motion) or tracking
+                    motion = None
+                event = self.get_screen_event(event)
             if event.type == KEYDOWN:
                 if event.key == K_n and self.ask:
                     self.pause()
                     self.quit_lvl = False
                     self.ask = False
-                    self.widgets.append(self.pause_widget)
-                    self.set_widgets()
                 if event.key == K_y and self.ask:
                     self.real_quit = True
                 if event.key == K_RETURN:
@@ -1089,40 +1588,60 @@ class Game:
                         self.q_mode = False
                     else:
                         self.q_mode = True
+                if event.key == K_m and self.game_state == "reset":
+                    self.swarm_mode = not self.swarm_mode
                 if event.key in (K_LSHIFT, K_RSHIFT) and self.replay and self.game_state == "reset":
                     if self.replay_count:
                         real_count = self.replay_count - 1
                     else:
                         real_count = (settings.Settings.instant_replays - 1)
-                    velocity = self.replay[real_count]["velocity"]
-                    self.bodies[self.get_hero()].velocity = velocity
-                    self.draw_velocity_info(velocity)
-                    self.screen_update()
+                    self.bodies[self.get_hero()].velocity.set(*self.replay[real_count]["velocity"])
+                    self.velocity_info_due = True
+                if event.key == K_t:
+                    self.toggle_scrub()
+                if event.key == K_PERIOD:
+                    self.change_time_warp(1)
+                if event.key == K_COMMA:
+                    self.change_time_warp(- 1)
                 if event.key in (K_p, K_SPACE):
                     self.pause()
                 if event.key == K_r:
                     self.reset_all()
-            if event.type == MOUSEMOTION:
-                tracking = False
-                for widget in self.widgets:
-                    if hasattr(widget, "text"):
-                        widget.highlight = widget.rect.collidepoint(event.pos)
-                    else:
-                        widget.on_mouse_motion(event)
-                        tracking = tracking or widget.tracking
-                if tracking and self.game_state == "reset" and not self.dimmer.get_dim():
-                    hero = self.bodies[self.get_hero()]
-                    if self.angle_widget.value:
-                        hero.velocity = polar_to_cartesian((cartesian_to_polar(hero.velocity)[0], math.radians(self.angle_widget.value)))
-                    if self.speed_widget.value:
-                        hero.velocity = polar_to_cartesian((self.speed_widget.value, cartesian_to_polar(hero.velocity)[1]))
-                    self.draw_velocity_info(hero.velocity)
+                if event.key == K_f:
+                    self.camera.follow = not self.camera.follow
+                if event.key == K_HOME and not self.dimmer.get_dim():
+                    self.camera.follow = False
+                    self.camera.reset()
+                if event.key in (K_EQUALS, K_PLUS, K_KP_PLUS) and not self.dimmer.get_dim():
+                    self.camera.zoom_at(settings.Settings.zoom_step, self.camera.screen_rect.center)
+                if event.key in (K_MINUS, K_KP_MINUS) and not self.dimmer.get_dim():
+                    self.camera.zoom_at(1 / settings.Settings.zoom_step, self.camera.screen_rect.center)
+                if event.key == K_F3:
+                    self.toggle_profiler()
+                if event.key == K_F4 and self.profiler.enabled:
+                    self.profiler.export(settings.Settings.profile_csv)
+                if event.key == K_F5:
+                    self.account_memory()
+                    self.memory.dump(settings.Settings.memory_report)
+                if event.key == K_F6 and self.game_state in ("action", "preview"):
+                    self.quick_snapshot = self.capture_snapshot()
+                if event.key == K_F7 and self.quick_snapshot and not self.dimmer.get_dim() and \
+                   (self.game_state == self.quick_snapshot.values["game_state"] or
+                    (self.game_state, self.quick_snapshot.values["game_state"]) == ("reset", "action")):
+                    self.restore_snapshot(self.quick_snapshot)
             if event.type == MOUSEBUTTONDOWN:
-                for widget in self.widgets:
+                if event.button in (4, 5) and not self.dimmer.get_dim():
+                    if event.button == 4:
+                        self.camera.zoom_at(settings.Settings.zoom_step, event.pos)
+                    else:
+                        self.camera.zoom_at(1 / settings.Settings.zoom_step, event.pos)
+                for widget in self.widgets.get_widgets_near(event.pos):
                     widget.on_mouse_button_down(event)
+                    self.widgets.mark_dirty(widget)
             if event.type == MOUSEBUTTONUP:
-                for widget in self.widgets:
+                for widget in self.widgets.get_widgets_near(event.pos):
                     widget.on_mouse_button_up(event)
+                    self.widgets.mark_dirty(widget)
             if event.type == TextWidget.TEXT_WIDGET_CLICK:
                 if event.text_widget.text == "PAUSE":
                     self.pause()
@@ -1136,56 +1655,826 @@ class Game:
                     self.observe()
                 if event.text_widget.text == "LAUNCH":
                     self.launch()
+                if event.text_widget is self.warp_widget:
+                    self.change_time_warp(1)
                 if self.replay and self.game_state == "reset":
                     if self.replay_count:
                         init_real_count = self.replay_count - 1
                     else:
                         init_real_count = (settings.Settings.instant_replays - 1)
-                    real_count_list = range(init_real_count, -1, -1)
-                    if (settings.Settings.instant_replays - 1) in self.replay.keys():
-                        for index in range((settings.Settings.instant_replays - 1), init_real_count, -1):
-                            real_count_list.append(index)
-                    for real_count, instant_replays in zip(real_count_list, range(settings.Settings.instant_replays)):
-                        var_str = "replay_%i_widget" % instant_replays
-                        if event.text_widget.text == vars(self)[var_str].text:
-                            velocity = self.replay[real_count]["velocity"]
-                            self.bodies[self.get_hero()].velocity = velocity
-                            self.draw_velocity_info(velocity)
-                            self.screen_update()
+                    real_count_list = self.get_replay_counts(init_real_count)
+                    for real_count, replay_widget in zip(real_count_list, self.replay_widgets):
+                        if event.text_widget is replay_widget:
+                            self.bodies[self.get_hero()].velocity.set(*self.replay[real_count]["velocity"])
+                            self.velocity_info_due = True
+        if motion:
+            tracking = self.mouse_motion(motion) or tracking
+        if tracking and self.scrubbing:
+            self.seek_timeline(int(round(self.timeline_widget.value)))
+        if tracking and self.game_state == "reset" and not self.dimmer.get_dim():
+            hero = self.bodies[self.get_hero()]
+            speed = hero.velocity.get_magnitude()
+            angle = hero.velocity.get_angle()
+            if self.angle_widget.value:
+                angle = math.radians(self.angle_widget.value)
+            if self.speed_widget.value:
+                speed = self.speed_widget.value
+            hero.velocity.set_polar(speed, angle)
+            self.velocity_info_due = True
+
+    def mouse_motion(self, event):
+        """ Passes a mouse motion event to the widgets near the pointer, marking any that change as dirty. Returns
+        whether or not a slider is tracking the mouse. Affective and functional method.
+        """
+        event = self.get_screen_event(event)
+        tracking = False
+        for widget in self.widgets.get_widgets_near(event.pos):
+            highlight = widget.highlight
+            if hasattr(widget, "text"):
+                widget.highlight = widget.rect.collidepoint(event.pos)
+            else:
+                widget.on_mouse_motion(event)
+                tracking = tracking or widget.tracking
+            if widget.highlight != highlight or widget.tracking:
+                self.widgets.mark_dirty(widget)
+        return tracking
+
+    def update_velocity_info(self):
+        """ Draws the velocity info if any input changed it since the last frame. Affective method.
+        """
+        if self.velocity_info_due:
+            self.velocity_info_due = False
+            self.draw_velocity_info(self.bodies[self.get_hero()].velocity)
 
-    def simulate(self):
-        """ Simulates gravity! Erases, updates and redraws all appropriate bodies to the screen. Affective method.
+    def prepare_gravity(self):
+        """ Works out which pairs of bodies apply_gravity needs to visit: those where either body is pulled by the
+        other, and those where either is the visible hero, for scoring. Each pair is a 4-tuple of the two body indices
+        in self.body_order, and the mass each body is pulled by (0.0 when it isn't pulled by the other body). Unless
+        turned off in settings.py, the pull of stationary bodies comes from precomputed fields instead, one for each
+        group of stationary bodies pulling a particle. Also sets the index of the visible hero (-1 when it's hidden),
+        and the buffers apply_gravity works in. Affective method.
+        """
+        bodies = [self.bodies[name] for name in self.body_order]
+        self.gravity_bodies = bodies
+        self.gravity_buffers = tuple([0.0] * len(bodies) for buffer in range(4))
+        rebels = [set(body.rebel_scum) for body in bodies]
+        hero = self.bodies[self.get_hero()]
+        self.hero_index = self.body_order.index(self.get_hero()) if hero.visible else -1
+        use_fields = bool(settings.Settings.gravity_grid_size)
+        self.gravity_pairs = []
+        for i in range(len(bodies)):
+            for j in range(i + 1, len(bodies)):
+                pull_i = bodies[j].mass if bodies[i].particle and self.body_order[j] not in rebels[i] and \
+                    not (use_fields and not bodies[j].particle) else 0.0
+                pull_j = bodies[i].mass if bodies[j].particle and self.body_order[i] not in rebels[j] and \
+                    not (use_fields and not bodies[i].particle) else 0.0
+                if pull_i or pull_j or self.hero_index in (i, j):
+                    self.gravity_pairs.append((i, j, pull_i, pull_j))
+        groups = {}
+        if use_fields:
+            for i in range(len(bodies)):
+                if bodies[i].particle:
+                    sources = tuple(j for j in range(len(bodies)) if not bodies[j].particle and
+                                    self.body_order[j] not in rebels[i])
+                    if sources:
+                        groups.setdefault(sources, []).append(i)
+        self.gravity_field_groups = []
+        for sources, indices in groups.items():
+            self.gravity_field_groups.append((self.get_gravity_field(sources), indices))
+
+    def get_gravity_field(self, sources):
+        """ Returns the precomputed field of the stationary bodies at the indices in self.body_order in the tuple
+        sources, building it the first time it's needed in the level. Functional method.
+        """
+        if sources not in self.gravity_fields:
+            bodies = [self.bodies[self.body_order[index]] for index in sources]
+            self.gravity_fields[sources] = gravityfield.GravityField(
+                [(body.com[0], body.com[1], body.mass) for body in bodies], self.screen.get_rect(),
+                settings.Settings.gravity_grid_size,
+                [body.rough_radius * settings.Settings.gravity_grid_exact_radius for body in bodies])
+        return self.gravity_fields[sources]
+
+    def apply_gravity(self):
+        """ Updates the velocities of all particles by their net gravitational acceleration (as Body.get_acceleration
+        does for one body), and the scores of all bodies by the hero's position in their gravitational fields, in one
+        pass over the pairs of bodies which reuses each distance for both. Affective method.
+        """
+        if self.gravity_pairs is None:
+            self.prepare_gravity()
+        bodies = self.gravity_bodies
+        xs, ys, accelerations_x, accelerations_y = self.gravity_buffers
+        for index, body in enumerate(bodies):
+            xs[index] = body.com.x
+            ys[index] = body.com.y
+            accelerations_x[index] = 0.0
+            accelerations_y[index] = 0.0
+        g = Body.G
+        hero_index = self.hero_index
+        points = self.points
+        point_modifier = settings.Settings.point_modifier
+        # A body's score increases by at most max_points per tick, when the hero is within max_distance of its surface
+        max_distance = settings.Settings.point_max_increment_distance ** 2
+        max_points = point_modifier / max_distance
+        for i, j, pull_i, pull_j in self.gravity_pairs:
+            x = xs[j] - xs[i]
+            y = ys[j] - ys[i]
+            r = math.sqrt(x ** 2 + y ** 2)
+            if hero_index == i or hero_index == j:
+                scored = j if hero_index == i else i
+                distance = (r - bodies[scored].rough_radius) ** 2
+                points[scored] += max_points if distance < max_distance else point_modifier / distance
+                if points[scored] > self.next_point_lvls[scored]:
+                    self.reach_facts(scored)
+            # Bodies whose centers of mass meet don't pull on each other (see Body.get_gravitational_force method)
+            if r == 0:
+                continue
+            # Newton's Law of Gravitation and Second Law give the acceleration a = G * M / r ** 2, towards the other body
+            scale = g / r ** 3
+            if pull_i:
+                accelerations_x[i] += pull_i * scale * x
+                accelerations_y[i] += pull_i * scale * y
+            if pull_j:
+                accelerations_x[j] -= pull_j * scale * x
+                accelerations_y[j] -= pull_j * scale * y
+        for field, indices in self.gravity_field_groups:
+            for index in indices:
+                x, y = field.get_acceleration(xs[index], ys[index])
+                accelerations_x[index] += g * x
+                accelerations_y[index] += g * y
+        for index, body in enumerate(bodies):
+            if body.particle:
+                body.acceleration.set(accelerations_x[index], accelerations_y[index])
+                body.velocity.add(accelerations_x[index], accelerations_y[index])
+
+    def move_all_bodies(self):
+        """ Moves every particle by one physics tick. Affective method.
         """
-        self.erase_all_particles()
         for body in self.bodies.values():
             body.move()
-        if not self.special_collision():
-            hero = self.bodies[self.get_hero()]
-            hero.angler(math.degrees(cartesian_to_polar(hero.velocity)[1]) * -1)
-            for body in self.bodies.values():
-                body.update_velocity(self.bodies)
-                body.update_points(hero)
-            self.draw_all_particles()
+
+    def launch_swarm(self):
+        """ Launches a swarm of rockets (see swarm.py) from the hero, with speeds and angles spread randomly around the
+        hero's, pulled by the same bodies as the hero. The bodies the swarm starts within are its atmosphere, which
+        rockets can leave without crashing, as the hero can (see special_collision method). Initialization method.
+        """
+        hero = self.bodies[self.get_hero()]
+        speed = hero.velocity.get_magnitude()
+        angle = hero.velocity.get_angle()
+        speed_spread = settings.Settings.swarm_speed_spread
+        angle_spread = math.radians(settings.Settings.swarm_angle_spread)
+        velocities = [polar_to_cartesian((speed * (1 + random.uniform(- speed_spread, speed_spread)),
+                                          angle + random.uniform(- angle_spread, angle_spread)))
+                      for index in range(settings.Settings.swarm_size)]
+        self.swarm = swarm.Swarm(hero.com, velocities)
+        self.swarm_rects = []
+        self.swarm_pulls = [name for name in self.body_order if name != self.get_hero() and name not in hero.rebel_scum]
+        stationary = tuple(index for index, name in enumerate(self.body_order)
+                           if name in self.swarm_pulls and not self.bodies[name].particle)
+        if stationary and settings.Settings.gravity_grid_size:
+            self.swarm_field = self.get_gravity_field(stationary)
+        else:
+            self.swarm_field = None
+        self.swarm_launch_bodies = [name for name, body in self.bodies.items() if body is not hero and
+                                    math.hypot(hero.com[0] - body.com[0], hero.com[1] - body.com[1]) <
+                                    body.rough_radius]
+
+    def tick_swarm(self):
+        """ Moves the swarm by one physics tick. Affective method.
+        """
+        hero = self.bodies[self.get_hero()]
+        moving = []
+        stationary = []
+        for name in self.swarm_pulls:
+            body = self.bodies[name]
+            if body.particle:
+                moving.append((body.com[0], body.com[1], body.mass))
+            else:
+                stationary.append((body.com[0], body.com[1], body.mass))
+        # Like the hero, rockets can't crash just after launch, nor while they're leaving the atmosphere of the bodies
+        # they launched from (see special_collision method)
+        if self.swarm.ticks < settings.Settings.max_escape_well_time * settings.Settings.fps:
+            obstacles = []
+        else:
+            obstacles = [(body.com[0], body.com[1], body.rough_radius) for body in self.bodies.values()
+                         if body is not hero and body.visible]
+        atmosphere = [(self.bodies[name].com[0], self.bodies[name].com[1], self.bodies[name].rough_radius)
+                      for name in self.swarm_launch_bodies]
+        self.swarm.step(Body.G, moving, stationary, self.swarm_field, obstacles, atmosphere,
+                        settings.Settings.min_escape_speed)
+
+    def erase_swarm(self):
+        """ Erases the swarm from the screen, by redrawing the background over the rect it was drawn in, and the
+        stationary bodies in that rect, and also modifies self.update_rects. Affective method.
+        """
+        if not self.swarm_rects:
+            return
+        erased_rect = self.swarm_rects[0]
+        self.screen.blit(self.background_surf, erased_rect, erased_rect)
+        self.update_rects.append(erased_rect.copy())
+        self.widgets.mark_dirty_in(erased_rect)
+        for name, body in self.bodies.items():
+            if not body.particle and body.draw_rect and body.draw_rect.colliderect(erased_rect):
+                self.draw_body(name)
+        self.swarm_rects = []
+
+    def draw_swarm(self):
+        """ Draws the rockets of the swarm which haven't crashed to the screen as points (see swarm.Swarm.draw method),
+        and also modifies self.update_rects. Affective method.
+        """
+        if not self.swarm:
+            return
+        rect = self.swarm.draw(self.screen, self.camera.offset, self.camera.zoom, settings.Settings.swarm_colour,
+                               settings.Settings.swarm_point_size)
+        if rect:
+            self.swarm_rects = [rect]
+            self.update_rects.append(rect.copy())
+
+    def physics_tick(self):
+        """ Runs the part of a physics tick which neither draws nor waits for the player, so it can run on the physics
+        worker's thread: moves all bodies and updates their velocities and scores, queueing the hero's position for its
+        trail, and checks whether the hero escaped. Returns the name of the body the hero crashed into, "escaped" if it
+        has been offscreen for too long, or None. Affective and functional method.
+        """
+        if self.game_state == "action":
+            self.flight_tick += 1
+        self.move_all_bodies()
+        collision_body = self.special_collision()
+        if collision_body:
+            return collision_body
+        hero = self.bodies[self.get_hero()]
+        # The hero is rotated even while it's offscreen, as its mask and center of mass turn with it
+        hero.angler(math.degrees(hero.velocity.get_angle()) * -1)
+        self.apply_gravity()
+        if self.swarm:
+            self.tick_swarm()
+        if self.game_state == "action" and hero.visible:
+            self.trail_due.append(hero.com.get_tuple())
+        if self.timeline and self.game_state == "action":
+            self.record_tick()
+        if self.check_breakout():
+            return "escaped"
+        return None
+
+    def physics_step(self):
+        """ Runs a physics tick on the physics worker's thread: takes input from held keys, then runs the tick (see
+        physics_tick method), so held keys change the game once per tick just as they do without the worker. Returns
+        what the tick returns. Affective and functional method.
+        """
+        self.held_keys()
+        return self.physics_tick()
+
+    def finish_ticks(self, collision_body):
+        """ Runs the rest of the physics ticks just run (see physics_tick method): draws the hero's trail and shows the
+        time warp, then either crashes the hero into the body named collision_body, or resets the game if it escaped.
+        Affective method.
+        """
+        for point in self.trail_due:
+            self.extend_trail(point)
+        self.trail_due = []
+        self.set_warp_widget()
+        if collision_body == "escaped":
             self.escape_wellist()
+        elif collision_body:
+            self.crash(collision_body)
 
-    def run(self):
-        """ Contains the game's main loop. Initializes and runs the game, updating the screen every cycle based
-        on the max fps (defined in settings.py). Affective method.
+    def simulate(self):
+        """ Simulates gravity! Moves all bodies by one physics tick and updates their velocities and scores, but
+        doesn't draw them (see render_particles method). Affective method.
+        """
+        self.finish_ticks(self.physics_tick())
+
+    def run_ticks(self, ticks):
+        """ Takes input from held keys and simulates each of the given number of physics ticks, or starts the physics
+        worker on them (see physics_step method). Affective method.
+        """
+        if self.running and self.physics:
+            if ticks:
+                self.physics.start(ticks)
+            return
+        for tick in range(ticks):
+            self.held_keys()
+            if self.running:
+                self.simulate()
+
+    def collect_ticks(self):
+        """ Waits for the physics worker to finish the ticks it was started on, if any, and runs the rest of them (see
+        finish_ticks method). Affective method.
+        """
+        if self.physics:
+            result = self.physics.collect()
+            if result:
+                self.finish_ticks(result[1])
+
+    def capture_snapshot(self):
+        """ Returns a snapshot.Snapshot of the whole simulation - every body, the scores, the info-bits due, the
+        launch's timers, trail and swarm, and the collision flags - for the restore_snapshot method, or None if the
+        simulation isn't running (in the "action" or "preview" states). Functional method.
+        """
+        self.collect_ticks()
+        if self.game_state not in ("action", "preview"):
+            return None
+        return self.get_snapshot()
+
+    def get_snapshot(self):
+        """ Returns a snapshot.Snapshot of the simulation as it is, without waiting for the physics worker, so it can
+        be taken by a physics tick (see capture_snapshot method). Functional method.
+        """
+        now = time.time()
+        values = {"lvl": self.lvl, "game_state": self.game_state, "tick": self.flight_tick, "G": Body.G,
+                  "time": now - self.launch_time if self.launch_time else None,
+                  "breakout": self.screen_breakout,
+                  "atmosphere": self.atmosphere, "quit_lvl": self.quit_lvl, "facts_due": list(self.facts_due),
+                  "trail": None, "trail_due": list(self.trail_due), "swarm": None, "velocity": None}
+        if self.game_state == "action":
+            trail = self.replay[self.replay_count]["trail"]
+            values["trail"] = (list(trail.points), trail.start, trail.count)
+            values["velocity"] = self.replay[self.replay_count]["velocity"]
+        if self.swarm:
+            values["swarm"] = (self.swarm, self.swarm.get_state(), self.swarm_pulls, self.swarm_field,
+                               self.swarm_launch_bodies)
+        return snapshot.Snapshot([self.bodies[name] for name in self.body_order],
+                                 [self.points, self.next_facts, self.next_point_lvls], values)
+
+    def restore_snapshot(self, state):
+        """ Returns the simulation to the snapshot state, taken by the capture_snapshot method during the current
+        level, and redraws everything. A snapshot of a launch can also be restored once the hero is back on the
+        launcher, which launches it again first, recording the snapshot's launch velocity for the attempt rather than
+        the launcher's. The flight's timeline carries on from the snapshot. Raises ValueError for snapshots which don't
+        fit the game's state. Affective method.
+        """
+        self.collect_ticks()
+        values = state.values
+        if values["lvl"] != self.lvl:
+            raise ValueError("snapshot taken at level %s, not level %s" % (values["lvl"], self.lvl))
+        if self.game_state == "reset" and values["game_state"] == "action":
+            self.launch()
+        if self.game_state != values["game_state"]:
+            raise ValueError("snapshot taken in the %s state, not the %s state" % (values["game_state"],
+                                                                                  self.game_state))
+        self.set_snapshot(state)
+        self.flight_tick = values["tick"]
+        if self.timeline and self.game_state == "action":
+            self.timeline.truncate(self.flight_tick)
+            if self.timeline.get_last() != self.flight_tick:
+                self.timeline.clear()
+                self.timeline.add_keyframe(self.flight_tick, state)
+        self.set_warp_widget()
+        self.redraw_all()
+
+    def set_snapshot(self, state):
+        """ Sets the simulation to the snapshot state, which must fit the game's state (see restore_snapshot method),
+        without redrawing. Affective method.
+        """
+        values = state.restore([self.bodies[name] for name in self.body_order],
+                               [self.points, self.next_facts, self.next_point_lvls])
+        now = time.time()
+        Body.G = values["G"]
+        self.launch_time = now - values["time"] if values["time"] is not None else 0
+        self.screen_breakout = values["breakout"]
+        self.atmosphere = values["atmosphere"]
+        self.quit_lvl = values["quit_lvl"]
+        self.facts_due = list(values["facts_due"])
+        self.trail_due = list(values["trail_due"])
+        self.trail_layer_due = True
+        if values["trail"]:
+            trail = self.replay[self.replay_count]["trail"]
+            points, trail.start, trail.count = values["trail"]
+            trail.points[:] = points
+        if values["velocity"]:
+            self.replay[self.replay_count]["velocity"] = values["velocity"]
+        if values["swarm"]:
+            self.swarm, swarm_state, self.swarm_pulls, self.swarm_field, self.swarm_launch_bodies = values["swarm"]
+            self.swarm.set_state(swarm_state)
+        else:
+            self.swarm = None
+        self.tick_pool = 0.0
+        self.interpolation = 1.0
+
+    def get_tick_delta(self):
+        """ Returns an array of everything a physics tick changes, for the flight's timeline (see timeline.py): the
+        launch time (-1.0 when not set), the tick the hero went offscreen at, G and the collision flags, then the
+        center of mass, velocity, acceleration, smoother, rect and angle of each particle, then the score of every body.
+        Functional method.
+        """
+        now = time.time()
+        delta = array("d", (now - self.launch_time if self.launch_time else -1.0,
+                            self.screen_breakout, Body.G, self.atmosphere, self.quit_lvl))
+        for name in self.body_order:
+            body = self.bodies[name]
+            if body.particle:
+                rect = body.rect
+                delta.extend((body.com.x, body.com.y, body.velocity.x, body.velocity.y, body.acceleration.x,
+                              body.acceleration.y, body.smoother.x, body.smoother.y, rect.left, rect.top, rect.width,
+                              rect.height, body.angle))
+        delta.extend(self.points)
+        return delta
+
+    def apply_tick_delta(self, delta):
+        """ Sets the simulation to the end of the physics tick recorded in delta (see get_tick_delta method), with the
+        info-bits, trail and swarm following on as they did when it was recorded (but doesn't draw anything).
+        Affective method.
+        """
+        now = time.time()
+        self.launch_time = now - delta[0] if delta[0] >= 0 else 0
+        self.screen_breakout = int(delta[1])
+        Body.G = delta[2]
+        self.atmosphere = bool(delta[3])
+        self.quit_lvl = bool(delta[4])
+        index = 5
+        for name in self.body_order:
+            body = self.bodies[name]
+            if body.particle:
+                if delta[index + 12] != body.angle:
+                    body.angler(delta[index + 12])
+                body.com.set(delta[index], delta[index + 1])
+                body.velocity.set(delta[index + 2], delta[index + 3])
+                body.acceleration.set(delta[index + 4], delta[index + 5])
+                body.smoother.set(delta[index + 6], delta[index + 7])
+                body.rect.topleft = (int(delta[index + 8]), int(delta[index + 9]))
+                body.rect.size = (int(delta[index + 10]), int(delta[index + 11]))
+                index += 13
+        for body_index in range(len(self.body_order)):
+            self.points[body_index] = delta[index + body_index]
+            if self.points[body_index] > self.next_point_lvls[body_index]:
+                self.reach_facts(body_index)
+        if self.swarm:
+            self.tick_swarm()
+        if self.bodies[self.get_hero()].visible:
+            self.replay[self.replay_count]["trail"].add(self.bodies[self.get_hero()].com.get_tuple())
+
+    def record_tick(self):
+        """ Records the physics tick just run in the flight's timeline, as a keyframe or a delta. Affective method.
+        """
+        if self.timeline.is_keyframe_due():
+            self.timeline.add_keyframe(self.flight_tick, self.get_snapshot())
+        else:
+            self.timeline.add_delta(self.get_tick_delta())
+
+    def seek_timeline(self, tick):
+        """ Sets the simulation to the recorded tick of the flight's timeline (or the nearest tick recorded), from the
+        keyframe before it and the deltas in between, and has everything redrawn by the next frame. Affective
+        method.
+        """
+        tick = max(self.timeline.get_first(), min(self.timeline.get_last(), tick))
+        state, deltas = self.timeline.get_ticks(tick)
+        self.set_snapshot(state)
+        # The trail is drawn whole by the next frame, rather than a segment at a time
+        trail = self.replay[self.replay_count]["trail"]
+        for point in self.trail_due:
+            trail.add(point)
+        self.trail_due = []
+        for delta in deltas:
+            self.apply_tick_delta(delta)
+        for body in self.bodies.values():
+            body.settle()
+        self.flight_tick = tick
+        self.set_warp_widget()
+        self.timeline_widget.value = float(tick)
+        self.widgets.mark_dirty(self.timeline_widget)
+        hero = self.bodies[self.get_hero()]
+        if self.camera.follow and hero.visible:
+            self.camera.center_on(hero.rect.center)
+        self.camera.changed = True
+
+    def toggle_scrub(self):
+        """ Starts scrubbing through the flight's timeline with the timeline slider and the left and right arrow keys,
+        stopping the simulation, or carries on the flight from the tick scrubbed to, forgetting the ticks after it.
+        Once the hero is back on the launcher, the last flight can still be scrubbed through, which launches it again
+        first, keeping its launch velocity (see set_snapshot method). Affective method.
+        """
+        if self.scrubbing:
+            self.scrubbing = False
+            self.seek_timeline(self.flight_tick)
+            self.timeline.truncate(self.flight_tick)
+            self.running = True
+            self.set_widgets()
+            return
+        if not self.timeline or self.timeline.get_last() is None or self.dimmer.get_dim() or \
+           self.game_state not in ("action", "reset") or (self.game_state == "action" and not self.running):
+            return
+        self.scrubbing = True
+        if self.game_state == "reset":
+            self.flight_tick = self.timeline.get_last()
+            self.launch()
+        self.running = False
+        self.timeline_widget.value_min = float(self.timeline.get_first())
+        self.timeline_widget.value_diff = float(max(1, self.timeline.get_last() - self.timeline.get_first()))
+        self.set_widgets("scrub")
+        self.seek_timeline(self.flight_tick)
+
+    def render_particles(self):
+        """ Erases and redraws all appropriate bodies to the screen, interpolated between their last two physics
+        ticks, and the swarm if there is one. Affective method.
+        """
+        self.erase_swarm()
+        self.erase_all_particles()
+        self.draw_all_particles()
+        self.draw_swarm()
+
+    def follow_hero(self):
+        """ Centers the camera on the hero while it's flying, if the camera is set to follow it. Affective method.
+        """
+        hero = self.bodies[self.get_hero()]
+        if self.camera.follow and self.running and hero.visible and not self.dimmer.get_dim():
+            self.camera.center_on(hero.get_draw_rect(self.interpolation).center)
+
+    def redraw_all(self):
+        """ Redraws the whole background, trails, all bodies and the swarm after the camera moves (but does not update
+        the screen). Affective method.
+        """
+        for body in self.bodies.values():
+            body.draw_rect = None
+        self.launcher_draw_rect = None
+        self.info_rects = []
+        self.swarm_rects = []
+        self.draw_trails()
+        self.draw_all_bodies()
+        self.draw_swarm()
+        if self.game_state == "reset":
+            self.hero_launch_time()
+            self.draw_velocity_info(self.bodies[self.get_hero()].velocity)
+        self.camera.changed = False
+
+    def get_ticks(self):
+        """ Returns the number of physics ticks due, from the real time accumulated in self.tick_pool at a rate of
+        self.fps times the time warp, and sets self.interpolation to the fraction of a tick left over. Ticks past
+        settings.Settings.max_ticks_per_frame (times the time warp) are dropped, slowing the game down rather than
+        stalling it. Under time warp, every tick due is simulated but only the last is drawn, so drawing costs the same
+        per frame however fast time goes. Affective and functional method.
+        """
+        warp = self.get_time_warp()
+        rate = self.fps * warp
+        ticks = int(self.tick_pool * rate)
+        if ticks > settings.Settings.max_ticks_per_frame * warp:
+            ticks = settings.Settings.max_ticks_per_frame * warp
+            self.tick_pool = 0.0
+        else:
+            self.tick_pool -= ticks / float(rate)
+        self.interpolation = min(self.tick_pool * rate, 1.0)
+        return ticks
+
+    def get_time_warp(self):
+        """ Returns how many times faster than normal the game's time goes: the time warp chosen by the player, or
+        settings.Settings.offscreen_time_warp if that's faster and the hero is offscreen. There's no time warp on the
+        launcher, so held keys change the launch at the normal rate. Functional method.
+        """
+        if self.game_state == "reset":
+            return 1
+        if self.screen_breakout:
+            return max(self.time_warp, settings.Settings.offscreen_time_warp)
+        return self.time_warp
+
+    def change_time_warp(self, step):
+        """ Moves the time warp step places along settings.Settings.time_warps (wrapping round from either end).
+        Affective method.
+        """
+        warps = settings.Settings.time_warps
+        index = warps.index(self.time_warp) if self.time_warp in warps else 0
+        self.time_warp = warps[(index + step) % len(warps)]
+        self.set_warp_widget()
+
+    def set_warp_widget(self):
+        """ Shows the current time warp on the warp widget. Affective method.
+        """
+        text = "WARP %dX" % self.get_time_warp()
+        if self.warp_widget.text != text:
+            if self.warp_widget in self.widgets:
+                self.update_rects.append(self.warp_widget.erase(self.screen, self.background_surf).copy())
+            self.warp_widget.text = text
+            self.widgets.mark_dirty(self.warp_widget)
+
+    def toggle_profiler(self):
+        """ Turns the frame profiler and its overlay on or off, redrawing the screen under the overlay when it's
+        turned off. Affective method.
+        """
+        if not self.profiler.toggle():
+            self.camera.changed = True
+
+    def draw_profile(self):
+        """ Draws the frame profiler's overlay over the bottom-right corner of the screen. Affective method.
+        """
+        self.profiler.draw(self.screen, self.profile_font, self.profile_rect, 1000.0 / settings.Settings.render_fps)
+        self.update_rects.append(self.profile_rect.copy())
+
+    def get_memory_items(self):
+        """ Returns a list of 2-tuples with a memory category (see memoryaccount.CATEGORIES) and each live surface,
+        mask and precomputed grid the game holds. Objects shared between categories are listed first in the one they're
+        counted in: the target's image is the halo's while it's shown, and each body's unscaled image is the body's
+        rather than the image cache's. Functional method.
+        """
+        items = [("screen", self.display), ("screen", self.screen), ("screen", self.background_surf),
+                 ("screen", self.trail_layer)]
+        target = self.bodies.get(self.target)
+        if target and self.halo_rect_size:
+            items.append(("halo", target.image))
+        items += [("halo", self.images[key][0]) for key in self.images if key[0] == "halo"]
+        for body in self.bodies.values():
+            items += [("bodies", body.init_image), ("bodies", body.image), ("bodies", body.mask),
+                      ("bodies", body.zoomed[2])]
+        widget_list = [self.angle_widget, self.speed_widget] + self.replay_widgets
+        for widget_set in self.widgets.sets.values():
+            widget_list += widget_set[0]
+        for widget in widget_list:
+            items += [("widgets", value) for value in vars(widget).values() if isinstance(value, pygame.Surface)]
+        items += [("dimmer", value) for value in vars(self.dimmer).values() if isinstance(value, pygame.Surface)]
+        items += [("caches", image) for image, centroid in self.images.values()]
+        items.append(("caches", self.background_image))
+        for field in self.gravity_fields.values():
+            items += [("caches", field.field_x), ("caches", field.field_y), ("caches", field.exact)]
+        return items
+
+    def account_memory(self, extra=()):
+        """ Samples the memory held by the game (see get_memory_items method) into self.memory, under the current
+        level. Parameter: extra - list of 2-tuples with a category and each short-lived object to count as well, such
+        as an info-bit being shown. Affective method.
+        """
+        self.memory.sample(self.lvl, list(extra) + self.get_memory_items())
+
+    def is_idle(self):
+        """ Returns whether or not nothing onscreen can change until the player does something: the game is paused or
+        waiting in the reset state, everything has been drawn and no keys are held down. Functional method.
+        """
+        if self.running or self.update_rects or self.widgets.dirty or self.camera.changed or self.velocity_info_due:
+            return False
+        keystate = pygame.key.get_pressed()
+        for key in HELD_KEYS:
+            if keystate[key]:
+                return False
+        return True
+
+    def wait_for_input(self):
+        """ Sleeps until the next event, or settings.Settings.idle_timeout, leaving the event for the event loop. Time
+        spent asleep isn't simulated. Returns whether or not an event arrived. Affective and functional method.
+        """
+        event = wait_event(settings.Settings.idle_timeout)
+        self.tick_pool = 0.0
+        self.clock.tick()
+        if event.type == NOEVENT:
+            return False
+        self.waiting_events.append(event)
+        return True
+
+    def prepare_run(self):
+        """ Draws the level and starts the clock, ready for the main loop. Initialization method.
         """
         self.draw_background()
         self.hero_hide()
         self.toggle_halo()
         self.draw_all_bodies()
+        self.tick_pool = 0.0
+        self.clock.tick()
+
+    def begin_frame(self, wait=True):
+        """ Starts a frame of the main loop: collects the physics worker's ticks, asks the player about the next level
+        once it's reached, and takes input. While the game is idle, it sleeps until there's input if wait is set, or
+        else skips the frame. Returns whether or not the frame goes ahead. Affective and functional method.
+        """
+        self.collect_ticks()
+        self.possible_quit_lvl()
+        if self.real_quit:
+            return False
+        if self.is_idle():
+            if not wait:
+                self.tick_pool = 0.0
+                self.clock.tick()
+                return False
+            if not self.wait_for_input():
+                return False
+        self.frame_start = time.time()
+        self.governor.start_frame()
+        if self.profiler.enabled:
+            self.profiler.start_frame()
+        self.event_loop()
+        return True
+
+    def simulate_frame(self):
+        """ Simulates the physics ticks due this frame, unless the physics worker simulates them once the frame is drawn
+        (see draw_frame method). Affective method.
+        """
+        if not self.physics:
+            self.run_ticks(self.get_ticks())
+
+    def draw_frame(self):
+        """ Draws the frame and updates the screen, starting the physics worker on the frame's physics ticks in
+        between. Affective method.
+        """
+        # The governor may skip redrawing the HUD, or the whole frame, while physics keeps going
+        if self.governor.draw_hud:
+            self.update_velocity_info()
+        self.follow_hero()
+        if self.governor.draw_frame:
+            if self.governor.draw_hud:
+                self.erase_dirty_widgets()
+            if self.camera.changed:
+                self.redraw_all()
+            elif self.running:
+                self.render_particles()
+            self.hero_launch_time()
+            if self.governor.draw_hud:
+                self.draw_dirty_widgets()
+            if self.profiler.enabled:
+                self.draw_profile()
+        if self.physics:
+            self.run_ticks(self.get_ticks())
+        if self.governor.draw_frame:
+            self.screen_update()
+        if self.profiler.enabled:
+            self.profiler.end_frame()
+        self.governor.end_frame((time.time() - self.frame_start) * 1000)
+
+    def run(self):
+        """ Contains the game's main loop. Initializes and runs the game, simulating physics ticks at self.fps and
+        updating the screen every cycle based on the max render fps (both defined in settings.py). While the game is
+        idle, it sleeps until there's input instead of drawing. With the physics worker, each frame's physics ticks
+        run while it's shown and the game waits for the next frame, and are drawn by the next frame. Affective method.
+        """
+        self.prepare_run()
         while True:
-            self.possible_quit_lvl()
-            if not self.real_quit:
-                self.event_loop()
-                self.erase_all_widgets()
-                if self.running:
-                    self.simulate()
-                self.hero_launch_time()
-                self.draw_all_widgets()
-                self.screen_update()
-                self.clock.tick(self.fps)
-            else:
+            if self.begin_frame():
+                self.simulate_frame()
+                self.draw_frame()
+                self.tick_pool += self.clock.tick(settings.Settings.render_fps) / 1000.0
+            elif self.real_quit:
                 break
+
+    def run_tasks(self):
+        """ Runs the game like the run method, but as cooperative tasks (see tasks.py): taking input, simulating and
+        drawing are frame tasks, taking turns every frame, while the next level's images are loaded in the background
+        in the time frames leave over. Affective method.
+        """
+        self.prepare_run()
+        self.frame_due = False
+        loop = tasks.TaskLoop(1.0 / settings.Settings.render_fps)
+        if self.executor and type(self.lvl) == int and self.lvl + 1 < settings.Settings.total_lvls:
+            loop.spawn(self.prefetch_level(self.lvl + 1), True)
+        loop.spawn(self.input_task(loop))
+        loop.spawn(self.physics_task())
+        loop.spawn(self.draw_task())
+        loop.run()
+
+    def input_task(self, loop):
+        """ Frame task starting each frame (see begin_frame method), and setting self.frame_due to whether or not the
+        rest of the frame goes ahead. While the game is idle, it only sleeps until there's input once loop has no
+        background work left. Finishes once the level is quit.
+        """
+        while True:
+            self.tick_pool += self.clock.tick() / 1000.0
+            self.frame_due = self.begin_frame(not loop.has_background())
+            if not self.frame_due and self.real_quit:
+                return
+            yield
+
+    def physics_task(self):
+        """ Frame task simulating the physics ticks of each frame (see simulate_frame method).
+        """
+        while True:
+            if self.frame_due:
+                self.simulate_frame()
+            elif self.real_quit:
+                return
+            yield
+
+    def draw_task(self):
+        """ Frame task drawing each frame (see draw_frame method).
+        """
+        while True:
+            if self.frame_due:
+                self.draw_frame()
+            elif self.real_quit:
+                return
+            yield
+
+    def prefetch_level(self, lvl_num):
+        """ Background task loading the images of the integer level number into self.images, scaled for the screen,
+        so the level starts sooner. The PNG files are decoded on the executor's threads, a few at a time, and converted
+        and scaled on this thread, one image per turn. Skipped when the level cache already has the level's images.
+        """
+        level = levelfile.load(levelfile.get_path(lvl_num), lvl_num)
+        keys = []
+        for index, name in enumerate(level.names):
+            size = level.get_size(index)
+            keys.append((level.images[index], vector_float_to_int(self.coordinate_conversion(size))))
+            if name == "earth":
+                keys.append(("rocket_launcher_right", vector_float_to_int(self.coordinate_conversion(size + 10))))
+        names = level.images + ["rocket_launcher_right", "halo"]
+        if settings.Settings.level_cache_dir:
+            job = self.executor.submit(levelcache.get_path, lvl_num, self.screen.get_size(), names)
+            # While the executor's backlog is full, submitting waits for a later turn
+            while not job:
+                yield
+                job = self.executor.submit(levelcache.get_path, lvl_num, self.screen.get_size(), names)
+            if os.path.isfile((yield job)):
+                return
+        jobs = []
+        for name, size in set(keys):
+            if (name, size) in self.images:
+                continue
+            job = self.executor.submit(pygame.image.load, os.path.join("data", name + ".png"))
+            while not job:
+                yield
+                job = self.executor.submit(pygame.image.load, os.path.join("data", name + ".png"))
+            jobs.append((name, size, job))
+        for name, size, job in jobs:
+            image = yield job
+            if (name, size) not in self.images:
+                self.images[(name, size)] = (pygame.transform.smoothscale(image.convert_alpha(), size), None)
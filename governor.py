@@ -0,0 +1,74 @@
+""" Contains the FrameGovernor class, which lowers the game's drawing quality step by step while frames take longer than
+the frame budget, and raises it again once they fit. To see how it's used, see engine.py. The governor can be turned off
+or tuned in settings.py.
+"""
+
+
+# Quality levels, each lowering quality further on top of the ones before it
+LEVELS = ("full", "skip_hud", "coarse_collisions", "sparse_trails", "skip_frames")
+# Frames taking longer than this many milliseconds are waiting for the player (info-bits, crashes), not working
+MAX_FRAME_COST = 1000.0
+
+
+class FrameGovernor:
+    """ Keeps a moving average of the cost of fully drawn frames in milliseconds, and moves one quality level at a time:
+    down while the average is over the budget, and back up while it's under a fraction of the budget. After each move
+    it waits a number of frames before moving again, so the average can settle. Every move is kept in self.decisions.
+    """
+
+    def __init__(self, budget, recover, frames, enabled=True):
+        """ Initializes the governor at full quality. Parameters: budget - milliseconds a frame may take, recover -
+        fraction of the budget frames must take under to raise quality, frames - frames to wait between moves,
+        enabled - whether quality is ever lowered.
+        """
+        self.budget = budget
+        self.recover = recover
+        self.frames = frames
+        self.enabled = enabled
+        self.average = 0.0
+        self.wait = frames
+        self.frame = 0
+        self.level = 0
+        self.coarse_collisions = False
+        self.sparse_trails = False
+        self.draw_hud = True
+        self.draw_frame = True
+        # 3-tuples of the frame number, the new level and the average frame cost which led to it
+        self.decisions = []
+
+    def set_level(self, level):
+        """ Affective method, moves to the quality level numbered level (see LEVELS), noting the decision.
+        """
+        self.level = level
+        self.coarse_collisions = level >= LEVELS.index("coarse_collisions")
+        self.sparse_trails = level >= LEVELS.index("sparse_trails")
+        self.wait = self.frames
+        self.decisions = (self.decisions + [(self.frame, level, self.average)])[-100:]
+
+    def get_level_name(self):
+        """ Returns the name of the current quality level.
+        """
+        return LEVELS[self.level]
+
+    def start_frame(self):
+        """ Affective method, starts a frame, setting whether its HUD (widgets and velocity info) is redrawn, and
+        whether it's drawn at all. Skipped HUD redraws and frames are every other frame.
+        """
+        self.frame += 1
+        self.draw_hud = not (self.level >= LEVELS.index("skip_hud") and self.frame % 2)
+        self.draw_frame = not (self.level >= LEVELS.index("skip_frames") and self.frame % 2)
+
+    def end_frame(self, cost):
+        """ Affective method, ends a frame which took cost milliseconds, moving quality level when it's due. Only fully
+        drawn frames are counted.
+        """
+        if not self.enabled or not self.draw_frame or cost > MAX_FRAME_COST:
+            return
+        self.average += (cost - self.average) * 0.1
+        self.wait -= 1
+        if self.wait > 0:
+            return
+        if self.average > self.budget and self.level < len(LEVELS) - 1:
+            self.set_level(self.level + 1)
+        elif self.average < self.budget * self.recover and self.level:
+            self.set_level(self.level - 1)
@@ -0,0 +1,96 @@
+""" Contains the GravityField class, which precomputes the gravitational field of a level's stationary bodies on a grid,
+so moving bodies don't need to add up the pull of each stationary body on every physics tick. To see how it's used, see
+engine.py. The grid's accuracy can be changed in settings.py.
+"""
+import math
+from array import array
+
+
+class GravityField:
+    """ The summed gravitational acceleration due to a group of stationary bodies, per unit of G, sampled at the corners
+    of square grid cells covering a rect of the world and interpolated in between. The field changes quickly close to
+    a body, so cells near any body, and points outside the grid, are calculated exactly instead. Since the field is
+    proportional to G, changing G doesn't need a new grid.
+    """
+
+    def __init__(self, sources, rect, cell_size, exact_radius):
+        """ Builds the grid. Parameters: sources - list of 3-tuples with the x and y of each body's center of mass
+        and its mass, rect - pygame rect of the world covered by the grid, cell_size - width of the grid cells in
+        pixels, exact_radius - list with the distance from each source's center of mass within which the field is
+        calculated exactly.
+        """
+        self.sources = sources
+        self.left = float(rect.left)
+        self.top = float(rect.top)
+        self.cell_size = float(cell_size)
+        self.columns = int(math.ceil(rect.width / self.cell_size))
+        self.rows = int(math.ceil(rect.height / self.cell_size))
+        # The field at each grid corner, row by row, with one more corner than cells in each row and column. Each
+        # source's pull is added to every corner in turn.
+        corners = (self.columns + 1) * (self.rows + 1)
+        self.field_x = array("d", [0.0] * corners)
+        self.field_y = array("d", [0.0] * corners)
+        xs = [self.left + column * self.cell_size for column in range(self.columns + 1)]
+        for source_x, source_y, mass in sources:
+            separations_x = [source_x - x for x in xs]
+            corner = 0
+            for row in range(self.rows + 1):
+                separation_y = source_y - (self.top + row * self.cell_size)
+                for separation_x in separations_x:
+                    r = math.sqrt(separation_x * separation_x + separation_y * separation_y)
+                    if r:
+                        self.field_x[corner] += mass * separation_x / (r * r * r)
+                        self.field_y[corner] += mass * separation_y / (r * r * r)
+                    corner += 1
+        # Set for each cell, row by row, which could be within exact_radius of a source. A cell's farthest point is
+        # half its diagonal from its center, so only the cells around each source need checking.
+        self.exact = bytearray(self.columns * self.rows)
+        half_diagonal = self.cell_size / math.sqrt(2)
+        for (source_x, source_y, mass), radius in zip(sources, exact_radius):
+            reach = radius + half_diagonal
+            for row in range(max(0, int((source_y - reach - self.top) / self.cell_size)),
+                             min(self.rows, int((source_y + reach - self.top) / self.cell_size) + 1)):
+                y = self.top + (row + 0.5) * self.cell_size
+                for column in range(max(0, int((source_x - reach - self.left) / self.cell_size)),
+                                    min(self.columns, int((source_x + reach - self.left) / self.cell_size) + 1)):
+                    x = self.left + (column + 0.5) * self.cell_size
+                    if math.sqrt((source_x - x) ** 2 + (source_y - y) ** 2) < reach:
+                        self.exact[row * self.columns + column] = 1
+
+    def get_exact(self, x, y):
+        """ Returns the 2-tuple acceleration per unit of G at the point x, y, added up from each source. Bodies whose
+        centers of mass meet don't pull on each other (see engine.Body.get_gravitational_force method).
+        """
+        field_x = 0.0
+        field_y = 0.0
+        for source_x, source_y, mass in self.sources:
+            separation_x = source_x - x
+            separation_y = source_y - y
+            r = math.sqrt(separation_x ** 2 + separation_y ** 2)
+            if r:
+                field_x += mass * separation_x / r ** 3
+                field_y += mass * separation_y / r ** 3
+        return (field_x, field_y)
+
+    def get_acceleration(self, x, y):
+        """ Returns the 2-tuple acceleration per unit of G at the point x, y, interpolated bilinearly from the corners of
+        its grid cell, or calculated exactly near a source or outside the grid.
+        """
+        grid_x = (x - self.left) / self.cell_size
+        grid_y = (y - self.top) / self.cell_size
+        if not (0 <= grid_x < self.columns and 0 <= grid_y < self.rows):
+            return self.get_exact(x, y)
+        column = int(grid_x)
+        row = int(grid_y)
+        if self.exact[row * self.columns + column]:
+            return self.get_exact(x, y)
+        across = grid_x - column
+        down = grid_y - row
+        top_left = row * (self.columns + 1) + column
+        bottom_left = top_left + self.columns + 1
+        field_x = self.field_x
+        field_y = self.field_y
+        return ((field_x[top_left] * (1 - across) + field_x[top_left + 1] * across) * (1 - down) +
+                (field_x[bottom_left] * (1 - across) + field_x[bottom_left + 1] * across) * down,
+                (field_y[top_left] * (1 - across) + field_y[top_left + 1] * across) * (1 - down) +
+                (field_y[bottom_left] * (1 - across) + field_y[bottom_left + 1] * across) * down)
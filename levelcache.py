@@ -0,0 +1,65 @@
+""" Contains functions for the level cache, which keeps each level's images on disk already scaled for the screen, along
+with their centroids, so starting a level doesn't have to load and scale every image again. To see how it's used, see
+engine.py. The cache folder can be changed (or the cache turned off) in settings.py.
+"""
+import cPickle
+import hashlib
+import os
+import pygame
+import settings
+
+
+def get_asset_hash(names):
+    """ Returns a hex digest of the contents of the PNG files with the given names in the data folder.
+    """
+    digest = hashlib.sha1()
+    for name in sorted(set(names)):
+        with open(os.path.join("data", name + ".png"), "rb") as image_file:
+            digest.update(name)
+            digest.update(image_file.read())
+    return digest.hexdigest()
+
+
+def get_path(lvl_num, resolution, names):
+    """ Returns the path of the cache file for the integer level number at the 2-tuple resolution, using the images
+    with the given names. Editing any of the images changes the path, so stale images are never read.
+    """
+    return os.path.join(settings.Settings.level_cache_dir, "lvl_%d_%dx%d_%s.cache" % (lvl_num, resolution[0],
+        resolution[1], get_asset_hash(names)[:16]))
+
+
+def read(path):
+    """ Returns a dictionary of the images in the cache file at path, mapping (name, size) keys to 2-tuples of a
+    pygame surface and its centroid (None if it isn't needed). Returns an empty dictionary if there's no usable file.
+    """
+    try:
+        with open(path, "rb") as cache_file:
+            entries = cPickle.load(cache_file)
+    except Exception:
+        return {}
+    images = {}
+    for key, (size, pixels, centroid) in entries.items():
+        images[key] = (pygame.image.fromstring(pixels, size, "RGBA").convert_alpha(), centroid)
+    return images
+
+
+def write(path, images):
+    """ Writes the dictionary of images (see read function) to the cache file at path, removing the cache files of older
+    versions of the same level's images at the same resolution. Failing to write is ignored, as the cache only saves
+    time.
+    """
+    entries = {}
+    for key, (surface, centroid) in images.items():
+        entries[key] = (surface.get_size(), pygame.image.tostring(surface, "RGBA"), centroid)
+    folder, filename = os.path.split(path)
+    prefix = filename[:filename.rindex("_") + 1]
+    try:
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        for old_filename in os.listdir(folder):
+            if old_filename.startswith(prefix) and old_filename != filename:
+                os.remove(os.path.join(folder, old_filename))
+        with open(path, "wb") as cache_file:
+            cPickle.dump(entries, cache_file, cPickle.HIGHEST_PROTOCOL)
+    except (IOError, OSError):
+        pass
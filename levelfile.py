@@ -0,0 +1,271 @@
+""" Contains the level file format: loading, validating and compiling levels stored as JSON files in the data folder.
+To see how compiled levels are loaded, see engine.py. To see the game's levels, see levels.py. Run this file with
+python to check every level file.
+
+A level file holds a JSON object with the keys:
+"description" (optional) - a short description of the level,
+"target" - name of the body the hero must reach, "hero" - name of the launchable body (recommended: "rocket"),
+"bodies" - list of body objects, each with the keys:
+    "name" - name of the body (must have a PNG file with the same name in the data folder, unless "image" is given),
+    "image" (optional) - name of the PNG file in the data folder used for the body, so bodies can share an image,
+    "size" - a number for a square body, or a [width, height] list, on a scale from 1 to 500,
+    "position" - [x, y] position of the body's top-left corner, on a scale from 1 to 500,
+    "density" (optional, default 1.0) - used with the size to calculate the body's mass,
+    "point_lvls" (optional) - list of scores, from lowest to highest, at which info-bits about the body appear (each
+        must have a PNG file named "fact_lvl_(level number)_(body)_(fact number)" in the data folder),
+    "particle" (optional, default false) - whether the body undergoes gravitational acceleration or is stationary,
+    "ignore" (optional) - list of other bodies which do not affect its gravitation, or instead
+    "attracted_by" (optional) - list of the only other bodies which do affect its gravitation,
+    "velocity" (optional, default [0.0, 0.0]) - initial velocity (-y means up).
+"""
+import json
+import os
+import sys
+from array import array
+import settings
+
+
+BODY_KEYS = ("name", "image", "size", "position", "density", "point_lvls", "particle", "ignore", "attracted_by", "velocity")
+LEVEL_KEYS = ("description", "target", "hero", "bodies")
+
+
+class LevelError(Exception):
+    """ Raised when a level file can't be read, or doesn't describe a valid level. The message lists every problem
+    found.
+    """
+    pass
+
+
+class CompiledLevel:
+    """ A validated level packed into flat arrays, indexed by body in the order the bodies are listed in the level
+    file. Pairs of values (sizes, positions, velocities) are stored one after the other, x before y.
+    """
+
+    def __init__(self, names, target, hero):
+        """ Initializes an empty level for the list of body names. Parameters: target and hero - body names.
+        """
+        count = len(names)
+        self.names = names
+        # Name of the PNG file used by each body
+        self.images = list(names)
+        self.target = target
+        self.hero = hero
+        # Whether each body's size is a single number, converted against the screen's smallest dimension
+        self.square = bytearray(count)
+        self.sizes = array("d", [0.0] * (2 * count))
+        self.positions = array("d", [0.0] * (2 * count))
+        self.masses = array("d", [0.0] * count)
+        self.velocities = array("d", [0.0] * (2 * count))
+        self.particles = bytearray(count)
+        # exclusions[i * count + j] is set when body j doesn't affect body i's gravitation (None when no body ignores
+        # any other)
+        self.exclusions = None
+        # The point levels of body i are point_lvls[point_offsets[i]:point_offsets[i + 1]]
+        self.point_lvls = array("d")
+        self.point_offsets = array("i", [0] * (count + 1))
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_size(self, index):
+        """ Returns the size of the body at index as it's written in the level: an int for a square body, or else a
+        2-tuple.
+        """
+        if self.square[index]:
+            return int(self.sizes[2 * index])
+        return (self.sizes[2 * index], self.sizes[2 * index + 1])
+
+    def get_position(self, index):
+        """ Returns the 2-tuple position of the body at index.
+        """
+        return (self.positions[2 * index], self.positions[2 * index + 1])
+
+    def get_velocity(self, index):
+        """ Returns the 2-tuple initial velocity of the body at index.
+        """
+        return (self.velocities[2 * index], self.velocities[2 * index + 1])
+
+    def get_point_lvls(self, index):
+        """ Returns a list of the point levels of the body at index.
+        """
+        return list(self.point_lvls[self.point_offsets[index]:self.point_offsets[index + 1]])
+
+    def get_ignored(self, index):
+        """ Returns a list of the names of the bodies which don't affect the gravitation of the body at index.
+        """
+        if self.exclusions is None:
+            return []
+        count = len(self.names)
+        row = self.exclusions[index * count:(index + 1) * count]
+        return [name for name, excluded in zip(self.names, row) if excluded]
+
+
+def get_path(lvl_num):
+    """ Returns the path of the level file for the integer level number.
+    """
+    return os.path.join("data", "lvl_%d.json" % lvl_num)
+
+
+def is_number(value):
+    """ Returns whether or not the value read from JSON is a number (JSON's true and false aren't).
+    """
+    return type(value) in (int, long, float)
+
+
+def is_pair(value):
+    """ Returns whether or not the value read from JSON is a list of two numbers.
+    """
+    return type(value) == list and len(value) == 2 and is_number(value[0]) and is_number(value[1])
+
+
+def validate(level, lvl_num=None):
+    """ Checks that level, a level read from JSON, describes a valid level, and that every image it needs is in the
+    data folder (including info-bits when the integer lvl_num is given). Raises a LevelError listing every problem
+    found.
+    """
+    problems = []
+    if type(level) != dict:
+        raise LevelError("A level must be a JSON object")
+    for key in level:
+        if key not in LEVEL_KEYS:
+            problems.append("Unknown level key '%s'" % key)
+    bodies = level.get("bodies")
+    if type(bodies) != list or not bodies:
+        raise LevelError("\n".join(problems + ["A level needs a non-empty list of bodies"]))
+    names = []
+    name_set = set()
+    image_set = set()
+    for index, body in enumerate(bodies):
+        if type(body) != dict or not isinstance(body.get("name"), basestring):
+            problems.append("Body %d must be an object with a name" % index)
+            names.append(None)
+            continue
+        name = body["name"]
+        if name in name_set:
+            problems.append("Body '%s' is listed twice" % name)
+        names.append(name)
+        name_set.add(name)
+        image = body.get("image", name)
+        if not isinstance(image, basestring):
+            problems.append("Body '%s' needs the name of a PNG file for its image" % name)
+        elif image not in image_set:
+            if not os.path.isfile(os.path.join("data", image + ".png")):
+                problems.append("Body '%s' has no image %s.png in the data folder" % (name, image))
+            image_set.add(image)
+        for key in body:
+            if key not in BODY_KEYS:
+                problems.append("Body '%s' has unknown key '%s'" % (name, key))
+        size = body.get("size")
+        if not ((type(size) == int and size > 0) or (is_pair(size) and size[0] > 0 and size[1] > 0)):
+            problems.append("Body '%s' needs a positive integer size or a [width, height] size" % name)
+        if not is_pair(body.get("position")):
+            problems.append("Body '%s' needs an [x, y] position" % name)
+        if not is_number(body.get("density", 1.0)) or body.get("density", 1.0) <= 0:
+            problems.append("Body '%s' needs a positive density" % name)
+        point_lvls = body.get("point_lvls", [])
+        if type(point_lvls) != list or not all(is_number(point_lvl) for point_lvl in point_lvls):
+            problems.append("Body '%s' needs a list of numbers for its point levels" % name)
+        elif point_lvls != sorted(point_lvls):
+            problems.append("Body '%s' needs its point levels from lowest to highest" % name)
+        elif lvl_num is not None:
+            for fact_num in range(len(point_lvls)):
+                factname = "fact_lvl_%d_%s_%d" % (lvl_num, name, fact_num)
+                if not os.path.isfile(os.path.join("data", factname + ".png")):
+                    problems.append("Body '%s' has no info-bit image %s.png in the data folder" % (name, factname))
+        if type(body.get("particle", False)) != bool:
+            problems.append("Body '%s' needs true or false for particle" % name)
+        if not is_pair(body.get("velocity", [0.0, 0.0])):
+            problems.append("Body '%s' needs an [x, y] velocity" % name)
+        if "ignore" in body and "attracted_by" in body:
+            problems.append("Body '%s' can't have both ignore and attracted_by" % name)
+    for body in bodies:
+        if type(body) != dict or body.get("name") not in name_set:
+            continue
+        for key in ("ignore", "attracted_by"):
+            others = body.get(key, [])
+            if type(others) != list:
+                problems.append("Body '%s' needs a list of body names for %s" % (body["name"], key))
+                continue
+            for other in others:
+                if other not in name_set or other == body["name"]:
+                    problems.append("Body '%s' lists '%s' in %s, which isn't another body" % (body["name"], other, key))
+    for key in ("target", "hero"):
+        if level.get(key) not in name_set:
+            problems.append("The %s '%s' isn't a body in the level" % (key, level.get(key)))
+    if level.get("hero") in name_set and not bodies[names.index(level["hero"])].get("particle", False):
+        problems.append("The hero must be a particle")
+    if "earth" not in name_set:
+        problems.append("The hero is launched from the earth, which isn't a body in the level")
+    elif type(bodies[names.index("earth")].get("size")) != int:
+        problems.append("The earth needs a square size, since the hero's launcher is sized from it")
+    if problems:
+        raise LevelError("\n".join(problems))
+
+
+def compile_level(level):
+    """ Returns a CompiledLevel packing the validated level read from JSON.
+    """
+    bodies = level["bodies"]
+    names = [str(body["name"]) for body in bodies]
+    compiled = CompiledLevel(names, str(level["target"]), str(level["hero"]))
+    count = len(names)
+    indices = dict((name, index) for index, name in enumerate(names))
+    for index, body in enumerate(bodies):
+        compiled.images[index] = str(body.get("image", body["name"]))
+        size = body["size"]
+        # The mass is the density times the sum of the squared size entries, as in Game.create_body
+        if type(size) == int:
+            compiled.square[index] = 1
+            compiled.masses[index] = size ** 2 * body.get("density", 1.0)
+            size = (size, size)
+        else:
+            compiled.masses[index] = (size[0] ** 2 + size[1] ** 2) * body.get("density", 1.0)
+        compiled.sizes[2 * index:2 * index + 2] = array("d", size)
+        compiled.positions[2 * index:2 * index + 2] = array("d", body["position"])
+        compiled.velocities[2 * index:2 * index + 2] = array("d", body.get("velocity", [0.0, 0.0]))
+        compiled.particles[index] = body.get("particle", False)
+        compiled.point_lvls.extend(body.get("point_lvls", []))
+        compiled.point_offsets[index + 1] = len(compiled.point_lvls)
+        if "attracted_by" in body:
+            attracted_by = set(body["attracted_by"])
+            ignored = [name for name in names if name not in attracted_by and name != body["name"]]
+        else:
+            ignored = body.get("ignore", [])
+        if ignored and compiled.exclusions is None:
+            compiled.exclusions = bytearray(count * count)
+        for name in ignored:
+            compiled.exclusions[index * count + indices[name]] = 1
+    return compiled
+
+
+def build(level, lvl_num=None):
+    """ Returns a CompiledLevel for the level read from JSON (or generated in the same form), validated first (see
+    validate function).
+    """
+    validate(level, lvl_num)
+    return compile_level(level)
+
+
+def load(path, lvl_num=None):
+    """ Returns a CompiledLevel read from the level file at path, validated first (see validate function).
+    """
+    try:
+        with open(path) as level_file:
+            level = json.load(level_file)
+    except (IOError, ValueError), message:
+        raise LevelError("Cannot load level %s: %s" % (path, message))
+    try:
+        return build(level, lvl_num)
+    except LevelError, message:
+        raise LevelError("Invalid level %s:\n%s" % (path, message))
+
+
+if __name__ == "__main__":
+    valid = True
+    for lvl_num in range(settings.Settings.total_lvls):
+        try:
+            load(get_path(lvl_num), lvl_num)
+        except LevelError, message:
+            print message
+            valid = False
+    sys.exit(not valid)
@@ -0,0 +1,120 @@
+""" Contains the procedural level generator, used to build large levels for testing how the game's physics, collision
+detection and drawing scale with the number of bodies. Generated levels are in the same form as level files (see
+levelfile.py), using the existing asteroid and planet images, and the same seed always gives the same level.
+
+To play a generated level, run this file with python, e.g. "python levelgen.py belt 200 5 42" for a belt of 200
+moving bodies and 5 stationary ones, generated with seed 42.
+"""
+import math
+import random
+import sys
+import engine
+import levelfile
+import settings
+
+
+# Images used by the generated moving and stationary bodies
+ASTEROIDS = ["asteroid_%d" % index for index in range(14)]
+PLANETS = ["mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune", "ceres", "pluto", "moon", "io",
+           "europa", "ganymede", "callisto", "titan", "triton", "charon", "phobos", "deimos"]
+LAYOUTS = ("ring", "belt", "cluster")
+DISTRIBUTIONS = ("equal", "uniform", "power")
+# Center of the level, and of the star the ring and belt layouts orbit, on the 1-500 scale
+CENTER = (250.0, 250.0)
+STAR_SIZE = 60
+STAR_DENSITY = 3.5
+
+
+def get_size(rng, distribution, smallest, largest):
+    """ Returns an integer body size between smallest and largest, drawn from the random.Random rng by the named
+    distribution: "equal" (every body the largest size), "uniform", or "power" (a power law, with many small bodies
+    and few large ones).
+    """
+    if distribution == "equal":
+        return largest
+    if distribution == "uniform":
+        return rng.randint(smallest, largest)
+    return min(int(smallest * rng.paretovariate(1.5)), largest)
+
+
+def get_position(center, size, screen_size):
+    """ Returns the [x, y] position (top-left corner, on the 1-500 scale) of a square body of the given size centered
+    on the 2-tuple center. Sizes are scaled by the screen's smaller dimension but positions by each dimension on its
+    own, so on a screen which isn't square, the half size is converted to each axis's scale to keep the body centered.
+    """
+    return [center[axis] - size / 2.0 * min(screen_size) / screen_size[axis] for axis in (0, 1)]
+
+
+def get_orbital_velocity(offset, mass, screen_size):
+    """ Returns the 2-tuple velocity in pixels / game tick for a circular orbit, anticlockwise onscreen, around a body
+    of the given mass, from the 2-tuple offset (on the 1-500 scale) to the orbiting body.
+    """
+    x = offset[0] / 500.0 * screen_size[0]
+    y = offset[1] / 500.0 * screen_size[1]
+    r = math.sqrt(x ** 2 + y ** 2)
+    speed = math.sqrt(settings.Settings.G_default * mass / r)
+    return (y / r * speed, - x / r * speed)
+
+
+def generate(layout="belt", moving=100, stationary=0, seed=0, distribution="power", screen_size=None):
+    """ Returns a level in the same form as a level file (see levelfile.py), with the named layout: "ring" (moving
+    bodies evenly spaced in orbit around a central star), "belt" (moving bodies scattered in orbit around a central
+    star) or "cluster" (moving bodies gathered in a few loose groups, with no star). Parameters: moving and stationary -
+    number of bodies of each kind, besides the earth and the hero, seed - seed for the random numbers, distribution -
+    how body sizes and therefore masses are spread (see get_size function), screen_size - 2-tuple used to work out
+    body positions and orbital velocities (the window size in settings.py by default).
+    """
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown layout %r, should be one of %s" % (layout, ", ".join(LAYOUTS)))
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError("Unknown distribution %r, should be one of %s" % (distribution, ", ".join(DISTRIBUTIONS)))
+    if not screen_size:
+        screen_size = settings.Settings.screen_size
+    rng = random.Random(seed)
+    bodies = [{"name": "earth", "size": 30, "position": [10, 440]},
+              {"name": "rocket", "size": 30, "position": [0, 0], "density": 0.01, "particle": True,
+               "velocity": [8.0, -8.0]}]
+    target = None
+    if layout != "cluster":
+        bodies.append({"name": "sun", "size": STAR_SIZE, "position": get_position(CENTER, STAR_SIZE, screen_size),
+                       "density": STAR_DENSITY})
+        target = "sun"
+    for index in range(stationary):
+        size = get_size(rng, distribution, 15, 45)
+        bodies.append({"name": "planet_%d" % index, "image": rng.choice(PLANETS), "size": size,
+                       "position": [rng.uniform(0, 500 - size), rng.uniform(0, 500 - size)]})
+        target = target or "planet_0"
+    if layout == "cluster":
+        centers = [(rng.uniform(100, 400), rng.uniform(100, 400)) for index in range(max(1, moving // 100))]
+    for index in range(moving):
+        size = get_size(rng, distribution, 4, 15)
+        if layout == "cluster":
+            center = rng.choice(centers)
+            position = (rng.gauss(center[0], 30), rng.gauss(center[1], 30))
+            velocity = (rng.gauss(0.0, 0.5), rng.gauss(0.0, 0.5))
+        else:
+            if layout == "ring":
+                angle = 2 * math.pi * index / moving
+                radius = 170 + rng.uniform(-5, 5)
+            else:
+                angle = rng.uniform(0, 2 * math.pi)
+                radius = rng.uniform(100, 230)
+            offset = (radius * math.cos(angle), radius * math.sin(angle))
+            position = (CENTER[0] + offset[0], CENTER[1] + offset[1])
+            velocity = get_orbital_velocity(offset, STAR_SIZE ** 2 * STAR_DENSITY, screen_size)
+        bodies.append({"name": "asteroid_body_%d" % index, "image": rng.choice(ASTEROIDS), "size": size,
+                       "position": get_position(position, size, screen_size), "particle": True,
+                       "velocity": list(velocity)})
+        target = target or "asteroid_body_0"
+    return {"description": "Generated %s level with %d moving and %d stationary bodies, seed %d." % (layout, moving,
+            stationary, seed), "target": target or "earth", "hero": "rocket", "bodies": bodies}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in LAYOUTS:
+        print "Usage: python levelgen.py ring|belt|cluster [moving] [stationary] [seed] [equal|uniform|power]"
+        sys.exit(2)
+    game = engine.Game()
+    options = [int(arg) for arg in sys.argv[2:5]] + sys.argv[5:6]
+    game.load_level(levelfile.build(generate(sys.argv[1], *options, screen_size=game.screen.get_size())))
+    game.run()
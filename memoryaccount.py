@@ -0,0 +1,102 @@
+""" Contains the MemoryAccount class, which adds up the bytes held by the game's surfaces, masks and precomputed grids by
+category, keeping the peak of each category for every level. To see how it's used, see engine.py. A budget can be set,
+and the report's file name changed, in settings.py.
+"""
+import struct
+from array import array
+import pygame
+
+
+# Categories in the order they're reported. An object reachable from several categories is only counted in the first
+# one it's found in (see engine.Game.get_memory_items method).
+CATEGORIES = ("screen", "facts", "halo", "bodies", "widgets", "dimmer", "caches")
+# Masks keep their bits in rows of unsigned longs
+MASK_WORD = struct.calcsize("L")
+
+
+def get_bytes(item):
+    """ Returns the number of bytes of data held by item: a pygame surface, mask, array or bytearray. Subsurfaces share
+    their parent's pixels, so hold none of their own, and anything else counts as nothing.
+    """
+    if isinstance(item, pygame.Surface):
+        if item.get_parent():
+            return 0
+        return item.get_pitch() * item.get_height()
+    if isinstance(item, pygame.mask.MaskType):
+        width, height = item.get_size()
+        return ((width - 1) // (MASK_WORD * 8) + 1) * height * MASK_WORD if width and height else 0
+    if isinstance(item, array):
+        return len(item) * item.itemsize
+    if isinstance(item, bytearray):
+        return len(item)
+    return 0
+
+
+class MemoryAccount:
+    """ Keeps the bytes held in each category when last sampled, and the most held in each category, and in total, by
+    every level sampled. Sampling walks the live objects each time rather than following every allocation, so it's
+    only done when the game's memory changes (loading levels, the halo, info-bits, dimming) or is asked for.
+    """
+
+    def __init__(self, budget=None):
+        """ Initializes the account with nothing sampled. Parameter: budget - most bytes the game should hold in total,
+        with a warning printed the first time a level goes over it (None for no budget).
+        """
+        self.budget = budget
+        self.usage = dict((category, 0) for category in CATEGORIES)
+        self.counts = dict((category, 0) for category in CATEGORIES)
+        # Maps each level to a dictionary of the peak bytes of each category, and of every category together ("total")
+        self.peaks = {}
+        self.over_budget = set()
+
+    def sample(self, level, items):
+        """ Counts the bytes held by every item in items, a sequence of 2-tuples with a category and a surface, mask,
+        array or bytearray, and adds them to level's peaks. Returns the total bytes held.
+        """
+        usage = dict((category, 0) for category in CATEGORIES)
+        counts = dict((category, 0) for category in CATEGORIES)
+        seen = set()
+        for category, item in items:
+            if item is None or id(item) in seen:
+                continue
+            seen.add(id(item))
+            usage[category] += get_bytes(item)
+            counts[category] += 1
+        self.usage = usage
+        self.counts = counts
+        total = self.get_total()
+        peaks = self.peaks.setdefault(level, dict((category, 0) for category in CATEGORIES + ("total",)))
+        for category in CATEGORIES:
+            peaks[category] = max(peaks[category], usage[category])
+        peaks["total"] = max(peaks["total"], total)
+        if self.budget is not None and total > self.budget and level not in self.over_budget:
+            self.over_budget.add(level)
+            print "Memory budget exceeded at level %s: %d KB held, %d KB budgeted" % (level, total / 1024,
+                                                                                      self.budget / 1024)
+        return total
+
+    def get_total(self):
+        """ Returns the total bytes held when last sampled.
+        """
+        return sum(self.usage.values())
+
+    def get_peak(self, level, category="total"):
+        """ Returns the most bytes held in the named category (or "total") at level, or 0 if it was never sampled.
+        """
+        return self.peaks.get(level, {}).get(category, 0)
+
+    def dump(self, path):
+        """ Writes a CSV file at path with a row per category and one for the total, giving the objects counted and
+        the kilobytes held when last sampled, and the peak kilobytes at each level.
+        """
+        levels = sorted(self.peaks)
+        with open(path, "w") as csv_file:
+            csv_file.write(",".join(["category", "objects", "current_kb"] +
+                                    ["peak_kb_lvl_%s" % level for level in levels]) + "\n")
+            for category in CATEGORIES + ("total",):
+                if category == "total":
+                    row = [category, str(sum(self.counts.values())), "%.1f" % (self.get_total() / 1024.0)]
+                else:
+                    row = [category, str(self.counts[category]), "%.1f" % (self.usage[category] / 1024.0)]
+                csv_file.write(",".join(row + ["%.1f" % (self.get_peak(level, category) / 1024.0)
+                                               for level in levels]) + "\n")
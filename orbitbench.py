@@ -0,0 +1,367 @@
+""" Contains the orbit benchmark, which checks how well each way of stepping the physics keeps the levels' moving bodies
+(moons, planets and asteroids) in orbit, and what it costs. Each level's moving bodies are run for a long time, with
+the hero left out, under each integrator and step size, measuring:
+    energy drift - largest change in the total energy, relative to its starting value,
+    angular momentum drift - largest change in a body's angular momentum around the body pulling it hardest at the
+        start (its primary), relative to its starting value, for the worst body,
+    period error - average difference in the time a body takes to first go around its primary, relative to a run with
+        a much smaller step size,
+    cost - wall-clock milliseconds per physics tick of game time.
+Energy and angular momentum are only conserved when every pull is either mutual or from a stationary body, which holds
+for every shipped level except lvl_1, where phobos is pulled by deimos but not the other way around.
+
+The integrators are "game" (the game's own physics ticks, moving bodies by whole pixels, see engine.py), "game_exact"
+(the same without the precomputed gravitational fields of stationary bodies, see gravityfield.py), and "euler",
+"symplectic" (the game's scheme: move, then accelerate, without rounding to pixels), "verlet" and "rk4" on exact
+positions. The game's own physics only takes whole ticks.
+
+To run: "python orbitbench.py", or "python orbitbench.py --help" for the options. For each level the settings no other
+setting beats on both cost and error (the Pareto front) are marked, and plotted to a PNG file, along with the cheapest
+setting whose error stays within the tolerance.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import pygame
+import benchmark
+import engine
+import levelfile
+import settings
+
+
+INTEGRATORS = ("game", "game_exact", "euler", "symplectic", "verlet", "rk4")
+STEP_SIZES = (1.0, 0.5, 0.25)
+# Integrator and step size of the run the periods are compared against
+REFERENCE = ("rk4", 0.0625)
+# Colours the integrators are plotted in
+COLOURS = {"game": (240, 80, 60), "game_exact": (240, 170, 60), "euler": (150, 150, 150),
+           "symplectic": (80, 200, 80), "verlet": (80, 160, 240), "rk4": (200, 100, 220)}
+
+
+class OrbitSystem:
+    """ The bodies of a loaded level as plain numbers, indexed in the order they were added to the game. States are
+    4-tuples of lists: the x and y of each body's center of mass, and the x and y of its velocity in pixels / tick.
+    """
+
+    def __init__(self, game):
+        """ Reads the bodies from the game, after the level is loaded and the hero hidden.
+        """
+        bodies = [game.bodies[name] for name in game.body_order]
+        self.names = list(game.body_order)
+        self.masses = [body.mass for body in bodies]
+        self.moving = [index for index, body in enumerate(bodies) if body.particle]
+        # Indices of the bodies which pull on each body
+        self.pullers = [[] for body in bodies]
+        for index in self.moving:
+            rebels = set(bodies[index].rebel_scum)
+            self.pullers[index] = [other for other in range(len(bodies))
+                                   if other != index and self.names[other] not in rebels]
+        # Pairs of bodies with a potential energy: at least one is moving and pulls or is pulled by the other
+        self.pairs = [(i, j) for i in range(len(bodies)) for j in range(i + 1, len(bodies))
+                      if j in self.pullers[i] or i in self.pullers[j]]
+        self.g = engine.Body.G
+        self.start = self.get_state(game)
+        xs, ys = self.start[0], self.start[1]
+        self.primaries = {}
+        for index in self.moving:
+            pulls = [(self.masses[other] / ((xs[other] - xs[index]) ** 2 + (ys[other] - ys[index]) ** 2), other)
+                     for other in self.pullers[index] if (xs[other], ys[other]) != (xs[index], ys[index])]
+            if pulls:
+                self.primaries[index] = max(pulls)[1]
+
+    def get_state(self, game):
+        """ Returns the state of the bodies in the game.
+        """
+        bodies = [game.bodies[name] for name in self.names]
+        return ([body.com[0] for body in bodies], [body.com[1] for body in bodies],
+                [body.velocity[0] for body in bodies], [body.velocity[1] for body in bodies])
+
+    def get_accelerations(self, xs, ys):
+        """ Returns 2-tuple of lists with the x and y gravitational acceleration of each body at the positions xs, ys.
+        """
+        accelerations_x = [0.0] * len(xs)
+        accelerations_y = [0.0] * len(xs)
+        for index in self.moving:
+            for other in self.pullers[index]:
+                x = xs[other] - xs[index]
+                y = ys[other] - ys[index]
+                r = math.sqrt(x * x + y * y)
+                if r:
+                    accelerations_x[index] += self.g * self.masses[other] * x / r ** 3
+                    accelerations_y[index] += self.g * self.masses[other] * y / r ** 3
+        return accelerations_x, accelerations_y
+
+    def get_energy(self, state):
+        """ Returns the total kinetic and gravitational potential energy of the bodies in state.
+        """
+        xs, ys, velocities_x, velocities_y = state
+        energy = sum(0.5 * self.masses[index] * (velocities_x[index] ** 2 + velocities_y[index] ** 2)
+                     for index in self.moving)
+        for i, j in self.pairs:
+            r = math.sqrt((xs[j] - xs[i]) ** 2 + (ys[j] - ys[i]) ** 2)
+            if r:
+                energy -= self.g * self.masses[i] * self.masses[j] / r
+        return energy
+
+    def get_relative(self, state, index):
+        """ Returns the 4-tuple position and velocity of the moving body at index relative to its primary in state.
+        """
+        primary = self.primaries[index]
+        return tuple(values[index] - values[primary] for values in state)
+
+
+def step_euler(system, state, dt):
+    """ Returns the state dt ticks later by Euler's method: moving by the old velocity, and accelerating by the old
+    positions.
+    """
+    xs, ys, velocities_x, velocities_y = state
+    accelerations_x, accelerations_y = system.get_accelerations(xs, ys)
+    return ([x + v * dt for x, v in zip(xs, velocities_x)], [y + v * dt for y, v in zip(ys, velocities_y)],
+            [v + a * dt for v, a in zip(velocities_x, accelerations_x)],
+            [v + a * dt for v, a in zip(velocities_y, accelerations_y)])
+
+
+def step_symplectic(system, state, dt):
+    """ Returns the state dt ticks later by the game's scheme (semi-implicit Euler): moving by the old velocity, then
+    accelerating by the new positions.
+    """
+    xs, ys, velocities_x, velocities_y = state
+    xs = [x + v * dt for x, v in zip(xs, velocities_x)]
+    ys = [y + v * dt for y, v in zip(ys, velocities_y)]
+    accelerations_x, accelerations_y = system.get_accelerations(xs, ys)
+    return (xs, ys, [v + a * dt for v, a in zip(velocities_x, accelerations_x)],
+            [v + a * dt for v, a in zip(velocities_y, accelerations_y)])
+
+
+def step_verlet(system, state, dt):
+    """ Returns the state dt ticks later by velocity Verlet integration.
+    """
+    xs, ys, velocities_x, velocities_y = state
+    accelerations_x, accelerations_y = system.get_accelerations(xs, ys)
+    xs = [x + v * dt + 0.5 * a * dt * dt for x, v, a in zip(xs, velocities_x, accelerations_x)]
+    ys = [y + v * dt + 0.5 * a * dt * dt for y, v, a in zip(ys, velocities_y, accelerations_y)]
+    new_accelerations_x, new_accelerations_y = system.get_accelerations(xs, ys)
+    return (xs, ys, [v + 0.5 * (a + b) * dt for v, a, b in zip(velocities_x, accelerations_x, new_accelerations_x)],
+            [v + 0.5 * (a + b) * dt for v, a, b in zip(velocities_y, accelerations_y, new_accelerations_y)])
+
+
+def step_rk4(system, state, dt):
+    """ Returns the state dt ticks later by the classic fourth order Runge-Kutta method.
+    """
+    def get_derivative(state):
+        return (state[2], state[3]) + system.get_accelerations(state[0], state[1])
+
+    def get_moved(state, derivative, fraction):
+        return tuple([value + rate * fraction for value, rate in zip(values, rates)]
+                     for values, rates in zip(state, derivative))
+    first = get_derivative(state)
+    second = get_derivative(get_moved(state, first, dt / 2))
+    third = get_derivative(get_moved(state, second, dt / 2))
+    fourth = get_derivative(get_moved(state, third, dt))
+    return tuple([value + dt / 6 * (a + 2 * b + 2 * c + d) for value, a, b, c, d in zip(*rates)]
+                 for rates in zip(state, first, second, third, fourth))
+
+
+STEPPERS = {"euler": step_euler, "symplectic": step_symplectic, "verlet": step_verlet, "rk4": step_rk4}
+
+
+class Tracker:
+    """ Follows the states of a run, once per tick of game time, keeping the largest drifts and the time each moving
+    body first goes around its primary.
+    """
+
+    def __init__(self, system):
+        """ Initializes the tracker from the system's starting state.
+        """
+        self.system = system
+        self.energy = system.get_energy(system.start)
+        self.energy_drift = 0.0
+        self.angular_momenta = {}
+        self.angles = {}
+        self.swept = {}
+        self.periods = {}
+        for index in system.primaries:
+            x, y, velocity_x, velocity_y = system.get_relative(system.start, index)
+            self.angular_momenta[index] = system.masses[index] * (x * velocity_y - y * velocity_x)
+            self.angles[index] = math.atan2(y, x)
+            self.swept[index] = 0.0
+        self.angular_momentum_drift = 0.0
+
+    def record(self, state, tick):
+        """ Affective method, records the state reached at the integer tick.
+        """
+        if self.energy:
+            self.energy_drift = max(self.energy_drift, abs(self.system.get_energy(state) / self.energy - 1))
+        for index in self.system.primaries:
+            x, y, velocity_x, velocity_y = self.system.get_relative(state, index)
+            if self.angular_momenta[index]:
+                drift = abs(self.system.masses[index] * (x * velocity_y - y * velocity_x) /
+                            self.angular_momenta[index] - 1)
+                self.angular_momentum_drift = max(self.angular_momentum_drift, drift)
+            angle = math.atan2(y, x)
+            turn = (angle - self.angles[index] + math.pi) % (2 * math.pi) - math.pi
+            self.angles[index] = angle
+            swept = self.swept[index] + turn
+            if index not in self.periods and abs(swept) >= 2 * math.pi and turn:
+                # Interpolates when the body came round within the last tick
+                self.periods[index] = tick - 1 + (2 * math.pi - abs(self.swept[index])) / abs(turn)
+            self.swept[index] = swept
+
+
+def run(system, game, lvl_num, integrator, dt, ticks):
+    """ Runs the level's moving bodies for the integer number of ticks of game time with the named integrator and step
+    size dt, in ticks. Returns the Tracker which followed it, and the wall-clock milliseconds per tick spent stepping.
+    """
+    tracker = Tracker(system)
+    cost = 0.0
+    if integrator in ("game", "game_exact"):
+        grid_size = settings.Settings.gravity_grid_size
+        if integrator == "game_exact":
+            settings.Settings.gravity_grid_size = 0
+        load_level(game, lvl_num)
+        settings.Settings.gravity_grid_size = grid_size
+        for tick in range(1, ticks + 1):
+            start = time.time()
+            game.simulate()
+            cost += time.time() - start
+            tracker.record(system.get_state(game), tick)
+    else:
+        state = system.start
+        step = STEPPERS[integrator]
+        steps_per_tick = int(round(1 / dt))
+        for tick in range(1, ticks + 1):
+            start = time.time()
+            for substep in range(steps_per_tick):
+                state = step(system, state, dt)
+            cost += time.time() - start
+            tracker.record(state, tick)
+    return tracker, cost * 1000 / ticks
+
+
+def load_level(game, lvl_num):
+    """ Loads the integer level number into the game, with the hero hidden so only the level's own bodies move.
+    """
+    game.reset_level()
+    game.lvl = lvl_num
+    game.load_level(levelfile.load(levelfile.get_path(lvl_num), lvl_num))
+    game.hero_hide()
+
+
+def get_pareto_front(rows):
+    """ Returns the list of rows (dictionaries with "cost" and "error") which no other row beats on both, by cost.
+    """
+    front = []
+    for row in sorted(rows, key=lambda row: (row["cost"], row["error"])):
+        if not front or row["error"] < front[-1]["error"]:
+            front.append(row)
+    return front
+
+
+def plot(rows, front, path, title):
+    """ Draws the rows (see get_pareto_front function) as points on logarithmic cost and error axes, joining the
+    Pareto front, and saves the picture as a PNG file at path.
+    """
+    size = (640, 480)
+    area = pygame.Rect(70, 40, size[0] - 100, size[1] - 100)
+    surface = pygame.Surface(size)
+    surface.fill((0, 0, 0))
+    font = pygame.font.Font(None, 18)
+    costs = [math.log10(row["cost"]) for row in rows]
+    errors = [math.log10(max(row["error"], 1e-12)) for row in rows]
+    cost_range = (min(costs) - 0.1, max(costs) + 0.1)
+    error_range = (min(errors) - 0.5, max(errors) + 0.5)
+
+    def get_point(row):
+        return (int(area.left + (math.log10(row["cost"]) - cost_range[0]) / (cost_range[1] - cost_range[0]) *
+                    area.width),
+                int(area.bottom - (math.log10(max(row["error"], 1e-12)) - error_range[0]) /
+                    (error_range[1] - error_range[0]) * area.height))
+    pygame.draw.rect(surface, (120, 120, 120), area, 1)
+    for power in range(int(math.ceil(error_range[0])), int(math.floor(error_range[1])) + 1):
+        y = int(area.bottom - (power - error_range[0]) / (error_range[1] - error_range[0]) * area.height)
+        surface.blit(font.render("1e%d" % power, True, (200, 200, 200)), (area.left - 40, y - 6))
+    surface.blit(font.render("%.3g" % 10 ** cost_range[0], True, (200, 200, 200)), (area.left, area.bottom + 6))
+    surface.blit(font.render("%.3g" % 10 ** cost_range[1], True, (200, 200, 200)), (area.right - 30, area.bottom + 6))
+    surface.blit(font.render("cost (ms per tick)", True, (200, 200, 200)), (area.centerx - 50, area.bottom + 6))
+    surface.blit(font.render("%s - error: worst drift or period error" % title, True, (255, 255, 255)), (area.left, 12))
+    if len(front) > 1:
+        pygame.draw.lines(surface, (255, 255, 255), False, [get_point(row) for row in front], 1)
+    for row in rows:
+        point = get_point(row)
+        pygame.draw.circle(surface, COLOURS[row["integrator"]], point, 5 if row in front else 3)
+        surface.blit(font.render("%s %g" % (row["integrator"], row["dt"]), True, COLOURS[row["integrator"]]),
+                     (point[0] + 6, point[1] - 6))
+    pygame.image.save(surface, path)
+
+
+def benchmark_level(game, lvl_num, ticks):
+    """ Runs every integrator and step size on the integer level number for the given number of ticks. Returns a
+    list of rows, dictionaries of the settings and measurements of each run, or an empty list when nothing in the
+    level moves.
+    """
+    load_level(game, lvl_num)
+    system = OrbitSystem(game)
+    if not system.moving:
+        return []
+    reference = run(system, game, lvl_num, REFERENCE[0], REFERENCE[1], ticks)[0]
+    rows = []
+    for integrator in INTEGRATORS:
+        for dt in ((1.0,) if integrator.startswith("game") else STEP_SIZES):
+            tracker, cost = run(system, game, lvl_num, integrator, dt, ticks)
+            period_errors = [abs(tracker.periods[index] / reference.periods[index] - 1)
+                             for index in reference.periods if index in tracker.periods]
+            # A body which went around its primary in the reference run, but not in this one, is far out
+            missing = [index for index in reference.periods if index not in tracker.periods]
+            period_error = 1.0 if missing else sum(period_errors) / len(period_errors) if period_errors else None
+            rows.append({"integrator": integrator, "dt": dt, "cost": cost, "energy_drift": tracker.energy_drift,
+                         "angular_momentum_drift": tracker.angular_momentum_drift, "period_error": period_error,
+                         "error": max(tracker.energy_drift, tracker.angular_momentum_drift, period_error or 0.0)})
+    return rows
+
+
+def main(args):
+    """ Runs the orbit benchmark from the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measures how well each integrator keeps the levels' orbits.")
+    parser.add_argument("--levels", type=int, nargs="+", default=range(settings.Settings.total_lvls),
+                        help="level numbers to run (default: all)")
+    parser.add_argument("--ticks", type=int, default=3000, help="ticks of game time per run (default: 3000)")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="largest error counted as keeping orbits stable (default: 0.05)")
+    parser.add_argument("--output", default="orbit_results.json", help="file the results are written to")
+    parser.add_argument("--plot", default="orbit_pareto_lvl_%d.png",
+                        help="PNG file each level's plot is saved to, with %%d for the level number")
+    options = parser.parse_args(args)
+    settings.Settings.level_cache_dir = None
+    game = benchmark.create_game()
+    results = {}
+    for lvl_num in options.levels:
+        rows = benchmark_level(game, lvl_num, options.ticks)
+        if not rows:
+            print "lvl_%d: nothing moves" % lvl_num
+            continue
+        front = get_pareto_front(rows)
+        print "lvl_%d:" % lvl_num
+        print "    %-11s %5s %9s %12s %12s %12s" % ("integrator", "dt", "ms/tick", "energy", "ang. mom.", "period")
+        for row in rows:
+            print "  %s %-11s %5g %9.4f %12.3g %12.3g %12s" % ("*" if row in front else " ", row["integrator"],
+                row["dt"], row["cost"], row["energy_drift"], row["angular_momentum_drift"],
+                "-" if row["period_error"] is None else "%.3g" % row["period_error"])
+        stable = [row for row in rows if row["error"] <= options.tolerance]
+        if stable:
+            cheapest = min(stable, key=lambda row: row["cost"])
+            print "  Cheapest within tolerance: %s, dt %g" % (cheapest["integrator"], cheapest["dt"])
+        else:
+            print "  No setting is within tolerance"
+        plot(rows, front, options.plot % lvl_num, "lvl_%d" % lvl_num)
+        results[str(lvl_num)] = rows
+    with open(options.output, "w") as results_file:
+        json.dump({"options": {"ticks": options.ticks, "reference": REFERENCE}, "levels": results}, results_file,
+                  indent=2, sort_keys=True)
+    print "(* on the Pareto front)"
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
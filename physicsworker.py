@@ -0,0 +1,94 @@
+""" Contains the PhysicsWorker class, which runs batches of the game's physics ticks on a thread of their own, so they
+overlap with the display update and the wait for the next frame. To see how it's used, see engine.py. The worker is
+an experiment, off unless turned on in settings.py.
+"""
+import atexit
+import sys
+import threading
+
+
+class PhysicsWorker:
+    """ Runs a function once per physics tick on a separate thread, a batch of ticks at a time. This is a plain handoff
+    rather than a double buffer: the thread which starts a batch hands the simulation over to the worker, and mustn't
+    touch it again until it collects the batch's result, so the two threads never share state while the worker runs.
+    Python runs one thread at a time, so the physics only overlaps with pygame calls which let other threads run
+    (updating the display, sleeping between frames), not with other Python code. Drawing waits for each batch, and
+    crashes and info-bits still stop the game while they're shown. The game's step function also reads the held
+    keys and pans the camera, so those happen on the worker's thread too.
+    """
+
+    def __init__(self, step):
+        """ Starts the worker's thread, waiting for a batch. The thread is stopped when the program exits. Parameter:
+        step - function running one physics tick, returning None to carry on, or anything else to end the batch early
+        with it as the result.
+        """
+        self.step = step
+        self.condition = threading.Condition()
+        # A 2-tuple of the number of ticks run and what the last tick returned (None once it's collected)
+        self.result = None
+        self.ticks = 0
+        self.busy = False
+        self.stopping = False
+        self.error = None
+        self.thread = threading.Thread(target=self.work, name="physics")
+        # The game quits with sys.exit from wherever it is, so the thread is stopped on the way out (see stop method)
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def start(self, ticks):
+        """ Affective method, has the worker run a batch of up to ticks physics ticks.
+        """
+        with self.condition:
+            self.ticks = ticks
+            self.busy = True
+            self.condition.notify_all()
+
+    def collect(self):
+        """ Waits for the batch running, if there is one, and returns its result, or None if there's no result left to
+        collect. Errors raised on the worker's thread are raised again here.
+        """
+        with self.condition:
+            while self.busy:
+                self.condition.wait()
+            result = self.result
+            self.result = None
+            error = self.error
+            self.error = None
+        if error:
+            raise error[0], error[1], error[2]
+        return result
+
+    def stop(self):
+        """ Affective method, waits for the batch running, if there is one, then stops the worker's thread.
+        """
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def work(self):
+        """ Affective method, the worker's thread: runs each batch started, then hands its result back, until the
+        worker is stopped.
+        """
+        while True:
+            with self.condition:
+                while not self.busy and not self.stopping:
+                    self.condition.wait()
+                if not self.busy:
+                    return
+                ticks = self.ticks
+            error = None
+            ran = 0
+            value = None
+            try:
+                while ran < ticks and value is None:
+                    value = self.step()
+                    ran += 1
+            except Exception:
+                error = sys.exc_info()
+            with self.condition:
+                self.result = (ran, value)
+                self.error = error
+                self.busy = False
+                self.condition.notify_all()
@@ -0,0 +1,157 @@
+""" Contains the FrameProfiler class, which times where each frame's time goes, shows it onscreen and exports it as CSV.
+To see how it's used, see engine.py. The number of frames kept can be changed in settings.py.
+"""
+import time
+from array import array
+import pygame
+
+
+class FrameProfiler:
+    """ Times named sections of each frame by wrapping methods of an object, keeping the timings of the last few frames
+    in a ring buffer. The wrappers are only set while profiling is on, so an object which isn't being profiled runs its
+    own methods untouched. Times are in milliseconds.
+    """
+
+    def __init__(self, owner, methods, size, gauges=()):
+        """ Initializes the profiler, turned off. Parameters: owner - object whose methods are timed, methods - list of
+        2-tuples with the name of each timed method and the section its time counts towards (several methods can share
+        a section), size - number of frames kept, gauges - list of 2-tuples with the name of each number recorded at
+        the end of every frame along with the timings, and a function returning it.
+        """
+        self.owner = owner
+        self.methods = methods
+        self.gauges = gauges
+        self.sections = []
+        for name, section in methods:
+            if section not in self.sections:
+                self.sections.append(section)
+        self.size = size
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        """ Affective method, forgets every frame recorded.
+        """
+        # The time of each whole frame, then each section, with the frame numbered count at index count % size
+        self.frames = array("d", [0.0] * self.size)
+        self.timings = dict((section, array("d", [0.0] * self.size)) for section in self.sections)
+        self.gauge_values = dict((name, array("d", [0.0] * self.size)) for name, function in self.gauges)
+        self.count = 0
+        self.current = dict((section, 0.0) for section in self.sections)
+        self.frame_start = None
+
+    def toggle(self):
+        """ Turns profiling on or off, and returns whether it's now on. Turning it on starts from no frames recorded.
+        """
+        if self.enabled:
+            for name, section in self.methods:
+                delattr(self.owner, name)
+        else:
+            self.clear()
+            for name, section in self.methods:
+                setattr(self.owner, name, self.get_timed(getattr(self.owner, name), section))
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def get_timed(self, method, section):
+        """ Returns a function which calls method, adding the time it takes to the section in the current frame.
+        """
+        current = self.current
+
+        def timed(*args, **kwargs):
+            start = time.time()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[section] += time.time() - start
+        return timed
+
+    def start_frame(self):
+        """ Affective method, starts timing a frame.
+        """
+        self.frame_start = time.time()
+        for section in self.sections:
+            self.current[section] = 0.0
+
+    def end_frame(self):
+        """ Affective method, records the frame started by start_frame in the ring buffer.
+        """
+        if self.frame_start is None:
+            return
+        index = self.count % self.size
+        self.frames[index] = (time.time() - self.frame_start) * 1000
+        for section in self.sections:
+            self.timings[section][index] = self.current[section] * 1000
+        for name, function in self.gauges:
+            self.gauge_values[name][index] = function()
+        self.count += 1
+        self.frame_start = None
+
+    def get_recorded(self, timings):
+        """ Returns a list of the values recorded in the ring buffer timings, from the oldest frame to the newest.
+        """
+        if self.count <= self.size:
+            return list(timings[:self.count])
+        index = self.count % self.size
+        return list(timings[index:]) + list(timings[:index])
+
+    def get_percentile(self, section, percent):
+        """ Returns the time which percent of the recorded frames take at most in the named section (None for whole
+        frames), or 0.0 when nothing is recorded.
+        """
+        timings = sorted(self.get_recorded(self.frames if section is None else self.timings[section]))
+        if not timings:
+            return 0.0
+        return timings[min(len(timings) - 1, int(len(timings) * percent / 100.0))]
+
+    def get_overlay_size(self, font, width, graph_height):
+        """ Returns the 2-tuple size of the overlay drawn with font, at the given width in pixels and with a graph
+        graph_height pixels high (see draw method).
+        """
+        return (width, graph_height + 12 + (len(self.sections) + len(self.gauges) + 2) * font.get_linesize())
+
+    def draw(self, surface, font, rect, budget):
+        """ Draws the overlay filling the pygame rect on surface: a graph of recent frame times, with a line at the
+        frame time budget, the 50th, 95th and 99th percentile times of whole frames and of each section, and the last
+        value of each gauge. The graph takes whatever height the text leaves (see get_overlay_size method).
+        """
+        surface.fill((0, 0, 0), rect)
+        graph = pygame.Rect(rect.left + 4, rect.top + 4, rect.width - 8,
+                            rect.height - 12 - (len(self.sections) + len(self.gauges) + 2) * font.get_linesize())
+        frames = self.get_recorded(self.frames)[-graph.width:]
+        scale = graph.height / (2.0 * budget)
+        for x, frame in enumerate(frames):
+            height = min(graph.height, int(frame * scale))
+            colour = (80, 200, 80) if frame <= budget else (220, 60, 40)
+            pygame.draw.line(surface, colour, (graph.left + x, graph.bottom - 1),
+                             (graph.left + x, graph.bottom - height))
+        pygame.draw.line(surface, (200, 200, 200), (graph.left, graph.bottom - int(budget * scale)),
+                         (graph.right - 1, graph.bottom - int(budget * scale)))
+        top = graph.bottom + 4
+        # Columns of the section name and each percentile, with a row of headings
+        column_width = (rect.width - 8) / 5
+        rows = [("ms", "50%", "95%", "99%")]
+        for section in [None] + self.sections:
+            rows.append((section or "frame",) + tuple("%.2f" % self.get_percentile(section, percent)
+                                                      for percent in (50, 95, 99)))
+        for name, function in self.gauges:
+            rows.append((name, "%g" % (self.get_recorded(self.gauge_values[name])[-1:] or [0.0])[0]))
+        for row in rows:
+            for column, text in enumerate(row):
+                surface.blit(font.render(text, True, (255, 255, 255)),
+                             (rect.left + 4 + column_width * (column + 1 if column else 0), top))
+            top += font.get_linesize()
+
+    def export(self, path):
+        """ Writes the recorded frames to a CSV file at path, one row per frame from oldest to newest, with the time of
+        the whole frame and of each section, and the value of each gauge.
+        """
+        columns = [self.get_recorded(self.frames)] + [self.get_recorded(self.timings[section])
+                                                       for section in self.sections]
+        columns += [self.get_recorded(self.gauge_values[name]) for name, function in self.gauges]
+        with open(path, "w") as csv_file:
+            csv_file.write(",".join(["frame", "frame_ms"] + [section + "_ms" for section in self.sections] +
+                                    [name for name, function in self.gauges]) + "\n")
+            first = self.count - len(columns[0])
+            for row, values in enumerate(zip(*columns)):
+                csv_file.write(",".join([str(first + row)] + ["%.4f" % value for value in values]) + "\n")
@@ -7,8 +7,52 @@ class Settings():
 
     # window size when not fullscreen mode (edit levels.py to disable fullscreen mode)
     screen_size = (1074, 768)
-    # max fps
+    # internal resolution the game is drawn at, then scaled once per frame to fit the window or fullscreen display,
+    # keeping its shape (None to draw at the display's own resolution)
+    render_size = None
+    # physics ticks per second (body velocities are in pixels / game tick)
     fps = 30
+    # max fps for drawing, body positions are interpolated between the last two physics ticks
+    render_fps = 60
+    # max physics ticks simulated in one frame, before the game stops trying to catch up to real time
+    max_ticks_per_frame = 5
+    # time warps the player can choose between (comma and period keys, or the warp widget), as multiples of the normal
+    # rate of physics ticks, and the least time warp while the hero is offscreen
+    time_warps = (1, 2, 4, 8)
+    offscreen_time_warp = 2
+    # experimental: whether each frame's physics ticks run on a thread of their own while the frame is sent to the
+    # display and the game waits for the next one (see physicsworker.py). Drawing still waits for the ticks, and
+    # crashes and info-bits still stop the game, so this only saves the time pygame spends outside Python
+    physics_thread = False
+    # threads doing blocking work such as decoding images and writing the level cache, and the most jobs waiting for
+    # them (see tasks.py), and whether levels run as cooperative tasks, which load the next level's images in the
+    # time frames leave over (experimental, levels run in the plain main loop otherwise)
+    task_workers = 2
+    task_backlog = 8
+    task_loop = False
+    # max time in milliseconds the game sleeps waiting for input while nothing onscreen is moving
+    idle_timeout = 250
+    # folder where each level's images are kept scaled for the screen, so levels start faster (None to turn off)
+    level_cache_dir = "cache"
+    # frame governor: whether drawing quality is lowered while frames take longer than the time between frames at
+    # render_fps (by skipping HUD redraws, then coarser collisions, sparser trails and skipping frames, in that order),
+    # the fraction of that time frames must take under for quality to be raised again, frames waited between changes,
+    # and how many times further apart trail points are kept when trails are sparser
+    governor = True
+    governor_recover = 0.75
+    governor_frames = 30
+    governor_trail_factor = 3
+    # frame profiler (F3 key): number of recent frames it keeps, and the CSV file they're exported to (F4 key)
+    profile_frames = 240
+    profile_csv = "frame_profile.csv"
+    # memory accounting: most kilobytes of surfaces, masks and grids the game should hold, warned about once per level
+    # when exceeded (None for no budget), and the CSV file its report is written to (F5 key)
+    memory_budget_kb = None
+    memory_report = "memory_report.csv"
+    # flight timeline, scrubbed through with the T key: physics ticks between keyframes (each tick in between is kept as
+    # a delta), and the most kilobytes kept before the start of the flight is forgotten (0 to not record flights)
+    timeline_keyframe_ticks = 60
+    timeline_max_kb = 4096
     # number of levels until end of game
     total_lvls = 9
     # constants used to determine text size and formatting
@@ -23,11 +67,31 @@ class Settings():
     observe_info_y_down = 50
     # user-interface clickable text colour
     widget_colour = (232, 192, 8)
+    # width in pixels of the grid cells used to find the widgets near the mouse
+    widget_cell_size = 64
     # number of past trajectories shown
     instant_replays = 5
     # colour and formatting for past trajectories
     replay_colours = (1.2, 1.3, 2.8)
     previous_attempts_info_pos = (32, 20)
+    # trajectory trails: max points kept per trail, min distance in pixels between them, line width, and the colour
+    # of the current flight's trail (past trails use the same colours as the previous attempts info)
+    trail_points = 600
+    trail_spacing = 6
+    trail_width = 2
+    trail_colour = (255, 255, 255)
+    # trail layer: how far past each edge of the screen trails are kept drawn, as a fraction of the screen size, and the
+    # points dropped from the start of a full trail before the trails are redrawn without them
+    trail_layer_margin = 0.5
+    trail_redraw_dropped = 60
+    # swarm mode (M key, before launching): rockets launched along with the hero, the most their launch angle (in
+    # degrees) and speed (as a fraction) are spread either way from the hero's, and the colour and width in pixels of
+    # the points they're drawn as
+    swarm_size = 200
+    swarm_angle_spread = 4.0
+    swarm_speed_spread = 0.1
+    swarm_colour = (255, 210, 90)
+    swarm_point_size = 2
     y_info_gap = 10
     # controls rate of change of angle/speed when using keyboard to modify
     angle_modifier = 1.0
@@ -47,6 +111,17 @@ class Settings():
     percent_point_modifier = 0.075
     point_modifier = 1000
     point_max_increment_distance = 75
+    # gravity of stationary bodies: width in pixels of the grid cells their field is precomputed on (0 adds up their
+    # pull body by body instead), and within how many of its rough radii from a body the field is calculated exactly
+    gravity_grid_size = 8
+    gravity_grid_exact_radius = 3.0
+    # camera: min and max zoom, zoom factor per mouse wheel step or +/- key press, pan speed in pixels per tick
+    # (w/a/s/d keys), and whether the camera follows the hero by default (f key toggles)
+    zoom_min = 0.25
+    zoom_max = 4.0
+    zoom_step = 1.25
+    pan_speed = 12
+    camera_follow = False
     # time in seconds hero is offcreen before the level is reset
     offscreen_reset_time = 8
     # determines crash/death screen
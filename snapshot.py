@@ -0,0 +1,85 @@
+""" Contains the Snapshot class, which keeps the state of every body at one physics tick, along with the rest of the
+game's simulation state, so the simulation can go back to it later: to retry from mid-flight, to try something else
+from the same point, or to run the same ticks again. To see how it's used, see engine.py.
+"""
+import struct
+from array import array
+import memoryaccount
+
+
+# Numbers kept for each body, in order: the x and y of its center of mass, velocity, acceleration, smoother and center
+# at the previous physics tick, then the left, top, width and height of its rect
+BODY_FIELDS = 14
+# Lists and tuples hold a pointer to each item
+POINTER = struct.calcsize("P")
+
+
+def get_bytes(value):
+    """ Returns roughly how many bytes value holds: arrays and bytearrays (see memoryaccount.get_bytes function) and
+    NumPy arrays count their data, lists and tuples a pointer to each item plus what their items hold, and dictionaries
+    what their values hold. Anything else counts as nothing, as it's shared rather than copied.
+    """
+    if isinstance(value, (list, tuple)):
+        return POINTER * len(value) + sum(get_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(get_bytes(item) for item in value.values())
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    return memoryaccount.get_bytes(value)
+
+
+class Snapshot:
+    """ The numbers of every body are packed into one array of floats, and the game's other arrays are copied whole.
+    Images and masks are kept by reference rather than copied, which amounts to copy-on-write: bodies never change an
+    image or mask, only replace it with a new one (see engine.Body.angler method). Taking and restoring a snapshot
+    both cost time in proportion to the number of bodies and the length of the arrays.
+    """
+
+    def __init__(self, bodies, arrays, values):
+        """ Captures the state. Parameters: bodies - list of engine.Body objects, arrays - list of the game's arrays,
+        values - dictionary of the rest of the state, kept as it's given, so it mustn't hold anything which changes in
+        place.
+        """
+        self.count = len(bodies)
+        self.body_values = array("d")
+        # The image, mask and angle of each body
+        self.looks = []
+        for body in bodies:
+            rect = body.rect
+            self.body_values.extend((body.com.x, body.com.y, body.velocity.x, body.velocity.y, body.acceleration.x,
+                                     body.acceleration.y, body.smoother.x, body.smoother.y, body.last_center[0],
+                                     body.last_center[1], rect.left, rect.top, rect.width, rect.height))
+            self.looks.append((body.image, body.mask, body.angle))
+        self.arrays = [source[:] for source in arrays]
+        self.values = values
+
+    def restore(self, bodies, arrays):
+        """ Affective method, sets the bodies and arrays, which must be the ones captured and in the same order, back to
+        their captured state. The rect, image, mask and angle are only restored for particles, as the game changes
+        those of stationary bodies itself (see engine.Game.toggle_halo method). Returns the dictionary of the rest of
+        the state.
+        """
+        if len(bodies) != self.count or len(arrays) != len(self.arrays):
+            raise ValueError("snapshot taken of %d bodies and %d arrays, not %d and %d" %
+                             (self.count, len(self.arrays), len(bodies), len(arrays)))
+        values = self.body_values
+        for index, body in enumerate(bodies):
+            start = index * BODY_FIELDS
+            body.com.set(values[start], values[start + 1])
+            body.velocity.set(values[start + 2], values[start + 3])
+            body.acceleration.set(values[start + 4], values[start + 5])
+            body.smoother.set(values[start + 6], values[start + 7])
+            body.last_center = (int(values[start + 8]), int(values[start + 9]))
+            if body.particle:
+                body.rect.left = int(values[start + 10])
+                body.rect.top = int(values[start + 11])
+                body.rect.size = (int(values[start + 12]), int(values[start + 13]))
+                body.image, body.mask, body.angle = self.looks[index]
+        for target, source in zip(arrays, self.arrays):
+            target[:] = source
+        return self.values
+
+    def get_bytes(self):
+        """ Returns roughly how many bytes the snapshot holds, not counting the images and masks it shares.
+        """
+        return get_bytes(self.body_values) + get_bytes(self.arrays) + get_bytes(self.values)
@@ -0,0 +1,209 @@
+""" Contains the Swarm class, which flies many rockets from one launch together, so the player can see the spread of
+outcomes around a launch. To see how it's used, see engine.py. The swarm's size and spread can be changed in
+settings.py. NumPy is used when it's installed, and isn't needed otherwise.
+"""
+import math
+from array import array
+import pygame
+try:
+    import numpy
+    # Needs NumPy itself
+    import pygame.surfarray
+except ImportError:
+    numpy = None
+
+
+class Swarm:
+    """ Rockets which are pulled by the level's bodies but have no mass of their own, so they don't pull on anything.
+    The position and velocity of every rocket are kept in arrays rather than bodies, and each physics tick moves all of
+    them in one pass: with NumPy, in whole-array operations for each body pulling them; otherwise, in one loop over the
+    arrays, with the pull of stationary bodies taken from a precomputed field. Like the hero, rockets can't crash
+    while they're still leaving the atmosphere of the bodies they launched from (see engine.Game.special_collision
+    method). After that, they crash when they come within a body's rough radius, and are then left out. That's coarser
+    than the hero's pixel perfect crashes (see engine.Body.check_collision method), so rockets can crash where the hero
+    would just graze a body, or the other way round: the swarm shows the spread of paths around a launch rather than
+    exactly the hero's outcomes.
+    """
+
+    def __init__(self, position, velocities):
+        """ Initializes the swarm. Parameters: position - 2-tuple every rocket starts at, velocities - list of 2-tuple
+        velocities, one for each rocket, in pixels / game tick.
+        """
+        self.count = len(velocities)
+        self.ticks = 0
+        if numpy:
+            self.x = numpy.empty(self.count)
+            self.x.fill(position[0])
+            self.y = numpy.empty(self.count)
+            self.y.fill(position[1])
+            self.velocity_x = numpy.array([velocity[0] for velocity in velocities], float)
+            self.velocity_y = numpy.array([velocity[1] for velocity in velocities], float)
+            self.alive = numpy.ones(self.count, bool)
+            self.atmosphere = numpy.ones(self.count, bool)
+        else:
+            self.x = array("d", [position[0]] * self.count)
+            self.y = array("d", [position[1]] * self.count)
+            self.velocity_x = array("d", [velocity[0] for velocity in velocities])
+            self.velocity_y = array("d", [velocity[1] for velocity in velocities])
+            self.alive = bytearray([1] * self.count)
+            self.atmosphere = bytearray([1] * self.count)
+
+    def get_alive(self):
+        """ Returns the number of rockets which haven't crashed.
+        """
+        if numpy:
+            return int(self.alive.sum())
+        return sum(self.alive)
+
+    def get_positions(self):
+        """ Returns a list of the 2-tuple position of each rocket which hasn't crashed.
+        """
+        if numpy:
+            return zip(self.x[self.alive].tolist(), self.y[self.alive].tolist())
+        return [(x, y) for x, y, alive in zip(self.x, self.y, self.alive) if alive]
+
+    def get_state(self):
+        """ Returns a copy of the swarm's tick count and arrays, for the set_state method.
+        """
+        if numpy:
+            return (self.ticks, self.x.copy(), self.y.copy(), self.velocity_x.copy(), self.velocity_y.copy(),
+                    self.alive.copy(), self.atmosphere.copy())
+        return (self.ticks, self.x[:], self.y[:], self.velocity_x[:], self.velocity_y[:], self.alive[:],
+                self.atmosphere[:])
+
+    def set_state(self, state):
+        """ Affective method, sets the swarm back to a state returned by the get_state method, copying its arrays in
+        place.
+        """
+        self.ticks = state[0]
+        for target, source in zip((self.x, self.y, self.velocity_x, self.velocity_y, self.alive, self.atmosphere),
+                                  state[1:]):
+            target[:] = source
+
+    def draw(self, surface, offset, zoom, colour, size):
+        """ Draws every rocket which hasn't crashed onto surface, as a square size pixels wide of colour, where
+        offset is the 2-tuple world coordinate at the surface's top-left corner, and zoom the surface pixels per world
+        pixel. Returns the rect covering the rockets drawn, or None if none were. With NumPy, the points are written
+        into the surface's pixels in whole-array operations, one for each pixel of the square; otherwise, each rocket
+        is filled in turn.
+        """
+        width, height = surface.get_size()
+        if numpy:
+            x = numpy.rint((self.x[self.alive] - offset[0]) * zoom).astype(int) - size / 2
+            y = numpy.rint((self.y[self.alive] - offset[1]) * zoom).astype(int) - size / 2
+            onscreen = (x > - size) & (x < width) & (y > - size) & (y < height)
+            x = x[onscreen]
+            y = y[onscreen]
+            if not len(x):
+                return None
+            pixels = pygame.surfarray.pixels2d(surface)
+            mapped = surface.map_rgb(colour)
+            for pixel_x in range(size):
+                for pixel_y in range(size):
+                    inside = (x + pixel_x >= 0) & (x + pixel_x < width) & (y + pixel_y >= 0) & (y + pixel_y < height)
+                    pixels[x[inside] + pixel_x, y[inside] + pixel_y] = mapped
+            # The surface stays locked while its pixels are referenced
+            del pixels
+            left = int(x.min())
+            top = int(y.min())
+            return pygame.Rect(left, top, int(x.max()) - left + size, int(y.max()) - top + size).clip(
+                surface.get_rect())
+        rects = []
+        for position in self.get_positions():
+            rect = pygame.Rect(int(round((position[0] - offset[0]) * zoom)) - size / 2,
+                               int(round((position[1] - offset[1]) * zoom)) - size / 2, size, size)
+            if rect.colliderect(surface.get_rect()):
+                rects.append(surface.fill(colour, rect))
+        if rects:
+            return rects[0].unionall(rects)
+        return None
+
+    def step(self, g, moving, stationary, field, obstacles, atmosphere, min_speed):
+        """ Affective method, moves every rocket which hasn't crashed by one physics tick, then crashes those within an
+        obstacle, then accelerates the rest. Parameters: g - gravitational constant, moving - list of 3-tuples with the
+        x and y of the center of mass and the mass of each moving body pulling the rockets, stationary - the same for
+        each stationary body pulling them, field - gravityfield.GravityField of the stationary bodies (None to work
+        their pull out exactly), obstacles - list of 3-tuples with the x and y of each body's center of mass and the
+        distance from it which rockets crash within, atmosphere - the same for the bodies the rockets launched from,
+        min_speed - speed a rocket must keep above to stay in their atmosphere.
+        """
+        if numpy:
+            self.step_arrays(g, moving + stationary, obstacles, atmosphere, min_speed)
+        else:
+            self.step_loop(g, moving, stationary, field, obstacles, atmosphere, min_speed)
+        self.ticks += 1
+
+    def step_arrays(self, g, sources, obstacles, atmosphere, min_speed):
+        """ Affective method, the step method with NumPy: each body's pull is worked out exactly for every rocket at
+        once.
+        """
+        alive = self.alive
+        self.x += self.velocity_x * alive
+        self.y += self.velocity_y * alive
+        x = self.x
+        y = self.y
+        if self.atmosphere.any():
+            within = numpy.zeros(self.count, bool)
+            for atmosphere_x, atmosphere_y, radius in atmosphere:
+                within |= (x - atmosphere_x) ** 2 + (y - atmosphere_y) ** 2 < radius * radius
+            self.atmosphere &= within & (self.velocity_x ** 2 + self.velocity_y ** 2 > min_speed * min_speed)
+        for obstacle_x, obstacle_y, radius in obstacles:
+            alive &= ((x - obstacle_x) ** 2 + (y - obstacle_y) ** 2 >= radius * radius) | self.atmosphere
+        acceleration_x = numpy.zeros(self.count)
+        acceleration_y = numpy.zeros(self.count)
+        for source_x, source_y, mass in sources:
+            separation_x = source_x - x
+            separation_y = source_y - y
+            r_cubed = (separation_x * separation_x + separation_y * separation_y) ** 1.5
+            # Rockets at a body's center of mass aren't pulled by it (see engine.Body.get_gravitational_force method)
+            r_cubed[r_cubed == 0] = numpy.inf
+            acceleration_x += mass * separation_x / r_cubed
+            acceleration_y += mass * separation_y / r_cubed
+        self.velocity_x += g * acceleration_x * alive
+        self.velocity_y += g * acceleration_y * alive
+
+    def step_loop(self, g, moving, stationary, field, obstacles, atmosphere, min_speed):
+        """ Affective method, the step method without NumPy: one loop over the rockets, taking the pull of stationary
+        bodies from field when there is one.
+        """
+        if field is None:
+            moving = moving + stationary
+        xs = self.x
+        ys = self.y
+        velocities_x = self.velocity_x
+        velocities_y = self.velocity_y
+        alive = self.alive
+        leaving = self.atmosphere
+        obstacles = [(obstacle_x, obstacle_y, radius * radius) for obstacle_x, obstacle_y, radius in obstacles]
+        atmosphere = [(atmosphere_x, atmosphere_y, radius * radius)
+                      for atmosphere_x, atmosphere_y, radius in atmosphere]
+        min_speed_squared = min_speed * min_speed
+        for index in range(self.count):
+            if not alive[index]:
+                continue
+            x = xs[index] + velocities_x[index]
+            y = ys[index] + velocities_y[index]
+            xs[index] = x
+            ys[index] = y
+            if leaving[index]:
+                leaving[index] = velocities_x[index] ** 2 + velocities_y[index] ** 2 > min_speed_squared and \
+                    any((x - atmosphere_x) ** 2 + (y - atmosphere_y) ** 2 < radius_squared
+                        for atmosphere_x, atmosphere_y, radius_squared in atmosphere)
+            for obstacle_x, obstacle_y, radius_squared in obstacles:
+                if not leaving[index] and (x - obstacle_x) ** 2 + (y - obstacle_y) ** 2 < radius_squared:
+                    alive[index] = 0
+                    break
+            else:
+                if field is None:
+                    acceleration_x = acceleration_y = 0.0
+                else:
+                    acceleration_x, acceleration_y = field.get_acceleration(x, y)
+                for source_x, source_y, mass in moving:
+                    separation_x = source_x - x
+                    separation_y = source_y - y
+                    r = math.sqrt(separation_x * separation_x + separation_y * separation_y)
+                    if r:
+                        acceleration_x += mass * separation_x / (r * r * r)
+                        acceleration_y += mass * separation_y / (r * r * r)
+                velocities_x[index] += g * acceleration_x
+                velocities_y[index] += g * acceleration_y
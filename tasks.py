@@ -0,0 +1,165 @@
+""" Contains the TaskLoop class, which runs the game's main loop as cooperative tasks along with background work, and
+the Executor class, which runs blocking work (decoding images, writing files) on worker threads. To see how they're
+used, see engine.py. The number of worker threads and the work they can be given at once can be changed in settings.py.
+
+Tasks are generators, as this version of Python has no asyncio: each one runs until it yields, then waits for its next
+turn. Yielding nothing gives up the turn. Yielding a Job (see Executor.submit) waits until the job is done, then
+carries on with the job's result as the value of the yield (or its error raised there).
+"""
+import Queue
+import sys
+import threading
+import time
+import traceback
+
+
+class Job:
+    """ A function call submitted to an Executor, done once its result (or error) is set.
+    """
+
+    def __init__(self, function, args):
+        """ Initialization method. Parameters: function - function called, args - tuple of its arguments.
+        """
+        self.function = function
+        self.args = args
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class Executor:
+    """ Runs jobs in the order they're submitted on a few worker threads, with at most a backlog of jobs waiting. When
+    the backlog is full, submitting a job is refused instead of waiting, so the game's thread never blocks on it: tasks
+    try again on a later turn, and anything else can do the work itself.
+    """
+
+    def __init__(self, workers, backlog):
+        """ Starts the worker threads. Parameters: workers - number of worker threads, backlog - most jobs waiting.
+        """
+        self.queue = Queue.Queue(backlog)
+        self.threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self.work, name="executor-%d" % index)
+            # The game can quit without waiting for the workers
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, function, *args):
+        """ Returns a Job calling function with args on a worker thread, or None if the backlog is full.
+        """
+        job = Job(function, args)
+        try:
+            self.queue.put_nowait(job)
+        except Queue.Full:
+            return None
+        return job
+
+    def call(self, function, *args):
+        """ Calls function with args on a worker thread, or right away if the backlog is full, for work whose result
+        isn't needed.
+        """
+        if not self.submit(function, *args):
+            function(*args)
+
+    def join(self):
+        """ Waits until every job submitted is done.
+        """
+        self.queue.join()
+
+    def work(self):
+        """ Affective method, the worker threads: runs each job in turn.
+        """
+        while True:
+            job = self.queue.get()
+            try:
+                job.result = job.function(*job.args)
+            except Exception:
+                job.error = sys.exc_info()
+            job.done = True
+            self.queue.task_done()
+
+
+class TaskLoop:
+    """ Runs frame tasks and background tasks, both generators (see above), one frame at a time. Each frame, every frame
+    task takes one turn, in the order they were spawned, so a frame task yields once per frame. Background tasks then
+    take turns for as long as the frame's time lasts, and the loop sleeps for whatever is left. Background tasks should
+    yield often, as each turn holds up the frame until it ends. The loop runs until every frame task has finished.
+    Background work is only ever a head start, so a background task raising an error is reported and dropped, leaving
+    its work to be done when it's needed; errors in frame tasks are raised from the loop.
+    """
+
+    def __init__(self, frame_time):
+        """ Initializes the loop with no tasks. Parameter: frame_time - seconds between the start of each frame.
+        """
+        self.frame_time = frame_time
+        # Each task is a list of the generator and the job it's waiting for (or None)
+        self.frame_tasks = []
+        self.background_tasks = []
+
+    def spawn(self, generator, background=False):
+        """ Affective method, adds the generator as a task, run every frame or, if background is set, in the time left
+        over by each frame.
+        """
+        if background:
+            self.background_tasks.append([generator, None])
+        else:
+            self.frame_tasks.append([generator, None])
+
+    def has_background(self):
+        """ Returns whether any background task is left to run.
+        """
+        return bool(self.background_tasks)
+
+    def step(self, task, tasks):
+        """ Gives task, from the list tasks, a turn, unless it's waiting for a job which isn't done. Finished tasks are
+        removed from tasks, as are background tasks which raise an error. Returns whether the task ran.
+        """
+        generator, job = task
+        if job and not job.done:
+            return False
+        task[1] = None
+        try:
+            if job and job.error:
+                yielded = generator.throw(job.error[0], job.error[1], job.error[2])
+            else:
+                yielded = generator.send(job.result if job else None)
+        except StopIteration:
+            tasks.remove(task)
+            return True
+        except Exception:
+            if tasks is not self.background_tasks:
+                raise
+            print "Background task stopped by an error, its work is left undone:"
+            traceback.print_exc()
+            tasks.remove(task)
+            return True
+        if isinstance(yielded, Job):
+            task[1] = yielded
+        return True
+
+    def run_frame(self):
+        """ Affective method, runs one frame: a turn of every frame task, then background tasks until the frame's time
+        is up.
+        """
+        deadline = time.time() + self.frame_time
+        for task in list(self.frame_tasks):
+            self.step(task, self.frame_tasks)
+        while self.frame_tasks and self.background_tasks and time.time() < deadline:
+            ran = False
+            for task in list(self.background_tasks):
+                if time.time() >= deadline:
+                    break
+                ran = self.step(task, self.background_tasks) or ran
+            # Every background task is waiting for a job, so there's nothing to do but wait
+            if not ran:
+                break
+        remaining = deadline - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def run(self):
+        """ Affective method, runs frames until every frame task has finished.
+        """
+        while self.frame_tasks:
+            self.run_frame()
@@ -0,0 +1,88 @@
+""" Contains the Timeline class, which records a flight tick by tick so the player can scrub back and forth through it.
+To see how it's used, see engine.py. How often keyframes are kept, and the most memory a timeline holds, can be changed
+in settings.py.
+"""
+import memoryaccount
+
+
+class Timeline:
+    """ A flight's physics ticks, numbered from 0 at launch, recorded in segments: each segment starts with a keyframe,
+    a snapshot.Snapshot of the whole simulation, followed by a delta for each tick after it, an array holding just what
+    a tick changes. Going to any tick costs restoring one keyframe plus applying at most a segment's worth of deltas.
+    Once the timeline holds more than its memory cap, its oldest segments are dropped, so the start of a long flight
+    is forgotten rather than memory growing without bound.
+    """
+
+    def __init__(self, keyframe_ticks, max_bytes):
+        """ Initializes an empty timeline. Parameters: keyframe_ticks - number of ticks in each segment, counting its
+        keyframe, max_bytes - most bytes of keyframes and deltas kept.
+        """
+        self.keyframe_ticks = keyframe_ticks
+        self.max_bytes = max_bytes
+        self.clear()
+
+    def clear(self):
+        """ Affective method, forgets every tick recorded.
+        """
+        # Each segment is a list of the tick of its keyframe, the keyframe, its deltas and the bytes they hold
+        self.segments = []
+        self.bytes = 0
+
+    def get_first(self):
+        """ Returns the first tick recorded, or None if the timeline is empty.
+        """
+        return self.segments[0][0] if self.segments else None
+
+    def get_last(self):
+        """ Returns the last tick recorded, or None if the timeline is empty.
+        """
+        return self.segments[-1][0] + len(self.segments[-1][2]) if self.segments else None
+
+    def is_keyframe_due(self):
+        """ Returns whether the next tick recorded should be a keyframe rather than a delta.
+        """
+        return not self.segments or len(self.segments[-1][2]) + 1 >= self.keyframe_ticks
+
+    def add_keyframe(self, tick, state):
+        """ Affective method, records the snapshot state as the keyframe of tick, starting a new segment. A keyframe
+        for a tick before the end of the timeline starts a new timeline.
+        """
+        if self.segments and tick != self.get_last() + 1:
+            self.clear()
+        size = state.get_bytes()
+        self.segments.append([tick, state, [], size])
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.segments) > 1:
+            self.bytes -= self.segments.pop(0)[3]
+
+    def add_delta(self, delta):
+        """ Affective method, records the array delta as the next tick.
+        """
+        segment = self.segments[-1]
+        size = memoryaccount.get_bytes(delta)
+        segment[2].append(delta)
+        segment[3] += size
+        self.bytes += size
+
+    def get_ticks(self, tick):
+        """ Returns a 2-tuple of the keyframe at or before tick, and a list of the deltas from it up to tick. Raises
+        IndexError if tick isn't recorded.
+        """
+        if not self.segments or not self.get_first() <= tick <= self.get_last():
+            raise IndexError("tick %s not recorded" % tick)
+        for start, state, deltas, size in reversed(self.segments):
+            if start <= tick:
+                return (state, deltas[:tick - start])
+
+    def truncate(self, tick):
+        """ Affective method, forgets every tick recorded after tick, so the flight can carry on from it differently.
+        """
+        while self.segments and self.segments[-1][0] > tick:
+            self.bytes -= self.segments.pop()[3]
+        if self.segments:
+            segment = self.segments[-1]
+            for delta in segment[2][tick - segment[0]:]:
+                size = memoryaccount.get_bytes(delta)
+                segment[3] -= size
+                self.bytes -= size
+            del segment[2][tick - segment[0]:]
@@ -0,0 +1,54 @@
+""" Contains the Trail class, used to remember the path of the hero for drawing trajectory trails. To see how trails
+are drawn, see engine.py. Trail length and spacing can be changed in settings.py.
+"""
+import math
+
+
+class Trail:
+    """ Stores points along a body's path in a fixed-capacity ring buffer. Points closer than the spacing to the last
+    point kept are skipped, and once the buffer is full the oldest points are overwritten, so the memory and drawing
+    cost of a trail don't grow with the length of a flight.
+    """
+
+    def __init__(self, capacity, spacing):
+        """ Initializes an empty trail. Parameters: capacity - max number of points kept, spacing - min distance in
+        pixels between consecutive points kept.
+        """
+        self.capacity = capacity
+        self.spacing = spacing
+        self.points = [None] * capacity
+        self.start = 0
+        self.count = 0
+        # Points overwritten since the trail was full, which whoever draws the trail can reset once it's redrawn
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def get_last(self):
+        """ Returns the most recently kept point, or None if the trail is empty.
+        """
+        if self.count:
+            return self.points[(self.start + self.count - 1) % self.capacity]
+        return None
+
+    def add(self, point):
+        """ Affective method, keeps the 2-tuple point if it's at least self.spacing from the last point kept.
+        Returns whether or not the point was kept.
+        """
+        last = self.get_last()
+        if last and math.hypot(point[0] - last[0], point[1] - last[1]) < self.spacing:
+            return False
+        if self.count < self.capacity:
+            self.points[(self.start + self.count) % self.capacity] = point
+            self.count += 1
+        else:
+            self.points[self.start] = point
+            self.start = (self.start + 1) % self.capacity
+            self.dropped += 1
+        return True
+
+    def get_points(self):
+        """ Returns a list of all points kept, from oldest to newest.
+        """
+        return [self.points[(self.start + index) % self.capacity] for index in range(self.count)]
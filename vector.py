@@ -0,0 +1,65 @@
+""" Contains the Vector class, the mutable 2-D vector bodies keep their center of mass, velocity and acceleration in, so
+each physics tick updates them in place instead of building new tuples. To see how it's used, see engine.py.
+"""
+import math
+
+
+class Vector(object):
+    """ A cartesian 2-D vector, with its components in the x and y attributes. Slots (which need a new-style class) keep
+    each vector down to its two components, without a dictionary. A vector reads like a 2-tuple - it can be indexed,
+    unpacked and passed to pygame - but unlike one it changes, so anything which keeps a vector's value rather than
+    following it should keep get_tuple() instead.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=0.0):
+        """ Initialization method. Parameters: x, y - the vector's components.
+        """
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        if index == 0 or index == -2:
+            return self.x
+        if index == 1 or index == -1:
+            return self.y
+        raise IndexError("vector index out of range")
+
+    def __repr__(self):
+        return "Vector(%r, %r)" % (self.x, self.y)
+
+    def set(self, x, y):
+        """ Affective method, sets both components.
+        """
+        self.x = x
+        self.y = y
+
+    def add(self, x, y):
+        """ Affective method, adds x and y to the components.
+        """
+        self.x += x
+        self.y += y
+
+    def set_polar(self, magnitude, angle):
+        """ Affective method, sets the vector from its magnitude and its angle in radians.
+        """
+        self.x = magnitude * math.cos(angle)
+        self.y = magnitude * math.sin(angle)
+
+    def get_magnitude(self):
+        """ Returns the vector's magnitude.
+        """
+        return math.hypot(self.x, self.y)
+
+    def get_angle(self):
+        """ Returns the vector's angle in radians, from - pi to pi.
+        """
+        return math.atan2(self.y, self.x)
+
+    def get_tuple(self):
+        """ Returns the vector's current value as a 2-tuple.
+        """
+        return (self.x, self.y)
@@ -0,0 +1,124 @@
+""" Contains the WidgetManager class, which keeps track of the widgets onscreen in each game state. To see how it's used,
+see engine.py.
+"""
+
+
+class WidgetManager:
+    """ Holds a precomputed list of widgets and their positions for each widget state (a game state, or a variant of
+    one such as paused), so switching states only swaps which list is active. The active widgets are indexed in a
+    grid of square cells, so mouse events only need to reach the widgets near the pointer. Widgets which need to be
+    erased and redrawn are marked dirty. Iterating over the manager gives the active widgets.
+    """
+
+    def __init__(self, cell_size):
+        """ Initializes the manager with no widget states. Parameter: cell_size - width in pixels of the grid cells.
+        """
+        self.cell_size = cell_size
+        # Maps each widget state to a 3-tuple: the list of widgets, their positions, and their grid
+        self.sets = {}
+        self.state = None
+        self.active = []
+        self.grid = {}
+        # Widgets near the pointer at the last mouse event
+        self.near = []
+        self.dirty = []
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __contains__(self, widget):
+        return widget in self.active
+
+    def __len__(self):
+        return len(self.active)
+
+    def get_cells(self, rect):
+        """ Returns a list of the grid cells, as 2-tuples, which the pygame rect covers.
+        """
+        cells = []
+        for x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                cells.append((x, y))
+        return cells
+
+    def add_set(self, state, placements):
+        """ Affective method, sets the widgets for the named widget state. Parameter: placements - list of 2-tuples
+        with each widget and the top-left position it's placed at in that state (None to leave the widget where it is).
+        Takes effect straight away if the state is active.
+        """
+        widget_list = []
+        grid = {}
+        for widget, position in placements:
+            widget_list.append(widget)
+            rect = widget.rect.copy()
+            if position:
+                rect.topleft = position
+            for cell in self.get_cells(rect):
+                grid.setdefault(cell, []).append(widget)
+        self.sets[state] = (widget_list, placements, grid)
+        if state == self.state:
+            self.set_state(state)
+
+    def set_state(self, state):
+        """ Affective method, makes the named widget state active and moves its widgets into place.
+        """
+        self.state = state
+        self.active, placements, self.grid = self.sets[state]
+        for widget, position in placements:
+            if position:
+                widget.rect.topleft = position
+        self.near = []
+        self.dirty = []
+
+    def get_widgets_near(self, position):
+        """ Returns a list of the active widgets in the grid cell at the 2-tuple position, along with any widget still
+        highlighted or tracking the mouse from the last call, which need the event to let go.
+        """
+        near = list(self.grid.get((position[0] // self.cell_size, position[1] // self.cell_size), ()))
+        for widget in self.near:
+            if (widget.highlight or widget.tracking) and widget not in near and widget in self.active:
+                near.append(widget)
+        self.near = near
+        return near
+
+    def get_widgets_in(self, rect):
+        """ Returns a list of the active widgets in any grid cell the pygame rect covers.
+        """
+        widget_list = []
+        for cell in self.get_cells(rect):
+            for widget in self.grid.get(cell, ()):
+                if widget not in widget_list:
+                    widget_list.append(widget)
+        return widget_list
+
+    def mark_dirty(self, widget):
+        """ Affective method, marks an active widget as needing to be erased and redrawn. Erasing a widget also erases
+        any widget overlapping it, so those are marked too.
+        """
+        if widget in self.active and widget not in self.dirty:
+            self.dirty.append(widget)
+            for other in self.get_widgets_in(widget.rect):
+                if other.rect.colliderect(widget.rect):
+                    self.mark_dirty(other)
+
+    def mark_dirty_in(self, rect):
+        """ Affective method, marks every active widget overlapping the pygame rect as dirty.
+        """
+        for widget in self.get_widgets_in(rect):
+            if widget.rect.colliderect(rect):
+                self.mark_dirty(widget)
+
+    def mark_all_dirty(self):
+        """ Affective method, marks every active widget as dirty.
+        """
+        self.dirty = list(self.active)
+
+    def get_dirty(self):
+        """ Returns a list of the dirty widgets, in the order they're drawn.
+        """
+        return [widget for widget in self.active if widget in self.dirty]
+
+    def clean(self):
+        """ Affective method, marks every widget as no longer dirty.
+        """
+        self.dirty = []